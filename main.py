@@ -1,9 +1,16 @@
+import argparse
 import tkinter as tk
+from src.bitboard import ROWS, COLS
 from src.gui import IsolationGUI
 
 def main():
+    parser = argparse.ArgumentParser(description="Play Isolation.")
+    parser.add_argument("--rows", type=int, default=ROWS, help="Number of board rows.")
+    parser.add_argument("--cols", type=int, default=COLS, help="Number of board columns.")
+    args = parser.parse_args()
+
     root = tk.Tk()
-    game = IsolationGUI(root)
+    game = IsolationGUI(root, args.rows, args.cols)
     root.mainloop()
 
 if __name__ == "__main__":
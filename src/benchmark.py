@@ -0,0 +1,247 @@
+"""Benchmarks of the engine hot paths over a fixed corpus of positions.
+
+Every benchmark runs on the same opening, midgame and near-partitioned
+endgame positions with the global RNG reseeded before each run, and reports
+operations per second (and nodes per second for searches). Results can be
+saved as a JSON baseline and later runs compared against it; a benchmark
+that gets slower than the baseline by more than the threshold fails the run.
+
+Usage:
+    python -m src.benchmark --save baseline.json
+    python -m src.benchmark --compare baseline.json --threshold 0.15
+"""
+
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import argparse
+from .bitboard import BitBoard, ROWS, square
+from .isolation import Isolation
+from .player import ComputerPlayer, HumanPlayer
+logger = logging.getLogger("IsolationGameLogger")
+
+SEED = 20240229
+
+# Board diagrams: "." open, "#" removed, "1"/"2" the players; the int is the player to move
+POSITIONS = {
+    "opening": ([
+        "...1..",
+        "......",
+        "......",
+        "......",
+        "......",
+        "......",
+        "......",
+        "..2...",
+    ], 0),
+    "midgame": ([
+        ".#..#.",
+        "..1...",
+        "#..#..",
+        ".#...#",
+        "...#..",
+        "#.#...",
+        "...2#.",
+        ".#....",
+    ], 0),
+    "endgame": ([
+        "#..#.#",
+        ".1..#.",
+        "#.#...",
+        "#####.",
+        "..#..#",
+        ".2...#",
+        "#.#..#",
+        ".#..#.",
+    ], 1),
+}
+
+MINIMAX_DEPTH = 5
+
+
+def load_position(name):
+    """Builds a game in one of the corpus positions, with a ComputerPlayer in seat 0.
+
+    The player has no transposition table or evaluation cache, so searches
+    don't speed up from earlier runs on the same position.
+
+    Returns:
+        tuple: The game and the ComputerPlayer.
+    """
+    rows, mover = POSITIONS[name]
+    player = ComputerPlayer("Benchmark", tt_size=0, eval_cache_size=0)
+    game = Isolation(player, HumanPlayer("Opponent"))
+    removed, positions = 0, [None, None]
+    for row in range(ROWS):
+        for col, cell in enumerate(rows[row]):
+            if cell == "#":
+                removed |= 1 << square(row, col)
+            elif cell in "12":
+                positions[int(cell) - 1] = square(row, col)
+    game.bitboard = BitBoard(positions, removed)
+    game.current_player_index = mover
+    return game, player
+
+
+def _mover(game):
+    """Returns the player to move."""
+    return game.players[game.current_player_index]
+
+
+def bench_get_available_moves(game, player):
+    """Lists the moves of the player to move."""
+    game.get_available_moves(_mover(game))
+
+
+def bench_mock_move(game, player):
+    """Copies the game with the first move of the player to move applied."""
+    mover = _mover(game)
+    game.mock_move(mover, game.get_available_moves(mover)[0])
+
+
+def bench_minimax(game, player):
+    """Searches the position to ``MINIMAX_DEPTH`` and returns the number of nodes visited.
+
+    The move ordering tables are cleared first, so every run searches the same tree.
+    """
+    if player.move_ordering is not None:
+        player.move_ordering.clear()
+    return player.search_fixed_depth(game, MINIMAX_DEPTH)[1]
+
+
+def bench_minimax_unordered(game, player):
+    """Searches like ``bench_minimax`` with move ordering switched off, to show what the ordering saves."""
+    ordering, player.move_ordering = player.move_ordering, None
+    try:
+        return bench_minimax(game, player)
+    finally:
+        player.move_ordering = ordering
+
+
+def bench_token_removal_heuristic(game, player):
+    """Picks a token to remove with the ComputerPlayer's removal heuristic."""
+    player.token_removal_heuristic(game)
+
+
+def heuristic_benchmark(name):
+    """Returns a benchmark that evaluates the position with the named ComputerPlayer heuristic."""
+    def bench(game, player):
+        getattr(player, name)(game, player)
+    return bench
+
+
+# Each benchmark takes (game, player) and returns the number of search nodes it visited, or None
+BENCHMARKS = {
+    "get_available_moves": bench_get_available_moves,
+    "mock_move": bench_mock_move,
+    "minimax": bench_minimax,
+    "minimax_unordered": bench_minimax_unordered,
+    "token_removal_heuristic": bench_token_removal_heuristic,
+}
+for _name in ("composite_heuristic", "frontier_cells_heuristic", "aggressive_approach_heuristic",
+              "enhanced_mobility_heuristic", "control_of_center_heuristic", "enhanced_difference_heuristic"):
+    BENCHMARKS[_name] = heuristic_benchmark(_name)
+
+
+def measure(benchmark, position, min_time=0.2, repeats=3):
+    """Runs one benchmark on one position and returns its best rate over ``repeats`` rounds.
+
+    Each round calls the benchmark until ``min_time`` seconds have passed.
+
+    Returns:
+        dict: ``ops_per_sec``, plus ``nodes_per_sec`` for benchmarks that count nodes.
+    """
+    run = BENCHMARKS[benchmark]
+    best = None
+    for _ in range(repeats):
+        random.seed(SEED)
+        game, player = load_position(position)
+        ops = nodes = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            visited = run(game, player)
+            ops += 1
+            nodes += visited or 0
+            elapsed = time.perf_counter() - start
+        result = {"ops_per_sec": ops / elapsed}
+        if nodes:
+            result["nodes_per_sec"] = nodes / elapsed
+        if best is None or result["ops_per_sec"] > best["ops_per_sec"]:
+            best = result
+    return best
+
+
+def run_benchmarks(selected=None, min_time=0.2, repeats=3):
+    """Runs the benchmarks whose name contains one of the ``selected`` substrings, on every position.
+
+    Returns:
+        dict: Results keyed by ``"benchmark/position"``.
+    """
+    results = {}
+    for benchmark in BENCHMARKS:
+        if selected and not any(part in benchmark for part in selected):
+            continue
+        for position in POSITIONS:
+            results[f"{benchmark}/{position}"] = measure(benchmark, position, min_time, repeats)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Returns the benchmarks that got slower than the baseline by more than ``threshold``.
+
+    Returns:
+        list[tuple]: ``(name, baseline ops/sec, current ops/sec)`` for every regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is not None and result["ops_per_sec"] < previous["ops_per_sec"] * (1 - threshold):
+            regressions.append((name, previous["ops_per_sec"], result["ops_per_sec"]))
+    return regressions
+
+
+def main(argv=None):
+    """Command-line entry point. Returns 1 if any benchmark regressed past the threshold."""
+    parser = argparse.ArgumentParser(description="Benchmark the Isolation engine hot paths.")
+    parser.add_argument("--filter", nargs="*", default=None, help="Only run benchmarks whose name contains one of these.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per measurement round.")
+    parser.add_argument("--repeats", type=int, default=3, help="Rounds per benchmark; the best one counts.")
+    parser.add_argument("--save", default=None, help="Write the results to this JSON baseline file.")
+    parser.add_argument("--compare", default=None, help="JSON baseline file to compare the results against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown against the baseline, as a fraction.")
+    args = parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)  # The engine logs every decision at info level
+    results = run_benchmarks(args.filter, args.min_time, args.repeats)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+
+    for name, result in results.items():
+        line = f"{name:45} {result['ops_per_sec']:>12,.0f} ops/s"
+        if "nodes_per_sec" in result:
+            line += f" {result['nodes_per_sec']:>12,.0f} nodes/s"
+        if baseline and name in baseline:
+            line += f" {result['ops_per_sec'] / baseline[name]['ops_per_sec'] - 1:>+8.1%}"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"python": platform.python_version(), "seed": SEED, "results": results}, file, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for name, previous, current in regressions:
+            print(f"REGRESSION {name}: {previous:,.0f} -> {current:,.0f} ops/s")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""Bitboard representation of the Isolation board.
+
+Squares are numbered row-major (``square = row * COLS + col``) and any set of
+squares is stored as a Python int with one bit per square, so move generation
+and mobility counts reduce to a mask-and-popcount. Everything that depends on
+the board size (neighbour masks, distances, Zobrist keys) lives in a Geometry
+that is built once per size; the module-level tables are those of the default
+8x6 board.
+"""
+
+import random
+
+# Default board size
+ROWS = 8
+COLS = 6
+
+# Same order the list-based move generation used, so move lists keep their order
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+
+ZOBRIST_SEED = 0x15014710
+
+
+def popcount(mask):
+    """Returns the number of squares set in the mask."""
+    return mask.bit_count()
+
+
+def iter_squares(mask):
+    """Yields the squares set in the mask in ascending order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Geometry:
+    """Precomputed tables for one board size.
+
+    Get instances through ``geometry(rows, cols)``, which builds the tables
+    once per size and shares them between every board of that size.
+
+    Attributes:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        num_squares (int): Number of squares.
+        full_mask (int): Mask with every square set.
+        center (tuple): (row, col) of the central square.
+        start_squares (tuple): Default starting square of each player.
+        neighbor_squares (list[tuple]): Neighbour squares of every square, in direction order.
+        neighbors (list[int]): Neighbour mask of every square.
+        second_ring (list[int]): Mask of the squares exactly two king steps from every square.
+        distances (list[tuple]): ``distances[a][b]`` is the Manhattan distance between squares a and b.
+        zobrist_removed (list[int]): Zobrist key of a removed token on every square.
+        zobrist_players (list[list[int]]): Zobrist key of each player on every square.
+    """
+
+    def __init__(self, rows, cols):
+        """Builds the tables for a ``rows`` x ``cols`` board."""
+        if rows < 2 or cols < 2:
+            raise ValueError("The board needs at least two rows and two columns.")
+        self.rows = rows
+        self.cols = cols
+        self.num_squares = rows * cols
+        self.full_mask = (1 << self.num_squares) - 1
+        self.center = (rows // 2, cols // 2)
+        # Top row just right of the middle and bottom row just left of it, (0, 3) and (7, 2) on 8x6
+        self.start_squares = (self.square(0, cols // 2), self.square(rows - 1, (cols - 1) // 2))
+
+        first_column = 0
+        for row in range(rows):
+            first_column |= 1 << self.square(row, 0)
+        self.not_first_column = self.full_mask & ~first_column
+        self.not_last_column = self.full_mask & ~(first_column << (cols - 1))
+
+        self.neighbor_squares = []
+        self.neighbors = []
+        for sq in range(self.num_squares):
+            row, col = self.coords(sq)
+            squares = tuple(self.square(row + dr, col + dc) for dr, dc in DIRECTIONS
+                            if 0 <= row + dr < rows and 0 <= col + dc < cols)
+            mask = 0
+            for neighbor in squares:
+                mask |= 1 << neighbor
+            self.neighbor_squares.append(squares)
+            self.neighbors.append(mask)
+
+        self.second_ring = []
+        for sq in range(self.num_squares):
+            reach = 0
+            for neighbor in self.neighbor_squares[sq]:
+                reach |= self.neighbors[neighbor]
+            self.second_ring.append(reach & ~self.neighbors[sq] & ~(1 << sq))
+
+        cells = [self.coords(sq) for sq in range(self.num_squares)]
+        self.distances = [tuple(abs(row - other_row) + abs(col - other_col) for other_row, other_col in cells)
+                          for row, col in cells]
+
+        # Drawn from a fixed seed so hashes are stable across processes
+        rng = random.Random(ZOBRIST_SEED)
+        self.zobrist_removed = [rng.getrandbits(64) for _ in range(self.num_squares)]
+        self.zobrist_players = [[rng.getrandbits(64) for _ in range(self.num_squares)] for _ in range(2)]
+
+    def square(self, row, col):
+        """Returns the square index for the given row and column."""
+        return row * self.cols + col
+
+    def coords(self, sq):
+        """Returns the (row, col) tuple for the given square index."""
+        return divmod(sq, self.cols)
+
+    def contains(self, row, col):
+        """Returns True if (row, col) is on the board."""
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def dilate(self, mask):
+        """Returns the mask grown by one king step in every direction, including the original squares."""
+        horizontal = mask | ((mask << 1) & self.not_first_column) | ((mask >> 1) & self.not_last_column)
+        return (horizontal | (horizontal << self.cols) | (horizontal >> self.cols)) & self.full_mask
+
+    def flood_fill(self, start, passable):
+        """Returns the squares reachable from the ``start`` mask through ``passable`` squares, including ``start``."""
+        region = start
+        while True:
+            grown = (self.dilate(region) & passable) | region
+            if grown == region:
+                return region
+            region = grown
+
+    def __reduce__(self):
+        """Pickles the geometry as its size; the receiving process rebuilds or reuses its own tables."""
+        return geometry, (self.rows, self.cols)
+
+
+# Geometry of every board size built so far, keyed by (rows, cols)
+_GEOMETRIES = {}
+
+
+def geometry(rows=ROWS, cols=COLS):
+    """Returns the shared Geometry of a ``rows`` x ``cols`` board."""
+    board_geometry = _GEOMETRIES.get((rows, cols))
+    if board_geometry is None:
+        board_geometry = _GEOMETRIES[rows, cols] = Geometry(rows, cols)
+    return board_geometry
+
+
+DEFAULT_GEOMETRY = geometry()
+
+# Tables of the default 8x6 board, for code that only ever plays on it
+NUM_SQUARES = DEFAULT_GEOMETRY.num_squares
+FULL_MASK = DEFAULT_GEOMETRY.full_mask
+NOT_FIRST_COLUMN = DEFAULT_GEOMETRY.not_first_column
+NOT_LAST_COLUMN = DEFAULT_GEOMETRY.not_last_column
+NEIGHBOR_SQUARES = DEFAULT_GEOMETRY.neighbor_squares
+NEIGHBORS = DEFAULT_GEOMETRY.neighbors
+SECOND_RING = DEFAULT_GEOMETRY.second_ring
+DISTANCES = DEFAULT_GEOMETRY.distances
+ZOBRIST_REMOVED = DEFAULT_GEOMETRY.zobrist_removed
+ZOBRIST_PLAYERS = DEFAULT_GEOMETRY.zobrist_players
+square = DEFAULT_GEOMETRY.square
+coords = DEFAULT_GEOMETRY.coords
+dilate = DEFAULT_GEOMETRY.dilate
+flood_fill = DEFAULT_GEOMETRY.flood_fill
+
+
+def _build_search_keys():
+    """Draws the side-to-move and full-turn keys, after the default board's square keys."""
+    rng = random.Random(ZOBRIST_SEED)
+    for _ in range(3 * NUM_SQUARES):
+        rng.getrandbits(64)
+    side = [rng.getrandbits(64) for _ in range(2)]
+    full_turn = rng.getrandbits(64)
+    return side, full_turn
+
+
+# Keys for the side to move and full-turn search nodes; they are folded in by
+# the search, not by BitBoard, and are the same for every board size
+ZOBRIST_SIDE, ZOBRIST_FULL_TURN = _build_search_keys()
+
+
+class BitBoard:
+    """Packed position: removed tokens as a mask, both player squares and the side to move.
+
+    This is everything the search needs to know about a game; the session
+    bookkeeping (players, move counts, timing) stays on ``Isolation``. Two
+    bitboards are equal when they hold the same position. They are updated in
+    place, so they are unhashable; ``pack`` returns an immutable snapshot to
+    use as a dict key or set member instead. Pickling goes through ``pack``,
+    so shipping a position to another process costs a handful of ints.
+
+    Attributes:
+        removed (int): Mask of squares whose token has been removed.
+        positions (list[int]): Square of each player, indexed like ``Isolation.players``.
+        key (int): Zobrist hash of the board, kept up to date by ``move``, ``remove`` and ``restore``.
+        geometry (Geometry): Tables of the board size.
+        to_move (int): Index of the player whose turn it is.
+        awaiting_removal (bool): True if that player has moved and still has to remove a token.
+    """
+
+    __slots__ = ("removed", "positions", "key", "geometry", "to_move", "awaiting_removal")
+
+    def __init__(self, positions, removed=0, geometry=DEFAULT_GEOMETRY, to_move=0, awaiting_removal=False):
+        """Initializes the bitboard from the two player squares and a removed mask."""
+        self.removed = removed
+        self.positions = list(positions)
+        self.geometry = geometry
+        self.to_move = to_move
+        self.awaiting_removal = awaiting_removal
+        players = geometry.zobrist_players
+        key = players[0][self.positions[0]] ^ players[1][self.positions[1]]
+        for sq in iter_squares(removed):
+            key ^= geometry.zobrist_removed[sq]
+        self.key = key
+
+    def occupied(self):
+        """Returns the mask of squares occupied by a player."""
+        return (1 << self.positions[0]) | (1 << self.positions[1])
+
+    def blocked(self):
+        """Returns the mask of squares that cannot be entered or removed."""
+        return self.removed | (1 << self.positions[0]) | (1 << self.positions[1])
+
+    def moves_mask(self, index):
+        """Returns the mask of squares the given player can move to."""
+        return self.geometry.neighbors[self.positions[index]] & ~(self.removed | (1 << self.positions[1 - index]))
+
+    def mobility(self, index):
+        """Returns the number of moves available to the given player."""
+        return popcount(self.moves_mask(index))
+
+    def move_squares(self, index):
+        """Returns the squares the given player can move to, in direction order."""
+        blocked = self.removed | (1 << self.positions[1 - index])
+        return [sq for sq in self.geometry.neighbor_squares[self.positions[index]] if not blocked >> sq & 1]
+
+    def future_mobility(self, index):
+        """Returns the total mobility the given player would have after each of its moves."""
+        # The square we leave becomes free again, so only the removed tokens
+        # and the opponent block us on the second step
+        neighbors = self.geometry.neighbors
+        blocked = self.removed | (1 << self.positions[1 - index])
+        total = 0
+        for sq in iter_squares(neighbors[self.positions[index]] & ~blocked):
+            total += popcount(neighbors[sq] & ~blocked)
+        return total
+
+    def removable_mask(self):
+        """Returns the mask of squares whose token can be removed."""
+        return self.geometry.full_mask & ~self.blocked()
+
+    def removal_candidates(self, index, move):
+        """Returns the token removals worth searching after the given player moves to ``move``.
+
+        Only tokens next to the opponent are kept; if there are none, tokens two
+        steps from the opponent, and failing that any single token.
+        """
+        geometry = self.geometry
+        opponent = self.positions[1 - index]
+        removable = geometry.full_mask & ~(self.removed | (1 << move) | (1 << opponent))
+        candidates = removable & geometry.neighbors[opponent]
+        if not candidates:
+            candidates = removable & geometry.second_ring[opponent]
+            if not candidates:
+                candidates = removable & -removable
+        return list(iter_squares(candidates))
+
+    def turn_actions(self, index):
+        """Returns the (move, removal) square pairs searched for a full turn of the given player."""
+        return [(move, removal) for move in self.move_squares(index)
+                for removal in self.removal_candidates(index, move)]
+
+    def move(self, index, sq):
+        """Moves the given player to the square."""
+        keys = self.geometry.zobrist_players[index]
+        self.key ^= keys[self.positions[index]] ^ keys[sq]
+        self.positions[index] = sq
+
+    def remove(self, sq):
+        """Removes the token on the square."""
+        self.removed |= 1 << sq
+        self.key ^= self.geometry.zobrist_removed[sq]
+
+    def restore(self, sq):
+        """Puts a removed token back on the square."""
+        self.removed &= ~(1 << sq)
+        self.key ^= self.geometry.zobrist_removed[sq]
+
+    def pack(self):
+        """Returns the position as a compact, hashable tuple of ints, for sending to other processes or as a key."""
+        return (self.removed, self.positions[0], self.positions[1], self.geometry.rows, self.geometry.cols,
+                self.to_move, int(self.awaiting_removal))
+
+    @staticmethod
+    def unpack(packed):
+        """Rebuilds a bitboard from the tuple returned by ``pack``."""
+        removed, first, second, rows, cols, to_move, awaiting_removal = packed
+        return BitBoard((first, second), removed, geometry(rows, cols), to_move, bool(awaiting_removal))
+
+    def copy(self):
+        """Returns an independent copy of the bitboard."""
+        board = BitBoard.__new__(BitBoard)
+        board.removed = self.removed
+        board.positions = list(self.positions)
+        board.key = self.key
+        board.geometry = self.geometry
+        board.to_move = self.to_move
+        board.awaiting_removal = self.awaiting_removal
+        return board
+
+    def __eq__(self, other):
+        """Returns True if the other bitboard holds the same position on the same board size."""
+        if not isinstance(other, BitBoard):
+            return NotImplemented
+        return (self.key == other.key and self.removed == other.removed and self.positions == other.positions
+                and self.to_move == other.to_move and self.awaiting_removal == other.awaiting_removal
+                and self.geometry is other.geometry)
+
+    # Mutable, so not hashable; hash ``pack()`` instead
+    __hash__ = None
+
+    def __reduce__(self):
+        """Pickles the bitboard as its packed tuple."""
+        return BitBoard.unpack, (self.pack(),)
@@ -0,0 +1,53 @@
+"""Bounded least-recently-used cache of heuristic values."""
+
+from collections import OrderedDict
+
+
+class EvaluationCache:
+    """LRU cache of heuristic values keyed by (heuristic, position hash).
+
+    Heuristics are pure functions of the board and the evaluating seat, so a
+    position reached again through a different move order, or again in a
+    later search, does not need to be scored twice. Once ``size`` entries are
+    stored the least recently used one is evicted.
+
+    Attributes:
+        size (int): Maximum number of entries.
+        hits (int): Number of lookups that found a value.
+        misses (int): Number of lookups that did not.
+    """
+
+    def __init__(self, size=1 << 16):
+        """Initializes an empty cache holding at most ``size`` values."""
+        if size <= 0:
+            raise ValueError("Evaluation cache size must be positive.")
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        """Returns the number of cached values."""
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the value cached for the key, or None, marking it as recently used."""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Caches a value, evicting the least recently used one if the cache is full."""
+        self._entries[key] = value
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Removes every value and resets the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
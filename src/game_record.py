@@ -0,0 +1,234 @@
+"""Compact binary game records for storing and analysing many games.
+
+A record file is a magic string followed by records appended one after the
+other, so games can be added as they finish and read back one at a time.
+
+File layout (little-endian):
+    header: magic ``b"ISOGAME1"``
+    records: uint8 board rows, uint8 board columns, uint8 start square of
+             each player, uint8 first mover, uint8 winner (255 if none),
+             uint16 info length, uint16 turn count, the info as UTF-8 JSON
+             (player names, engine settings, ...), then two bytes per turn:
+             uint8 move square, uint8 removal square (255 if none)
+
+Squares are numbered like in ``bitboard``, so records are limited to boards
+of at most 255 squares.
+
+Usage:
+    python -m src.game_record games.bin
+"""
+
+import sys
+import json
+import struct
+import logging
+import argparse
+logger = logging.getLogger("IsolationGameLogger")
+
+MAGIC = b"ISOGAME1"
+RECORD = struct.Struct("<BBBBBBHH")
+NONE = 255
+
+
+def fits(rows, cols):
+    """Returns whether games on a ``rows`` x ``cols`` board can be recorded."""
+    return rows * cols < NONE
+
+
+class GameRecord:
+    """One game: board, start squares, the turns played and the result.
+
+    Attributes:
+        rows (int): Number of board rows.
+        cols (int): Number of board columns.
+        start_squares (tuple): Starting square of each player.
+        first_player (int): Seat of the player who moved first.
+        winner (int): Seat of the winner, or None if the game was not decided.
+        turns (bytes): Move square and removal square of every turn, interleaved.
+        info (dict): Player names, engine settings and anything else worth keeping.
+    """
+
+    def __init__(self, rows, cols, start_squares, first_player, winner, turns, info=None):
+        """Initializes a record from its fields."""
+        self.rows = rows
+        self.cols = cols
+        self.start_squares = tuple(start_squares)
+        self.first_player = first_player
+        self.winner = winner
+        self.turns = bytes(turns)
+        self.info = info or {}
+
+    @classmethod
+    def from_game(cls, game, winner=None, info=None):
+        """Builds the record of an Isolation game from its history.
+
+        Args:
+            game (Isolation): The game, at any point.
+            winner (int): Seat of the winner, or None.
+            info (dict): Extra information to store; the player names are added if missing.
+        """
+        board_geometry = game.geometry
+        if not fits(board_geometry.rows, board_geometry.cols):
+            raise ValueError(f"A {board_geometry.rows}x{board_geometry.cols} board is too large for a game record.")
+        info = dict(info or {})
+        info.setdefault("players", [player.name for player in game.players])
+        first_player = game.history[0][0] if game.history else game.current_player_index
+        turns = bytearray()
+        for _, move, removal in game.history:
+            turns.append(move)
+            turns.append(NONE if removal is None else removal)
+        return cls(board_geometry.rows, board_geometry.cols, game.start_squares, first_player, winner, turns, info)
+
+    def __len__(self):
+        """Returns the number of turns played."""
+        return len(self.turns) // 2
+
+    def pack(self):
+        """Returns the record encoded as bytes."""
+        info = json.dumps(self.info, separators=(",", ":")).encode("utf-8")
+        winner = NONE if self.winner is None else self.winner
+        return (RECORD.pack(self.rows, self.cols, *self.start_squares, self.first_player, winner, len(info), len(self))
+                + info + self.turns)
+
+    def boards(self):
+        """Yields the BitBoard after every turn, starting with the initial position.
+
+        The same BitBoard is updated and yielded each time; copy it to keep one.
+        """
+        from .bitboard import BitBoard, geometry
+
+        board = BitBoard(self.start_squares, geometry=geometry(self.rows, self.cols), to_move=self.first_player)
+        yield board
+        turns = self.turns
+        for offset in range(0, len(turns), 2):
+            mover = board.to_move
+            board.move(mover, turns[offset])
+            if turns[offset + 1] == NONE:
+                board.awaiting_removal = True
+                yield board
+                return
+            board.remove(turns[offset + 1])
+            board.to_move = 1 - mover
+            yield board
+
+
+def replay(record, turn=None, player1=None, player2=None):
+    """Rebuilds the Isolation game of a record after the given number of turns.
+
+    The turns are applied straight to the bitboard without validation, and
+    the move and removal counts and the history are rebuilt along the way.
+
+    Args:
+        record (GameRecord): The game to replay.
+        turn (int): Number of turns to play, or None for the whole game.
+        player1 (Player): The player in seat 0, defaults to a HumanPlayer named after the record.
+        player2 (Player): The player in seat 1, likewise.
+
+    Returns:
+        Isolation: The game after ``turn`` turns.
+    """
+    from .isolation import Isolation  # Imported here, the isolation module imports the player module
+    from .player import HumanPlayer
+
+    names = record.info.get("players", ["Player 1", "Player 2"])
+    game = Isolation(player1 or HumanPlayer(names[0]), player2 or HumanPlayer(names[1]), record.rows, record.cols)
+    bitboard = game.bitboard
+    for index, sq in enumerate(record.start_squares):
+        bitboard.move(index, sq)
+    game.start_squares = record.start_squares
+    bitboard.to_move = record.first_player
+
+    turns = record.turns[:2 * len(record) if turn is None else 2 * turn]
+    for offset in range(0, len(turns), 2):
+        mover, move, removal = bitboard.to_move, turns[offset], turns[offset + 1]
+        bitboard.move(mover, move)
+        game.move_counts[mover] += 1
+        if removal == NONE:
+            bitboard.awaiting_removal = True
+            game.history.append((mover, move, None))
+            break
+        bitboard.remove(removal)
+        game.removal_counts[mover] += 1
+        game.history.append((mover, move, removal))
+        bitboard.to_move = 1 - mover
+    return game
+
+
+class GameRecordWriter:
+    """Appends game records to a file, starting it with the magic string if it is new.
+
+    Usable as a context manager. Records are only ever added at the end, so
+    a file can be written by one run and extended by the next.
+    """
+
+    def __init__(self, path):
+        """Opens the file for appending."""
+        self.path = path
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def write(self, record):
+        """Appends one record."""
+        self._file.write(record.pack())
+
+    def flush(self):
+        """Flushes the written records to the file."""
+        self._file.flush()
+
+    def close(self):
+        """Closes the file."""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_records(path):
+    """Yields the records of a file one at a time, without loading the whole file.
+
+    A record cut short at the end of the file, as left by a writer that was
+    interrupted, is skipped with a warning.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a game record file.")
+        while True:
+            header = file.read(RECORD.size)
+            if not header:
+                return
+            if len(header) == RECORD.size:
+                rows, cols, start0, start1, first_player, winner, info_length, count = RECORD.unpack(header)
+                body = file.read(info_length + 2 * count)
+                if len(body) == info_length + 2 * count:
+                    yield GameRecord(rows, cols, (start0, start1), first_player, None if winner == NONE else winner,
+                                     body[info_length:], json.loads(body[:info_length].decode("utf-8")))
+                    continue
+            logger.warning(f"{path} ends with a truncated game record.")
+            return
+
+
+def main(argv=None):
+    """Command-line entry point: prints a summary of a record file."""
+    parser = argparse.ArgumentParser(description="Summarize an Isolation game record file.")
+    parser.add_argument("records", help="Game record file to read.")
+    args = parser.parse_args(argv)
+
+    games = turns = first_player_wins = decided = 0
+    for record in read_records(args.records):
+        games += 1
+        turns += len(record)
+        if record.winner is not None:
+            decided += 1
+            first_player_wins += record.winner == record.first_player
+    print(f"{games} games, {turns / games if games else 0:.1f} turns on average")
+    if decided:
+        print(f"First player won {first_player_wins}/{decided} = {first_player_wins / decided:.1%} of decided games")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
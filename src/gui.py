@@ -1,10 +1,15 @@
 import time
+import queue
 import random
 import logging
+import threading
+import traceback
+from collections import deque
 import tkinter as tk
 from tkinter import ttk, messagebox, Canvas
 from .isolation import Isolation
-from .player import Player, HumanPlayer, ComputerPlayer
+from .bitboard import ROWS, COLS, geometry, iter_squares
+from .player import HumanPlayer, ComputerPlayer, MCTSPlayer
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -13,23 +18,61 @@ logger.handlers = []  # Clear existing handlers
 
 class ListboxHandler(logging.Handler):
     """Custom logging handler that sends log messages to a tkinter Listbox.
+
+    Messages are collected in ``pending`` and inserted in one batch per event
+    loop pass, and the Listbox keeps only the newest ``max_lines`` of them.
+    Tk may only be used from the main thread, so messages logged by a search
+    running in a worker thread wait until the GUI calls ``flush``.
     
     Attributes:
         listbox (tk.Listbox): The Listbox widget where log messages will be displayed.
+        max_lines (int): Number of messages the Listbox keeps.
+        pending (deque): Formatted messages not yet shown, bounded to ``max_lines``.
     """
 
-    def __init__(self, listbox):
+    MAX_LINES = 500
+
+    def __init__(self, listbox, max_lines=MAX_LINES):
         """Initializes the ListboxHandler with a Listbox widget."""
         super().__init__()
         self.listbox = listbox
+        self.max_lines = max_lines
+        self.pending = deque(maxlen=max_lines)
+        self._line_count = 0
+        self._flush_scheduled = False
 
     def emit(self, record):
-        """Override of base class emit method to insert log messages into the Listbox."""
-        log_entry = self.format(record)
-        self.listbox.insert(tk.END, log_entry)
+        """Override of base class emit method to queue log messages for the Listbox."""
+        self.pending.append(self.format(record))
+        if not self._flush_scheduled and threading.current_thread() is threading.main_thread():
+            self._flush_scheduled = True
+            self.listbox.after_idle(self.flush)
+
+    def flush(self):
+        """Inserts the pending messages into the Listbox. Must be called from the main thread."""
+        self._flush_scheduled = False
+        if not self.pending:
+            return
+        # Pop one message at a time, so messages a search thread logs meanwhile stay pending
+        pending = self.pending
+        batch = []
+        while pending:
+            batch.append(pending.popleft())
+        self.listbox.insert(tk.END, *batch)
+        self._line_count += len(batch)
+        # Drop the oldest lines beyond the limit
+        if self._line_count > self.max_lines:
+            self.listbox.delete(0, self._line_count - self.max_lines - 1)
+            self._line_count = self.max_lines
         # Ensure the latest log is visible in the Listbox
         self.listbox.yview(tk.END)
 
+    def clear(self):
+        """Removes every shown and pending message."""
+        self.pending.clear()
+        self.listbox.delete(0, tk.END)
+        self._line_count = 0
+
 class IsolationGUI:
     """Graphical User Interface for the Isolation Game.
 
@@ -39,13 +82,29 @@ class IsolationGUI:
     """
 
     # Define the class-level constant here
-    COMPUTER_TURN_DELAY = 250  # .1 second delay
+    COMPUTER_TURN_DELAY = 250  # Milliseconds before a computer turn starts
+    SEARCH_POLL_INTERVAL = 100  # Milliseconds between checks on a running AI search
+    CELL_SIZE = 70  # Width and height of a board cell, in pixels
+
+    # Cell colors
+    EMPTY_COLOR = "white"
+    REMOVED_COLOR = "#44463e"
+    PLAYER_COLORS = ("blue", "red")
+
+    # Player types offered in the selection dropdowns
+    PLAYER_TYPES = {"Human": HumanPlayer, "Computer": ComputerPlayer, "MCTS": MCTSPlayer}
+    AI_PLAYERS = (ComputerPlayer, MCTSPlayer)
 
-    def __init__(self, master):
-        """Initializes the GUI with the main application window."""
+    def __init__(self, master, rows=ROWS, cols=COLS):
+        """Initializes the GUI with the main application window and a ``rows`` x ``cols`` board."""
         self.master = master
         self.master.title("Isolation Game")
+        self.board_geometry = geometry(rows, cols)
+        self.game = None
+        self.game_over = False
+        self.search_player = None  # AI player whose search is running in the worker thread
 
+        self.master.protocol("WM_DELETE_WINDOW", self.close)
         self.setup_bindings()
         self.setup_player_selection()
         self.setup_board()
@@ -57,7 +116,8 @@ class IsolationGUI:
         """Sets up the player selection dropdowns and indicators."""
         # Player 1 Selection Frame
         self.player1_selection_frame = tk.Frame(self.master)
-        self.player1_selection_frame.grid(row=0, column=0, columnspan=6, pady=(20, 10))
+        cols = self.board_geometry.cols
+        self.player1_selection_frame.grid(row=0, column=0, columnspan=cols, pady=(20, 10))
 
         # Player 1 light indicator
         self.player1_light = Canvas(self.player1_selection_frame, width=10, height=10, bg="#a4a6a0", relief="ridge")
@@ -68,12 +128,12 @@ class IsolationGUI:
         self.player1_label.pack(side=tk.LEFT, padx=10)
         self.player1_var = tk.StringVar(self.master)
         self.player1_var.set("Human")  # default value
-        self.player1_dropdown = ttk.Combobox(self.player1_selection_frame, textvariable=self.player1_var, values=["Human", "Computer"], state="readonly")
+        self.player1_dropdown = ttk.Combobox(self.player1_selection_frame, textvariable=self.player1_var, values=list(IsolationGUI.PLAYER_TYPES), state="readonly")
         self.player1_dropdown.pack(side=tk.LEFT, padx=10)
 
         # Player 2 Selection Frame
         self.player2_selection_frame = tk.Frame(self.master)
-        self.player2_selection_frame.grid(row=9, column=0, columnspan=6, pady=(10, 20))
+        self.player2_selection_frame.grid(row=self.board_geometry.rows + 1, column=0, columnspan=cols, pady=(10, 20))
 
         # Player 2 light indicator
         self.player2_light = Canvas(self.player2_selection_frame, width=10, height=10, bg="#a4a6a0", relief="ridge")
@@ -84,14 +144,14 @@ class IsolationGUI:
         self.player2_label.pack(side=tk.LEFT, padx=10)
         self.player2_var = tk.StringVar(self.master)
         self.player2_var.set("Human")  # default value
-        self.player2_dropdown = ttk.Combobox(self.player2_selection_frame, textvariable=self.player2_var, values=["Human", "Computer"], state="readonly")
+        self.player2_dropdown = ttk.Combobox(self.player2_selection_frame, textvariable=self.player2_var, values=list(IsolationGUI.PLAYER_TYPES), state="readonly")
         self.player2_dropdown.pack(side=tk.LEFT, padx=10)
 
     def setup_side_panel(self):
         """Sets up the legend and action log on the right side of the board."""
         # Legend and Action Log to the right of the board
         self.side_frame = tk.Frame(self.master)
-        self.side_frame.grid(row=0, column=6, rowspan=12, sticky="ns", pady=(50, 0))  # Added padding at the top to move legend down
+        self.side_frame.grid(row=0, column=self.board_geometry.cols, rowspan=self.board_geometry.rows + 4, sticky="ns", pady=(50, 0))  # Added padding at the top to move legend down
         legend_items = [("blue", "Player 1"), ("red", "Player 2"), ("#44463e", "Removed Token"), ("white", "Available Cell")]
         for color, text in legend_items:
             item_frame = tk.Frame(self.side_frame)
@@ -101,37 +161,51 @@ class IsolationGUI:
             text_label = tk.Label(item_frame, text=text, width=15)  # Set a consistent width
             text_label.pack(side=tk.LEFT, padx=5)
 
+        # Thinking indicator for AI turns
+        self.thinking_label = tk.Label(self.side_frame, text="", width=35, anchor="w")
+        self.thinking_label.pack(pady=5, padx=10, fill=tk.X)
+
         # Action Log
         self.action_log = tk.Listbox(self.side_frame, height=15, width=35)
         self.action_log.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
 
     def setup_board(self):
-        """Sets up the game board with cells (labels) for player moves."""
+        """Sets up the game board as one canvas with a rectangle per cell."""
+        size = IsolationGUI.CELL_SIZE
+        rows, cols = self.board_geometry.rows, self.board_geometry.cols
+        self.board_canvas = Canvas(self.master, width=cols * size, height=rows * size, highlightthickness=0)
+        self.board_canvas.grid(row=1, column=0, rowspan=rows, columnspan=cols)  # Offset by 1 to account for Player 1 dropdown
+        self.board_canvas.bind("<Button-1>", self.handle_cell_click)
+
         # Create the game board
         self.cells = []
-        for i in range(8):
+        for i in range(rows):
             row = []
-            for j in range(6):
-                cell = tk.Label(self.master, width=10, height=4, bg="white", relief="ridge")
-                cell.grid(row=i+1, column=j)  # Offset by 1 to account for Player 1 dropdown
-                cell.bind("<Button-1>", self.handle_cell_click)
+            for j in range(cols):
+                cell = self.board_canvas.create_rectangle(j * size, i * size, (j + 1) * size, (i + 1) * size,
+                                                          fill=IsolationGUI.EMPTY_COLOR, outline="#a4a6a0")
                 row.append(cell)
             self.cells.append(row)
 
+        # What the canvas currently shows, so redraws only touch cells that changed
+        self.drawn_removed = 0
+        self.drawn_positions = ()
+
     def setup_buttons(self):
         """Sets up the Start and Restart buttons below the game board."""
         # Start and Restart buttons
         self.start_button = tk.Button(self.master, text="Start", command=self.start_game)
-        self.start_button.grid(row=11, column=0, columnspan=3)
+        row, half = self.board_geometry.rows + 3, self.board_geometry.cols // 2
+        self.start_button.grid(row=row, column=0, columnspan=half)
         self.restart_button = tk.Button(self.master, text="Restart", command=self.restart_game, state="disabled")
-        self.restart_button.grid(row=11, column=3, columnspan=3)
+        self.restart_button.grid(row=row, column=half, columnspan=self.board_geometry.cols - half)
 
     def setup_logger(self):
         """Sets up the logging mechanism to send log messages to the action log."""
-        handler = ListboxHandler(self.action_log)
+        self.log_handler = ListboxHandler(self.action_log)
         formatter = logging.Formatter('%(message)s')
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        self.log_handler.setFormatter(formatter)
+        logger.addHandler(self.log_handler)
 
     def setup_bindings(self):
         """Binds keyboard keys to specific actions (e.g., "Escape" to close confetti)."""
@@ -152,26 +226,41 @@ class IsolationGUI:
 
     def refresh_board(self):
         """Refreshes the GUI board to reflect the current game state."""
-        for i in range(8):
-            for j in range(6):
-                cell_value = self.game.board[i][j]
-                if cell_value == 0:
-                    self.cells[i][j].config(bg="white")  # Empty cell
-                elif cell_value == -1:
-                    self.cells[i][j].config(bg="#44463e")   # Removed token
-                elif isinstance(cell_value, Player):
-                    if cell_value == self.game.players[0]:
-                        self.cells[i][j].config(bg="blue")   # Player 1
-                    else:
-                        self.cells[i][j].config(bg="red")    # Player 2
+        bitboard = self.game.bitboard
+        self.draw_board(bitboard.removed, tuple(bitboard.positions))
+
+    def draw_board(self, removed, positions):
+        """Recolors only the cells whose contents differ from what the canvas shows.
+
+        Args:
+            removed (int): Mask of removed tokens.
+            positions (tuple): Square of each player.
+        """
+        changed = removed ^ self.drawn_removed
+        for sq in self.drawn_positions + positions:
+            changed |= 1 << sq
+        for sq in iter_squares(changed):
+            if sq in positions:
+                color = IsolationGUI.PLAYER_COLORS[positions.index(sq)]
+            elif removed >> sq & 1:
+                color = IsolationGUI.REMOVED_COLOR
+            else:
+                color = IsolationGUI.EMPTY_COLOR
+            row, col = self.board_geometry.coords(sq)
+            self.board_canvas.itemconfig(self.cells[row][col], fill=color)
+        self.drawn_removed = removed
+        self.drawn_positions = positions
 
     def handle_cell_click(self, event):
         """Handles cell click events to make moves or remove tokens."""
-        logger.info("handle_cell_click invoked")
-        if self.game and self.game.is_game_over():
+        if self.game is None or self.game_over:
             return  # If the game is over, don't process any clicks
-        
-        row, col = event.widget.grid_info()["row"] - 1, event.widget.grid_info()["column"]  # Offset row by 1
+        if self.search_player is not None:
+            return  # The board belongs to the AI while it is thinking
+
+        row, col = event.y // IsolationGUI.CELL_SIZE, event.x // IsolationGUI.CELL_SIZE
+        if not self.board_geometry.contains(row, col):
+            return
         current_player = self.game.players[self.game.current_player_index]
 
         if not self.game.awaiting_token_removal:
@@ -194,45 +283,107 @@ class IsolationGUI:
 
         if self.game.is_game_over():
             self.display_game_over_message()
+            return
 
         next_player = self.game.players[self.game.current_player_index]
-        if isinstance(next_player, ComputerPlayer):
-            self.master.after(1000, self.execute_computer_turn)  # Start the computer's turn after a 1-second delay
+        if isinstance(next_player, IsolationGUI.AI_PLAYERS):
+            self.computer_turn_id = self.master.after(1000, self.execute_computer_turn)  # Start the computer's turn after a 1-second delay
 
     def execute_computer_turn(self):
-        """Executes the computer player's turn."""
-        # Check if the game is over
-        if self.game.is_game_over():
-            self.display_game_over_message()
-            return
-
+        """Starts the computer player's search in a worker thread and polls for its result."""
         # Get the current player
         current_player = self.game.players[self.game.current_player_index]
 
         # If the current player is a computer
-        if isinstance(current_player, ComputerPlayer):
-            if not self.game.awaiting_token_removal:
-                # Get a move from the computer and make it
-                move = current_player.choose_move(self.game)
-                if move:
-                    row, col = move
-                    self.game.make_move(current_player, row, col)
+        if isinstance(current_player, IsolationGUI.AI_PLAYERS):
+            # The search works on a copy so the board can be redrawn while it runs
+            game_copy = self.game.copy()
+            choose = current_player.choose_token_to_remove if game_copy.awaiting_token_removal else current_player.choose_move
+            results = queue.Queue()
+
+            def search():
+                # An exception is handed over as the result, otherwise the poll would wait for one forever
+                try:
+                    results.put(choose(game_copy))
+                except Exception as error:
+                    results.put(error)
+
+            worker = threading.Thread(target=search, daemon=True)
+            self.search_player = current_player
+            self.search_start_time = time.time()
+            worker.start()
+            self.computer_turn_id = self.master.after(IsolationGUI.SEARCH_POLL_INTERVAL, self.poll_computer_turn, results)
+
+    def poll_computer_turn(self, results):
+        """Applies the result of the running AI search once it is ready, otherwise updates the thinking indicator."""
+        self.log_handler.flush()
+        current_player = self.search_player
+        try:
+            choice = results.get_nowait()
+        except queue.Empty:
+            self.update_thinking_indicator(current_player)
+            self.computer_turn_id = self.master.after(IsolationGUI.SEARCH_POLL_INTERVAL, self.poll_computer_turn, results)
+            return
+        self.search_player = None
+        self.thinking_label.config(text="")
+
+        if isinstance(choice, Exception):
+            self.abort_game(current_player, choice)
+            return
+
+        if not self.game.awaiting_token_removal:
+            # Make the move the computer chose
+            if choice:
+                row, col = choice
+                self.game.make_move(current_player, row, col)
+        else:
+            # Execute the token removal the computer chose
+            if choice:
+                row, col = choice
+                self.game.remove_token(row, col)
+                self.game.current_player_index ^= 1  # Only toggle the player after token removal
+                if isinstance(self.game.players[self.game.current_player_index], HumanPlayer):
+                    current_player.ponder(self.game)  # Keep thinking while the human decides
+
+        # Refresh the board state in the GUI
+        self.refresh_board()
+        self.update_turn_indicator()
+
+        if self.game.is_game_over():
+            self.display_game_over_message()
+            return
+
+        # If the next player is also a computer, call this method again after a short delay
+        next_player = self.game.players[self.game.current_player_index]
+        if isinstance(next_player, IsolationGUI.AI_PLAYERS):
+            self.computer_turn_id = self.master.after(IsolationGUI.COMPUTER_TURN_DELAY, self.execute_computer_turn)
+
+    def abort_game(self, player, error):
+        """Ends a game whose AI player failed with an error, and gives the controls back for a new game."""
+        traceback.print_exception(type(error), error, error.__traceback__)
+        action = "token removal" if self.game.awaiting_token_removal else "move"
+        logger.error(f"{player.name} failed to choose a {action}: {error!r}")
+        self.log_handler.flush()
+        self.game_over = True  # Ignore clicks on the board until the next game
+        for game_player in self.game.players:
+            if isinstance(game_player, ComputerPlayer):
+                game_player.close()
             else:
-                # Get a token removal choice from the computer and execute it
-                token_removal = current_player.choose_token_to_remove(self.game)
-                if token_removal:
-                    row, col = token_removal
-                    self.game.remove_token(row, col)
-                    self.game.current_player_index ^= 1  # Only toggle the player after token removal
-
-            # Refresh the board state in the GUI
-            self.refresh_board()
-            self.update_turn_indicator()
-
-            # If the next player is also a computer, call this method again after a short delay
-            next_player = self.game.players[self.game.current_player_index]
-            if isinstance(next_player, ComputerPlayer):
-                self.computer_turn_id = self.master.after(IsolationGUI.COMPUTER_TURN_DELAY, self.execute_computer_turn)
+                game_player.stop_pondering()
+        self.player1_dropdown.config(state="readonly")
+        self.player2_dropdown.config(state="readonly")
+        self.start_button.config(state="normal")
+        messagebox.showerror("Isolation Game", f"{player.name} failed to choose a {action}:\n{error}")
+
+    def update_thinking_indicator(self, player):
+        """Shows which AI player is thinking, for how long, and its best move so far."""
+        elapsed = time.time() - self.search_start_time
+        text = f"{player.name} is thinking... {elapsed:.1f}s"
+        if self.game.awaiting_token_removal:
+            text += ", choosing a token"
+        elif getattr(player, 'search_depth', 0) and player.principal_variation:
+            text += f", depth {player.search_depth}, best {player.principal_variation[0]}"
+        self.thinking_label.config(text=text)
 
     def shake_window(self):
         """Shakes the main window as feedback for an invalid action."""
@@ -253,10 +404,17 @@ class IsolationGUI:
         self.start_time = time.time()
 
         # Initialize the game with the selected players
-        player1_class = HumanPlayer if self.player1_var.get() == "Human" else ComputerPlayer
-        player2_class = HumanPlayer if self.player2_var.get() == "Human" else ComputerPlayer
+        player1_class = IsolationGUI.PLAYER_TYPES[self.player1_var.get()]
+        player2_class = IsolationGUI.PLAYER_TYPES[self.player2_var.get()]
 
-        self.game = Isolation(player1_class("Player 1"), player2_class("Player 2"))
+        self.game = Isolation(player1_class("Player 1"), player2_class("Player 2"),
+                              self.board_geometry.rows, self.board_geometry.cols)
+        self.game_over = False
+
+        # Computer players think on a human opponent's time; against another engine they would only slow it down
+        for player, opponent in zip(self.game.players, reversed(self.game.players)):
+            if isinstance(player, ComputerPlayer) and isinstance(opponent, HumanPlayer):
+                player.pondering = True
 
         # Randomize the starting player
         self.game.current_player_index = random.choice([0, 1])
@@ -277,34 +435,54 @@ class IsolationGUI:
         logger.info(f"Game started. {self.game.players[self.game.current_player_index].name} goes first.")
 
         starting_player = self.game.players[self.game.current_player_index]
-        if isinstance(starting_player, ComputerPlayer):
-            self.master.after(1000, self.execute_computer_turn)  # Start the computer's turn after a 1-second delay
+        if isinstance(starting_player, IsolationGUI.AI_PLAYERS):
+            self.computer_turn_id = self.master.after(1000, self.execute_computer_turn)  # Start the computer's turn after a 1-second delay
+        else:
+            self.game.players[1 - self.game.current_player_index].ponder(self.game)
 
     def restart_game(self):
         """Restarts the game, resetting the board and game-related variables."""
+        # Abandon a search that is still running, its result is never applied
+        self.cancel_search()
+
         # Reset the board and game-related variables
         self.game = None
-        for i in range(8):
-            for j in range(6):
-                self.cells[i][j].config(bg="white")
+        self.draw_board(0, ())
         self.player1_dropdown.config(state="readonly")
         self.player2_dropdown.config(state="readonly")
         self.start_button.config(state="normal")
         self.restart_button.config(state="disabled")
         # Remove the reference to self.turn_prompt as it's not defined in the current class
-        self.action_log.delete(0, tk.END)  # Clear the action log
+        self.log_handler.clear()  # Clear the action log, including messages from an abandoned search
 
+        # logging message
+        logger.info("Game restarted.")
+
+    def cancel_search(self):
+        """Stops polling the running AI search, asks it to return early, stops any pondering and shuts down worker pools."""
+        if self.search_player is not None:
+            self.search_player.stop()
+            self.search_player = None
+        if self.game is not None:
+            for player in self.game.players:
+                if isinstance(player, ComputerPlayer):
+                    player.close()  # Also stops pondering
+                else:
+                    player.stop_pondering()
         if hasattr(self, 'computer_turn_id'):
             self.master.after_cancel(self.computer_turn_id)
+        self.thinking_label.config(text="")
 
-        # logging message
-        logger.info("Game restarted.")
+    def close(self):
+        """Stops any AI search and its worker processes, then closes the window."""
+        self.cancel_search()
+        self.master.destroy()
 
     def display_confetti(self):
         """Displays confetti animation when the game is over."""
         # Create a canvas overlaying the entire game board
         self.confetti_canvas = tk.Canvas(self.master, width=self.master.winfo_width(), height=self.master.winfo_height(), bd=0, highlightthickness=0)
-        self.confetti_canvas.grid(row=0, column=0, rowspan=12, columnspan=7)
+        self.confetti_canvas.grid(row=0, column=0, rowspan=self.board_geometry.rows + 4, columnspan=self.board_geometry.cols + 1)
 
         # Create confetti (small rectangles)
         self.confetti_pieces = []
@@ -342,6 +520,10 @@ class IsolationGUI:
 
     def display_game_over_message(self):
         """Displays the game over message and statistics on the board."""
+        self.game_over = True
+        for player in self.game.players:
+            player.stop_pondering()
+
         # Create confetti canvas
         self.display_confetti()
 
@@ -364,10 +546,10 @@ class IsolationGUI:
 
         # Add the game statistics below the game over message
         stats_text = (
-            f"Moves made by {self.game.players[0].name}: {self.game.moves_by_player[self.game.players[0]]}\n"
-            f"Moves made by {self.game.players[1].name}: {self.game.moves_by_player[self.game.players[1]]}\n"
-            f"Tokens Removed by {self.game.players[0].name}: {self.game.tokens_removed_by_player[self.game.players[0]]}\n"
-            f"Tokens Removed by {self.game.players[1].name}: {self.game.tokens_removed_by_player[self.game.players[1]]}"
+            f"Moves made by {self.game.players[0].name}: {self.game.move_counts[0]}\n"
+            f"Moves made by {self.game.players[1].name}: {self.game.move_counts[1]}\n"
+            f"Tokens Removed by {self.game.players[0].name}: {self.game.removal_counts[0]}\n"
+            f"Tokens Removed by {self.game.players[1].name}: {self.game.removal_counts[1]}"
         )
         self.confetti_canvas.create_text(self.master.winfo_width() / 2, self.master.winfo_height() / 2 + 30,  # Adjusted position for better spacing
                                         text=stats_text, font=('Arial', 14), fill='black')
@@ -1,111 +1,201 @@
 import time
-import copy
 import logging
+import itertools
 from .player import ComputerPlayer
+from .bitboard import BitBoard, ROWS, COLS, geometry, iter_squares
 logger = logging.getLogger("IsolationGameLogger")
 
+# Kinds of undo records pushed by apply_move and apply_token_removal
+UNDO_MOVE = 0
+UNDO_REMOVAL = 1
+
+# Source of Isolation.game_id
+_game_ids = itertools.count(1)
+
 
 class Isolation:
     """Represents the Isolation game state.
 
+    The position itself (board, player squares, side to move and whether a
+    removal is pending) lives in ``bitboard``, which is what the search works
+    on; ``board`` and ``player_positions`` are views over it kept for callers
+    that want the list-of-lists layout. The game statistics are kept here,
+    outside the position, and only the real moves made through ``make_move``
+    and ``remove_token`` count towards them.
+
     Attributes:
-        board (list[list[int]]): The game board.
+        bitboard (BitBoard): Packed removed tokens, player squares and side to move.
         players (list[Player]): The list of players.
-        current_player_index (int): Index of the current player.
+        game_id (int): Identifies the game; copies share it, so players can tell a new game from a later position of this one.
         start_time (float): The start time of the game.
-        player_positions (dict): Current positions of the players.
-        awaiting_token_removal (bool): If True, the game is waiting for a token removal action.
-        tokens_removed_by_player (dict): Count of tokens removed by each player.
-        moves_by_player (dict): Count of moves made by each player.
+        move_counts (list[int]): Count of moves made by each player, indexed like ``players``.
+        removal_counts (list[int]): Count of tokens removed by each player, indexed like ``players``.
+        start_squares (tuple): Starting square of each player.
+        history (list[tuple]): ``(player index, move square, removal square)`` of every turn played,
+            the removal None until it is made.
+        undo_stack (list[tuple]): Records of the in-place actions that ``undo`` can revert.
     """
-    def __init__(self, player1, player2):
-        """Initializes the game board and players."""
-        self.board = [[0 for _ in range(6)] for _ in range(8)]  # 0 represents available cell
+    def __init__(self, player1, player2, rows=ROWS, cols=COLS, start_squares=None):
+        """Initializes the game board and players.
+
+        Args:
+            rows (int): Number of board rows.
+            cols (int): Number of board columns.
+            start_squares (tuple): (row, col) of each player's starting square,
+                defaults to the middle of the top and bottom rows.
+        """
         self.players = [player1, player2]
-        self.current_player_index = 0
+        self.game_id = next(_game_ids)
         self.start_time = None
 
         # Initial positions for the players
-        self.player_positions = {
-            self.players[0]: (0, 3),
-            self.players[1]: (7, 2)
-        }
-
-        self.update_board_with_players()
-        self.awaiting_token_removal = False
-
-        # Initialize the count of tokens removed by each player
-        self.tokens_removed_by_player = {player1: 0, player2: 0}
-        self.moves_by_player = {self.players[0]: 0, self.players[1]: 0}
+        board_geometry = geometry(rows, cols)
+        if start_squares is None:
+            positions = board_geometry.start_squares
+        else:
+            positions = [board_geometry.square(*start) for start in start_squares]
+        self.bitboard = BitBoard(positions, geometry=board_geometry)
+        self.start_squares = tuple(positions)
+        self.history = []
+
+        # Initialize the count of moves made and tokens removed by each player
+        self.move_counts = [0, 0]
+        self.removal_counts = [0, 0]
+        self.undo_stack = []
+
+    @property
+    def current_player_index(self):
+        """int: Index of the current player."""
+        return self.bitboard.to_move
+
+    @current_player_index.setter
+    def current_player_index(self, index):
+        self.bitboard.to_move = index
+
+    @property
+    def awaiting_token_removal(self):
+        """bool: If True, the game is waiting for a token removal action."""
+        return self.bitboard.awaiting_removal
+
+    @awaiting_token_removal.setter
+    def awaiting_token_removal(self, awaiting):
+        self.bitboard.awaiting_removal = awaiting
+
+    @property
+    def moves_by_player(self):
+        """dict: Count of moves made by each player."""
+        return dict(zip(self.players, self.move_counts))
+
+    @property
+    def tokens_removed_by_player(self):
+        """dict: Count of tokens removed by each player."""
+        return dict(zip(self.players, self.removal_counts))
+
+    @property
+    def geometry(self):
+        """Geometry: Size and precomputed tables of the board."""
+        return self.bitboard.geometry
+
+    @property
+    def board(self):
+        """list[list]: The board as rows of 0 (available), -1 (removed) or the occupying Player."""
+        coords = self.bitboard.geometry.coords
+        board = [[0] * self.geometry.cols for _ in range(self.geometry.rows)]
+        for sq in iter_squares(self.bitboard.removed):
+            row, col = coords(sq)
+            board[row][col] = -1
+        for player, sq in zip(self.players, self.bitboard.positions):
+            row, col = coords(sq)
+            board[row][col] = player
+        return board
+
+    @property
+    def player_positions(self):
+        """dict: Current (row, col) position of each player."""
+        coords = self.bitboard.geometry.coords
+        return {player: coords(sq) for player, sq in zip(self.players, self.bitboard.positions)}
+
+    def player_index(self, player):
+        """Returns the index of the given player in ``players``.
+
+        Raises:
+            ValueError: If the player is not playing this game.
+        """
+        if player is self.players[0]:
+            return 0
+        if player is self.players[1]:
+            return 1
+        raise ValueError(f"{player!r} is not a player of this game")
 
     def get_cell_value(self, row, col):
         """Returns the value of a cell at the given row and column."""
-        return self.board[row][col]
+        sq = self.bitboard.geometry.square(row, col)
+        if self.bitboard.removed >> sq & 1:
+            return -1
+        for player, position in zip(self.players, self.bitboard.positions):
+            if position == sq:
+                return player
+        return 0
 
     def set_cell_value(self, row, col, value):
         """Sets the value of a cell at the given row and column."""
-        self.board[row][col] = value
+        sq = self.bitboard.geometry.square(row, col)
+        if value == -1:
+            if not self.bitboard.removed >> sq & 1:
+                self.bitboard.remove(sq)
+        elif value == 0:
+            if self.bitboard.removed >> sq & 1:
+                self.bitboard.restore(sq)
+        else:
+            self.bitboard.move(self.player_index(value), sq)
 
     def get_player_position(self, player):
         """Returns the current position of the given player."""
-        # print("Player positions keys:", self.player_positions.keys())  # Debugging statement
-        return self.player_positions[player]
+        return self.bitboard.geometry.coords(self.bitboard.positions[self.player_index(player)])
 
     def get_available_moves(self, player):
         """Return a list of available moves for the given player."""
-        current_row, current_col = self.get_player_position(player)
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
-        valid_moves = [(current_row + dr, current_col + dc) for dr, dc in directions if self.is_valid_move(player, current_row + dr, current_col + dc)]
-        return valid_moves
+        coords = self.bitboard.geometry.coords
+        return [coords(sq) for sq in self.bitboard.move_squares(self.player_index(player))]
 
     def get_available_tokens_to_remove(self):
         """Return a list of available tokens to remove from the board."""
-        available_tokens = [(i, j) for i in range(8) for j in range(6) if self.is_valid_token_removal(i, j)]
-        return available_tokens
-
-    def update_board_with_players(self):
-        """Updates the board with the current positions of the players."""
-        for player, position in self.player_positions.items():
-            row, col = position
-            self.set_cell_value(row, col, player)
+        coords = self.bitboard.geometry.coords
+        return [coords(sq) for sq in iter_squares(self.bitboard.removable_mask())]
 
     def is_valid_move(self, player, row, col):
         """Checks if a move is valid for the given player to the specified row and column."""
         # Check if move is within board boundaries
-        if not (0 <= row < 8 and 0 <= col < 6):
+        board_geometry = self.bitboard.geometry
+        if not board_geometry.contains(row, col):
             return False
 
-        # Check if the cell is empty and not occupied by the other player or a removed token
-        if self.get_cell_value(row, col) != 0:
-            return False
-
-        # Check if the move is adjacent to the player's current position
-        current_row, current_col = self.get_player_position(player)
-        if abs(current_row - row) > 1 or abs(current_col - col) > 1:
-            return False
-
-        return True
+        # The move must be an adjacent square that is neither removed nor occupied
+        return bool(self.bitboard.moves_mask(self.player_index(player)) >> board_geometry.square(row, col) & 1)
+
+    def copy(self):
+        """Returns an independent copy of the game state that shares the player objects."""
+        game = Isolation.__new__(Isolation)
+        game.players = list(self.players)
+        game.game_id = self.game_id
+        game.start_time = self.start_time
+        game.bitboard = self.bitboard.copy()
+        game.move_counts = list(self.move_counts)
+        game.removal_counts = list(self.removal_counts)
+        game.start_squares = self.start_squares
+        game.history = list(self.history)
+        game.undo_stack = []  # The copy's history starts here
+        return game
 
     def mock_move(self, player, move):
         """Creates a mock game state after making a move without altering the actual game state."""
-        mock_game = copy.deepcopy(self)
-
-        # Ensure the copied game state refers to the same player objects as the original game state
-        mock_game.players[0] = self.players[0]
-        mock_game.players[1] = self.players[1]
-        mock_game.player_positions[self.players[0]] = self.player_positions[self.players[0]]
-        mock_game.player_positions[self.players[1]] = self.player_positions[self.players[1]]
-
-        mock_game.moves_by_player[self.players[0]] = self.moves_by_player[self.players[0]]
-        mock_game.moves_by_player[self.players[1]] = self.moves_by_player[self.players[1]]
-
+        mock_game = self.copy()
         mock_game.make_move(player, *move)
         
-        # Log the heuristic value for the move chosen
-        if isinstance(player, ComputerPlayer):
+        # Evaluating the move only serves the log, so skip it unless debug logging is on
+        if isinstance(player, ComputerPlayer) and logger.isEnabledFor(logging.DEBUG):
             heuristic_value = player.heuristic(mock_game, player)
-            # logging for checking evaluations of minimax
-            # logger.info(f"evaluated Move: {move} with Heuristic Value: {heuristic_value}")
+            logger.debug(f"evaluated Move: {move} with Heuristic Value: {heuristic_value}")
 
         return mock_game
 
@@ -114,34 +204,53 @@ class Isolation:
         if not self.is_valid_token_removal(row, col):
             return None
 
-        mock_game = copy.deepcopy(self)
-
-        # Ensure the copied game state refers to the same player objects as the original game state
-        mock_game.players[0] = self.players[0]
-        mock_game.players[1] = self.players[1]
-        mock_game.player_positions[self.players[0]] = self.player_positions[self.players[0]]
-        mock_game.player_positions[self.players[1]] = self.player_positions[self.players[1]]
-        
-        mock_game.moves_by_player[self.players[0]] = self.moves_by_player[self.players[0]]
-        mock_game.moves_by_player[self.players[1]] = self.moves_by_player[self.players[1]]
-
-        # Explicitly maintain other attributes
-        mock_game.awaiting_token_removal = self.awaiting_token_removal
-        mock_game.tokens_removed_by_player = self.tokens_removed_by_player.copy()
-
-        mock_game.board[row][col] = -1  # Represent a removed token with -1
+        mock_game = self.copy()
+        mock_game.bitboard.remove(mock_game.bitboard.geometry.square(row, col))
         
         return mock_game
 
+    def apply_move(self, player, move):
+        """Makes a move in place and records it so ``undo`` can revert it.
+
+        The move is assumed to be valid; search code only applies generated moves.
+        Only the position changes, the game statistics are left alone.
+        """
+        bitboard = self.bitboard
+        index = self.player_index(player)
+        self.undo_stack.append((UNDO_MOVE, index, bitboard.positions[index], bitboard.awaiting_removal))
+        bitboard.move(index, bitboard.geometry.square(*move))
+        bitboard.awaiting_removal = True
+
+    def apply_token_removal(self, row, col):
+        """Removes a token in place and records it so ``undo`` can revert it.
+
+        The removal is assumed to be valid; search code only applies generated removals.
+        Only the position changes, the game statistics are left alone.
+        """
+        bitboard = self.bitboard
+        sq = bitboard.geometry.square(row, col)
+        self.undo_stack.append((UNDO_REMOVAL, bitboard.to_move, sq, bitboard.awaiting_removal))
+        bitboard.remove(sq)
+        bitboard.awaiting_removal = False
+
+    def undo(self):
+        """Reverts the most recent ``apply_move`` or ``apply_token_removal``."""
+        kind, index, sq, awaiting_removal = self.undo_stack.pop()
+        if kind == UNDO_MOVE:
+            self.bitboard.move(index, sq)
+        else:
+            self.bitboard.restore(sq)
+        self.bitboard.awaiting_removal = awaiting_removal
+
     def make_move(self, player, row, col):
         """Makes a move for the given player to the specified row and column."""
         if self.is_valid_move(player, row, col):
-            old_row, old_col = self.get_player_position(player)
-            self.set_cell_value(old_row, old_col, 0)  # Reset the old cell
-            self.player_positions[player] = (row, col)
-            self.update_board_with_players()
+            index = self.player_index(player)
+            sq = self.bitboard.geometry.square(row, col)
+            self.bitboard.move(index, sq)
             self.awaiting_token_removal = True
-            self.moves_by_player[player] += 1
+            self.move_counts[index] += 1
+            self.history.append((index, sq, None))
             return True
         logger.warning(f"Invalid move attempted by {player.name} to ({row}, {col}).")
         return False
@@ -149,46 +258,39 @@ class Isolation:
     def is_valid_token_removal(self, row, col):
         """Checks if a token removal is valid at the specified row and column."""
         # Check if removal is within board boundaries
-        if not (0 <= row < 8 and 0 <= col < 6):
+        board_geometry = self.bitboard.geometry
+        if not board_geometry.contains(row, col):
             return False
 
-        # Get the cell value
-        cell_value = self.get_cell_value(row, col)
-
         # Check if the cell is not occupied by a player and has a token
-        if cell_value in self.players or cell_value == -1:
-            return False
-
-        return True
+        return not self.bitboard.blocked() >> board_geometry.square(row, col) & 1
 
     def remove_token(self, row, col):
         """Removes a token from the board at the specified row and column."""
         if self.is_valid_token_removal(row, col):
-            self.set_cell_value(row, col, -1)
+            sq = self.bitboard.geometry.square(row, col)
+            self.bitboard.remove(sq)
             self.awaiting_token_removal = False
-            current_player = self.players[self.current_player_index]
-            self.tokens_removed_by_player[current_player] += 1
+            self.removal_counts[self.current_player_index] += 1
+            if self.history and self.history[-1][2] is None:
+                self.history[-1] = self.history[-1][:2] + (sq,)
             return True
         logger.warning(f"Invalid token removal attempted at ({row}, {col}).")
         return False
 
     def display_stats(self):
         """Displays game statistics such as moves made and tokens removed by each player."""
-        logger.info(f"Moves made by {self.players[0].name}: {self.moves_by_player[self.players[0]]}")
-        logger.info(f"Moves made by {self.players[1].name}: {self.moves_by_player[self.players[1]]}")
-        logger.info(f"Tokens Removed by {self.players[0].name}: {self.tokens_removed_by_player[self.players[0]]}")
-        logger.info(f"Tokens Removed by {self.players[1].name}: {self.tokens_removed_by_player[self.players[1]]}")
+        logger.info(f"Moves made by {self.players[0].name}: {self.move_counts[0]}")
+        logger.info(f"Moves made by {self.players[1].name}: {self.move_counts[1]}")
+        logger.info(f"Tokens Removed by {self.players[0].name}: {self.removal_counts[0]}")
+        logger.info(f"Tokens Removed by {self.players[1].name}: {self.removal_counts[1]}")
         elapsed_time = time.time() - self.start_time
         logger.info(f"Time taken for the game: {elapsed_time:.2f} seconds")
 
     def is_game_over(self):
         """Checks if the game is over."""
         # Check if the current player can make any valid moves
-        current_player = self.players[self.current_player_index]
-        current_row, current_col = self.get_player_position(current_player)
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
-        for dr, dc in directions:
-            if self.is_valid_move(current_player, current_row + dr, current_col + dc):
-                return False
+        if self.bitboard.moves_mask(self.current_player_index):
+            return False
         logger.info("Game over!")
         return True
@@ -0,0 +1,104 @@
+"""Move ordering for the minimax search: killer moves, a history table and static mobility.
+
+Alpha-beta prunes the most when the best move is searched first. Past the
+transposition table's stored move, the search has three cheap guesses:
+
+- killer moves: the last two moves that caused a cutoff at the same ply,
+  which often refute the sibling positions too;
+- the history table: how much cutoff work every (from square, to square)
+  move has done anywhere in the tree, weighted by the depth of the cutoff;
+- static mobility: how many free neighbours the destination square has,
+  which is what most heuristics reward anyway.
+
+Moves are sorted by killer rank, then history, then mobility.
+"""
+
+from .bitboard import popcount
+
+
+class MoveOrdering:
+    """Orders the moves of a search node and learns from its cutoffs.
+
+    Killers are kept per ply from the search root, so they carry over from
+    one iteration of iterative deepening to the next at the same distance
+    from the root. Full-turn actions are ordered by their move square, with
+    whole (move, removal) actions as killers.
+
+    Attributes:
+        killers (bool): Try the killer moves of the ply first.
+        history (bool): Order by the history table.
+        mobility (bool): Order by the mobility of the destination square.
+    """
+
+    KILLERS_PER_PLY = 2
+
+    def __init__(self, killers=True, history=True, mobility=True):
+        """Initializes empty killer and history tables with the given orderings enabled."""
+        self.killers = killers
+        self.history = history
+        self.mobility = mobility
+        self._killers = {}
+        self._history = []
+        self._num_squares = 0
+
+    @property
+    def settings(self):
+        """tuple: The enabled orderings, enough to build an equivalent MoveOrdering."""
+        return self.killers, self.history, self.mobility
+
+    def _history_table(self, num_squares):
+        """Returns the history table, resized and cleared if the board size changed."""
+        if num_squares != self._num_squares:
+            self._history = [0] * (num_squares * num_squares)
+            self._num_squares = num_squares
+        return self._history
+
+    def order(self, actions, ply, bitboard, mover_index):
+        """Returns the actions of the mover sorted best guess first.
+
+        Args:
+            actions (list): Move squares, or (move, removal) pairs of squares.
+            ply (int): Distance of the node from the search root.
+            bitboard (BitBoard): The position the actions are played from.
+            mover_index (int): Index of the player to move.
+        """
+        killers = self._killers.get(ply, ()) if self.killers else ()
+        geometry = bitboard.geometry
+        history = self._history_table(geometry.num_squares) if self.history else None
+        origin = bitboard.positions[mover_index] * geometry.num_squares
+        neighbors = geometry.neighbors
+        # The square we leave becomes free again, so only the removed tokens and the opponent block us
+        free = ~(bitboard.removed | (1 << bitboard.positions[1 - mover_index]))
+        mobility = self.mobility
+
+        def key(action):
+            move = action if type(action) is int else action[0]
+            return (action in killers and len(killers) - killers.index(action),
+                    history[origin + move] if history is not None else 0,
+                    popcount(neighbors[move] & free) if mobility else 0)
+
+        return sorted(actions, key=key, reverse=True)
+
+    def cutoff(self, action, ply, depth, bitboard, mover_index):
+        """Records that the action caused a cutoff at a node with the given ply and remaining depth."""
+        if self.killers:
+            killers = self._killers.setdefault(ply, [])
+            if action in killers:
+                killers.remove(action)
+            killers.insert(0, action)
+            del killers[self.KILLERS_PER_PLY:]
+        if self.history:
+            geometry = bitboard.geometry
+            move = action if type(action) is int else action[0]
+            history = self._history_table(geometry.num_squares)
+            history[bitboard.positions[mover_index] * geometry.num_squares + move] += depth * depth
+
+    def new_search(self):
+        """Prepares for a new search: forgets the killers and halves the history so recent cutoffs weigh more."""
+        self._killers.clear()
+        self._history = [value >> 1 for value in self._history]
+
+    def clear(self):
+        """Forgets every killer move and history score."""
+        self._killers.clear()
+        self._history = [0] * len(self._history)
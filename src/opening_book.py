@@ -0,0 +1,219 @@
+"""Precomputed opening book stored in a memory-mapped binary file.
+
+Every game starts from the same two squares, so the first turns can be
+searched once, offline and deeply, instead of at the start of every game.
+
+File layout (little-endian):
+    header: magic ``b"ISOBOOK3"``, uint32 entry count, uint16 board rows,
+            uint16 board columns
+    entries: uint64 position key, uint16 move square, uint16 removal square,
+             sorted by key
+
+The position key is the board's Zobrist key XOR ``ZOBRIST_SIDE`` of the
+player to move. Opening a book only reads the header, lookups binary-search
+the memory map, and every process that opens the same file shares its pages.
+A book only answers for games on the board size it was built for.
+
+Usage:
+    python -m src.opening_book book.bin --turns 3 --replies 6 --time-limit 2 --workers 8 [--rows 8 --cols 6]
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from .bitboard import ROWS, COLS, ZOBRIST_SIDE
+logger = logging.getLogger("IsolationGameLogger")
+
+MAGIC = b"ISOBOOK3"
+HEADER = struct.Struct("<8sIHH")
+ENTRY = struct.Struct("<QHH")
+KEY = struct.Struct("<Q")
+
+
+def fits(rows, cols):
+    """Returns whether a book can be built for a ``rows`` x ``cols`` board."""
+    return rows * cols <= 1 << 16
+
+
+def position_key(bitboard, mover_index):
+    """Returns the book key of the board with the given player to move."""
+    return bitboard.key ^ ZOBRIST_SIDE[mover_index]
+
+
+class OpeningBook:
+    """Read-only view of an opening book file.
+
+    Attributes:
+        path (str): Path of the book file.
+        rows (int): Number of rows of the board the book was built for.
+        cols (int): Number of columns of the board the book was built for.
+    """
+
+    def __init__(self, path):
+        """Opens and memory-maps the book file."""
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self.rows, self.cols = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an opening book file.")
+
+    def __len__(self):
+        """Returns the number of positions in the book."""
+        return self._count
+
+    def lookup(self, key):
+        """Returns the (move square, removal square) stored for the key, or None."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * ENTRY.size
+            middle_key = KEY.unpack_from(self._map, offset)[0]
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                _, move, removal = ENTRY.unpack_from(self._map, offset)
+                return move, removal
+        return None
+
+    def probe(self, game_state, player):
+        """Returns the book (move, removal) for the player to move, as (row, col) tuples, or None."""
+        board_geometry = game_state.bitboard.geometry
+        if (board_geometry.rows, board_geometry.cols) != (self.rows, self.cols):
+            return None
+        index = game_state.player_index(player)
+        entry = self.lookup(position_key(game_state.bitboard, index))
+        if entry is None or entry[0] not in game_state.bitboard.move_squares(index):
+            return None
+        return board_geometry.coords(entry[0]), board_geometry.coords(entry[1])
+
+    def close(self):
+        """Releases the memory map and the file."""
+        self._map.close()
+        self._file.close()
+
+    def __getstate__(self):
+        """Pickles the book as its path; the receiving process maps the file itself."""
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        """Reopens the book from its path."""
+        self.__init__(state["path"])
+
+
+def write_book(path, entries, rows=ROWS, cols=COLS):
+    """Writes a book file from a dict of position key to (move square, removal square)."""
+    with open(path, "wb") as book:
+        book.write(HEADER.pack(MAGIC, len(entries), rows, cols))
+        for key in sorted(entries):
+            move, removal = entries[key]
+            book.write(ENTRY.pack(key, move, removal))
+
+
+def _search_position(board, time_limit, replies):
+    """Process pool entry point: searches one position over full turns for the player to move.
+
+    Returns:
+        list[tuple]: The best ``replies`` (move, removal) actions, best first, or an empty list if the mover is stuck.
+    """
+    from .isolation import Isolation  # Imported here, the player module imports this one
+    from .player import ComputerPlayer, HumanPlayer
+
+    player = ComputerPlayer("Book", time_limit=time_limit, search_removals=True)
+    opponent = HumanPlayer("Opponent")
+    mover_index = board.to_move
+    game = Isolation(player, opponent) if mover_index == 0 else Isolation(opponent, player)
+    game.bitboard = board
+
+    actions = board.turn_actions(mover_index)
+    if not actions:
+        return []
+    iterations = player._iterative_deepening(game, actions, time.time(), time_limit, max_depth=ComputerPlayer.DEPTH)
+    if not iterations:
+        return actions[:1]
+    _, best, _, scores, _ = iterations[-1]
+    ranked = sorted(scores, key=lambda action: (action == best, scores[action]), reverse=True)
+    return ranked[:replies]
+
+
+def build_book(path, turns=3, replies=6, time_limit=2.0, workers=1, rows=ROWS, cols=COLS):
+    """Searches the opening positions of a ``rows`` x ``cols`` board and writes them to a book file.
+
+    Starting from the initial position with either player to move, every
+    position is searched over full turns and its best action is stored. The
+    ``replies`` best actions are then played out to reach the positions of
+    the next turn, down to ``turns`` turns from the start.
+
+    Returns:
+        int: The number of positions written.
+
+    Raises:
+        ValueError: If the board is too large for the book's square fields.
+    """
+    from .isolation import Isolation
+    from .player import HumanPlayer
+
+    # Checked up front, rather than when writing after the whole search
+    if not fits(rows, cols):
+        raise ValueError(f"A {rows}x{cols} board is too large for an opening book.")
+
+    frontier = {}
+    for mover in (0, 1):
+        start = Isolation(HumanPlayer("Player 1"), HumanPlayer("Player 2"), rows, cols).bitboard
+        start.to_move = mover
+        frontier[position_key(start, mover)] = start
+    entries = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for turn in range(turns):
+            positions = [board for key, board in frontier.items() if key not in entries]
+            results = executor.map(_search_position, positions, [time_limit] * len(positions), [replies] * len(positions))
+            next_frontier = {}
+            for board, ranked in zip(positions, results):
+                if not ranked:
+                    continue
+                mover = board.to_move
+                entries[position_key(board, mover)] = ranked[0]
+                for move, removal in ranked:
+                    child = board.copy()
+                    child.move(mover, move)
+                    child.remove(removal)
+                    child.to_move = 1 - mover
+                    next_frontier[position_key(child, 1 - mover)] = child
+            logger.info(f"Turn {turn + 1}: {len(positions)} positions searched, {len(entries)} in the book.")
+            frontier = next_frontier
+
+    write_book(path, entries, rows, cols)
+    return len(entries)
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Build an Isolation opening book.")
+    parser.add_argument("output", help="Book file to write.")
+    parser.add_argument("--turns", type=int, default=3, help="Number of turns from the start to cover.")
+    parser.add_argument("--replies", type=int, default=6, help="Best actions followed from every position.")
+    parser.add_argument("--time-limit", type=float, default=2.0, help="Seconds of search per position.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes.")
+    parser.add_argument("--rows", type=int, default=ROWS, help="Number of board rows.")
+    parser.add_argument("--cols", type=int, default=COLS, help="Number of board columns.")
+    args = parser.parse_args(argv)
+    if not fits(args.rows, args.cols):
+        parser.error(f"a {args.rows}x{args.cols} board is too large for an opening book")
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    count = build_book(args.output, args.turns, args.replies, args.time_limit, args.workers, args.rows, args.cols)
+    print(f"Wrote {count} positions to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
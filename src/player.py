@@ -1,6 +1,20 @@
+import json
+import math
 import time
 import random
 import logging
+import threading
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait
+from .bitboard import ZOBRIST_SIDE, ZOBRIST_FULL_TURN, popcount, iter_squares
+from .transposition import TranspositionTable, EXACT, LOWER, UPPER
+from .evaluation_cache import EvaluationCache
+from .move_ordering import MoveOrdering
+from . import vectorized
+from . import endgame
+from .opening_book import OpeningBook
+from .tablebase import Tablebase
 logger = logging.getLogger("IsolationGameLogger")
 
 from abc import ABC, abstractmethod
@@ -15,6 +29,19 @@ class Player(ABC):
     def __init__(self, name):
         """Initializes the player with a name."""
         self.name = name
+        self._stop_requested = False
+
+    def stop(self):
+        """Asks a search running in another thread to return its best move so far."""
+        self._stop_requested = True
+
+    def ponder(self, game_state):
+        """Starts thinking on the opponent's time, with the opponent to move; players that don't ponder ignore it."""
+        pass
+
+    def stop_pondering(self):
+        """Stops thinking started by ``ponder``."""
+        pass
 
     @abstractmethod
     def choose_move(self, game_state):
@@ -41,105 +68,1089 @@ class HumanPlayer(Player):
         """Logic for the human player to choose a token to remove."""
         pass
 
+class SearchTimeout(Exception):
+    """Raised inside the search when the move deadline has passed."""
+    pass
+
+class SearchStats:
+    """Statistics of one move or token removal decision of a ComputerPlayer.
+
+    Attributes:
+        source (str): How the decision was made: "search", "book", "tablebase", "forced" (one legal move),
+            "no_moves", "random", "endgame", "plan" or "heuristic".
+        depth (int): Depth of the last completed iteration.
+        nodes (int): Nodes visited.
+        cutoffs (int): Alpha-beta cutoffs.
+        tt_probes (int): Transposition table probes.
+        tt_hits (int): Transposition table probes that found an entry.
+        eval_hits (int): Heuristic values found in the evaluation cache.
+        eval_misses (int): Heuristic values that had to be computed.
+        elapsed (float): Seconds spent on the decision.
+        ponder_depth (int): Depth the position was already searched to while pondering, 0 if it wasn't.
+        iterations (list[dict]): One dict per completed iteration with its depth,
+            nodes, cutoffs, elapsed seconds, best action and value.
+    """
+
+    def __init__(self, source="search"):
+        """Initializes empty statistics for a decision made by ``source``."""
+        self.source = source
+        self.depth = 0
+        self.nodes = 0
+        self.cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.eval_hits = 0
+        self.eval_misses = 0
+        self.elapsed = 0.0
+        self.ponder_depth = 0
+        self.iterations = []
+
+    @property
+    def nps(self):
+        """Nodes searched per second."""
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def cutoff_rate(self):
+        """Fraction of nodes that ended in a cutoff."""
+        return self.cutoffs / self.nodes if self.nodes else 0.0
+
+    def as_dict(self):
+        """Returns the statistics as a JSON-friendly dict."""
+        return {
+            "source": self.source,
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "cutoffs": self.cutoffs,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "eval_hits": self.eval_hits,
+            "eval_misses": self.eval_misses,
+            "elapsed": self.elapsed,
+            "nps": self.nps,
+            "ponder_depth": self.ponder_depth,
+            "iterations": list(self.iterations),
+        }
+
+    def __str__(self):
+        """Returns a one-line summary."""
+        summary = (f"{self.source}: depth {self.depth}, {self.nodes} nodes in {self.elapsed:.3f}s "
+                   f"({self.nps:.0f} nps), {self.cutoff_rate:.1%} cutoffs")
+        if self.ponder_depth:
+            summary += f", pondered to depth {self.ponder_depth}"
+        return summary
+
 class ComputerPlayer(Player):
     """Represents a computer player in the Isolation game using Minimax and heuristics.
 
     Attributes:
-        DEPTH (int): Search depth for Minimax algorithm.
-        heuristic (func): Heuristic function to evaluate game states.
+        DEPTH (int): Maximum search depth for Minimax algorithm.
+        TIME_LIMIT (float): Default time budget per move, in seconds.
+        heuristic (func): Heuristic function to evaluate game states. Setting a different one clears the
+            transposition table and evaluation cache, whose scores were computed with the old one.
+        time_limit (float): Time budget per move, in seconds.
+        aspiration_window (float): Half-width of the aspiration window, or None to always search the full window.
+        transposition_table (TranspositionTable): Table shared by every search of this player, or None.
+        tt_exact_depth (bool): If True, only table entries of exactly the remaining depth give scores and bounds.
+            By default deeper entries are used too, which saves nodes but makes the search return the deeper
+            result, so values and the chosen move can differ from plain alpha-beta at the same depth.
+        evaluation_cache (EvaluationCache): Cache of heuristic values shared by every search of this player, or None.
+        search_removals (bool): If True, search over full turns (move plus token removal) instead of moves only.
+        workers (int): Number of processes the root actions are split across; 1 searches in this process.
+        batch_evaluation (bool): If True and NumPy is installed, score all children of a frontier node in one batched call.
+        endgame_solver (bool): If True, solve positions where the players are walled off from each other exactly.
+        opening_book (OpeningBook): Book consulted before searching, or None.
+        tablebase (Tablebase): Endgame tablebase played from at the root and probed during the search, or None.
+        move_ordering (MoveOrdering): Killer, history and mobility ordering of interior nodes, or None for direction order.
+        pondering (bool): If True, ``ponder`` searches the opponent's likely turns while the opponent decides.
+        composite_weights (tuple): Mobility, center control and difference weights of composite_heuristic.
+        mobility_lambda (float): Weight of two-step mobility in the mobility heuristics.
+        removal_weights (tuple): Opponent distance, center distance, blocking and opponent move weights of
+            token_removal_heuristic.
+        on_iteration (func): Called with ``stats`` after every completed iteration, or None.
+        stats (SearchStats): Statistics of the last move or token removal decision.
+        principal_variation (list[tuple]): Expected line of play from the last completed iteration.
+        search_depth (int): Depth of the last completed iteration of the current or last search.
     """
 
     DEPTH = 7  # Default depth
+    TIME_LIMIT = 8.0  # Default seconds per move
+    TT_SIZE = 1 << 16  # Default number of transposition table buckets
+    EVAL_CACHE_SIZE = 1 << 16  # Default number of cached heuristic values
+    DEADLINE_CHECK_INTERVAL = 64  # Nodes between deadline checks, must be a power of two
+    STOP_POLL_INTERVAL = 0.05  # Seconds between checks for a stop request while the worker processes search
+    CENTER = None  # Square control_of_center_heuristic measures distance to, None for the board's center
+    MOBILITY_LAMBDA = 0.5  # Default weight of two-step mobility in enhanced_mobility_heuristic
+    COMPOSITE_WEIGHTS = (0.4, 0.3, 0.3)  # Default mobility, center control and difference weights of composite_heuristic
+    REMOVAL_WEIGHTS = (1.0, 1.0, 1.0, 1.0)  # Default weights of the token_removal_heuristic terms
+
+    # Names of the tunable weights, as used by ``weights``, ``set_weights`` and weight files
+    WEIGHT_NAMES = ("composite_mobility", "composite_center", "composite_difference", "mobility_lambda",
+                    "removal_opponent_distance", "removal_center_distance", "removal_blocking", "removal_opponent_moves")
+
+    # Batched counterparts of the heuristics, used to score all children of a frontier node at once
+    BATCHED_HEURISTICS = {
+        "aggressive_approach_heuristic": "_batched_aggressive_approach_heuristic",
+        "enhanced_mobility_heuristic": "_batched_enhanced_mobility_heuristic",
+        "enhanced_difference_heuristic": "_batched_enhanced_difference_heuristic",
+        "composite_heuristic": "_batched_composite_heuristic",
+    }
 
-    def __init__(self, name, heuristic=None):
-        """Initializes the computer player with a name and heuristic function."""
+    def __init__(self, name, heuristic=None, tt_size=TT_SIZE, time_limit=TIME_LIMIT, aspiration_window=None,
+                 search_removals=False, workers=1, batch_evaluation=False, endgame_solver=True, opening_book=None,
+                 on_iteration=None, eval_cache_size=EVAL_CACHE_SIZE, move_ordering=True, pondering=False, weights=None,
+                 tablebase=None, tt_exact_depth=False):
+        """Initializes the computer player with a name, heuristic function and search settings.
+
+        A ``tt_size`` or ``eval_cache_size`` of 0 disables the transposition
+        table or the evaluation cache. ``opening_book``
+        may be an ``OpeningBook`` or the path of a book file, and ``tablebase``
+        a ``Tablebase`` or the path of a tablebase file. ``move_ordering``
+        may be a bool or a ``MoveOrdering`` with only some orderings enabled.
+        ``weights`` may be a dict of heuristic weights or the path of a JSON
+        weight file, as written by ``src.tuning``; weights it leaves out keep their defaults.
+        """
         super().__init__(name)
-        self.heuristic = heuristic if heuristic else self.aggressive_approach_heuristic
+        self._heuristic = heuristic if heuristic else self.aggressive_approach_heuristic
+        self.time_limit = time_limit
+        self.aspiration_window = aspiration_window
+        self.tt_exact_depth = tt_exact_depth
+        self.search_removals = search_removals
+        self.workers = workers
+        self.batch_evaluation = batch_evaluation
+        self.endgame_solver = endgame_solver
+        self.opening_book = OpeningBook(opening_book) if isinstance(opening_book, str) else opening_book
+        self.tablebase = Tablebase(tablebase) if isinstance(tablebase, str) else tablebase
+        self.move_ordering = MoveOrdering() if move_ordering is True else move_ordering or None
+        self.pondering = pondering
+        self.composite_weights = self.COMPOSITE_WEIGHTS
+        self.mobility_lambda = self.MOBILITY_LAMBDA
+        self.removal_weights = self.REMOVAL_WEIGHTS
+        self.on_iteration = on_iteration
+        self.stats = SearchStats()
+        if batch_evaluation and not vectorized.AVAILABLE:
+            logger.warning("NumPy is not installed, falling back to per-position evaluation.")
+        self.transposition_table = TranspositionTable(tt_size) if tt_size else None
+        self.evaluation_cache = EvaluationCache(eval_cache_size) if eval_cache_size else None
+        self.principal_variation = []
+        self.search_depth = 0
+        self._tt_index = None  # Seat the table's scores were computed for
+        self._game_id = None  # Isolation.game_id of the game the tables were filled in
+        self._deadline = None
+        self._root_depth = 0  # Depth of the root of the running search, to tell the ply of a node
+        self._nodes = 0
+        self._cutoffs = 0
+        self._planned_removal = None  # (board key after our move, removal) from a full-turn search
+        self._last_line = None  # (turns played, principal variation) at the root of the last search
+        self._executor = None
+        self._executor_cancel = None  # Event the worker processes check to abandon their search
+        self._cancel_event = None  # The pool's cancel event, in a worker process
+        self._batched_heuristic = None
+        self._ponder_thread = None
+        self._pondered = {}  # Board key of every anticipated position with us to move, to the depth it was searched to
+        if weights is not None:
+            self.set_weights(weights)
+
+    def stop(self):
+        """Asks a running search, including the worker processes' part of it, to return its best move so far."""
+        super().stop()
+        if self._executor_cancel is not None:
+            self._executor_cancel.set()
+
+    @property
+    def heuristic(self):
+        """func: Heuristic function to evaluate game states."""
+        return self._heuristic
+
+    @heuristic.setter
+    def heuristic(self, heuristic):
+        # Stored scores and bounds came from the old heuristic
+        if heuristic != self._heuristic:
+            self._heuristic = heuristic
+            self._clear_scores()
+
+    @property
+    def weights(self):
+        """dict: The tunable heuristic weights, keyed by the names in ``WEIGHT_NAMES``."""
+        return dict(zip(self.WEIGHT_NAMES, self.composite_weights + (self.mobility_lambda,) + self.removal_weights))
+
+    def set_weights(self, weights):
+        """Sets heuristic weights from a dict or the path of a JSON weight file.
+
+        Weights left out keep their current values. Cached evaluations and
+        transposition table scores were computed with the old weights, so
+        both are cleared.
+
+        Raises:
+            ValueError: If a weight name is not one of ``WEIGHT_NAMES``.
+        """
+        if isinstance(weights, str):
+            with open(weights) as file:
+                weights = json.load(file)
+        unknown = set(weights) - set(self.WEIGHT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown heuristic weights: {', '.join(sorted(unknown))}.")
+        values = self.weights
+        values.update((name, float(value)) for name, value in weights.items())
+        values = tuple(values[name] for name in self.WEIGHT_NAMES)
+        self.composite_weights, self.mobility_lambda, self.removal_weights = values[:3], values[3], values[4:]
+        self._clear_scores()
+
+    def _clear_scores(self):
+        """Clears the evaluation cache and transposition table, after a change to what the heuristic computes."""
+        if self.evaluation_cache is not None:
+            self.evaluation_cache.clear()
+        if self.transposition_table is not None:
+            self.transposition_table.clear()
+
+    def board_center(self, geometry):
+        """Returns the (row, col) the center heuristics measure distance to on a board of the given geometry."""
+        return self.CENTER if self.CENTER is not None else geometry.center
+
+    def evaluate(self, game_state):
+        """Returns the heuristic value of the position for this player, from the evaluation cache when it has it.
+
+        Replacing ``heuristic`` or changing its weights with ``set_weights`` clears the cache.
+        """
+        cache = self.evaluation_cache
+        if cache is None:
+            return self.heuristic(game_state, self)
+        key = (self.heuristic, game_state.bitboard.key ^ ZOBRIST_SIDE[game_state.player_index(self)])
+        value = cache.get(key)
+        if value is None:
+            value = self.heuristic(game_state, self)
+            cache.put(key, value)
+        return value
 
     def minimax(self, game_state, depth, alpha, beta, maximizing_player):
-        """Implements the Minimax algorithm with Alpha-Beta pruning."""
+        """Implements the Minimax algorithm with Alpha-Beta pruning.
+
+        Raises:
+            SearchTimeout: If a deadline is set and has passed. Moves applied
+                below the caller are left on the undo stack.
+        """
+        self._nodes += 1
+        if self._deadline is not None and not self._nodes & (self.DEADLINE_CHECK_INTERVAL - 1):
+            if self._stop_requested or time.time() >= self._deadline or \
+                    (self._cancel_event is not None and self._cancel_event.is_set()):
+                raise SearchTimeout()
+
         # Base case: terminal state or depth reached
         if depth == 0:
-            return self.heuristic(game_state, self)
+            return self.evaluate(game_state)
 
         # Check for terminal state
-        opponent = game_state.players[1 - game_state.current_player_index]
-        available_moves = game_state.get_available_moves(self if maximizing_player else opponent)
+        bitboard = game_state.bitboard
+        our_index = game_state.player_index(self)
+        mover_index = our_index if maximizing_player else 1 - our_index
+        available_moves = bitboard.move_squares(mover_index)
         
         if not available_moves:
             # If we're not at the maximum depth and there are no valid moves, this is a bad state.
             if depth != ComputerPlayer.DEPTH:
                 return float("-inf") if maximizing_player else float("inf")
-            return self.heuristic(game_state, self)
+            return self.evaluate(game_state)
+
+        # With few open cells left the tablebase knows the result
+        if self.tablebase is not None:
+            result = self.tablebase.probe(bitboard, mover_index, bitboard.awaiting_removal)
+            if result is not None:
+                return float('inf') if result[0] == (mover_index == our_index) else float('-inf')
+
+        # Once the players are walled off from each other the result can be solved exactly
+        if depth >= 2 and self.endgame_solver:
+            winner = endgame.solve(bitboard, mover_index, bitboard.awaiting_removal)
+            if winner is not None:
+                return float('inf') if winner == our_index else float('-inf')
+
+        # Score every child of a frontier node in one batched call
+        if depth == 1 and self._batched_heuristic is not None:
+            other_square = [bitboard.positions[1 - mover_index]] * len(available_moves)
+            if maximizing_player:
+                return self._batched_heuristic(bitboard.removed, available_moves, other_square, bitboard.geometry).max().item()
+            return self._batched_heuristic(bitboard.removed, other_square, available_moves, bitboard.geometry).min().item()
+
+        # Probe the transposition table before ordering and expanding; deeper entries answer too unless tt_exact_depth is set
+        table = self.transposition_table
+        table_move = None
+        if table is not None:
+            key = bitboard.key ^ ZOBRIST_SIDE[mover_index]
+            entry = table.probe(key)
+            if entry is not None:
+                _, entry_depth, score, bound, table_move = entry
+                if entry_depth == depth or (entry_depth > depth and not self.tt_exact_depth):
+                    if bound == EXACT:
+                        return score
+                    if bound == LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if beta <= alpha:
+                        return score
+
+        ply = self._root_depth - depth
+        ordering = self.move_ordering
+        if ordering is not None and len(available_moves) > 1:
+            available_moves = ordering.order(available_moves, ply, bitboard, mover_index)
+        # Search the stored best move first
+        if table_move in available_moves:
+            available_moves.remove(table_move)
+            available_moves.insert(0, table_move)
+        original_alpha, original_beta = alpha, beta
+        best_move = None
+
+        coords = bitboard.geometry.coords
 
         # Max player's turn (Computer)
         if maximizing_player:
             max_eval = float('-inf')
             for move in available_moves:
-                mock_game_state = game_state.mock_move(self, move)
-                eval = self.minimax(mock_game_state, depth-1, alpha, beta, False)
-                max_eval = max(max_eval, eval)
+                game_state.apply_move(self, coords(move))
+                eval = self.minimax(game_state, depth-1, alpha, beta, False)
+                game_state.undo()
+                if eval > max_eval or best_move is None:
+                    max_eval, best_move = eval, move
                 alpha = max(alpha, eval)
                 if beta <= alpha:
+                    self._cutoffs += 1
+                    if ordering is not None:
+                        ordering.cutoff(move, ply, depth, bitboard, mover_index)
                     break
-            return max_eval
+            value = max_eval
         # Min player's turn (Opponent)
         else:
+            opponent = game_state.players[mover_index]
             min_eval = float('inf')
             for move in available_moves:
-                mock_game_state = game_state.mock_move(opponent, move)
-                eval = self.minimax(mock_game_state, depth-1, alpha, beta, True)
-                min_eval = min(min_eval, eval)
+                game_state.apply_move(opponent, coords(move))
+                eval = self.minimax(game_state, depth-1, alpha, beta, True)
+                game_state.undo()
+                if eval < min_eval or best_move is None:
+                    min_eval, best_move = eval, move
                 beta = min(beta, eval)
                 if beta <= alpha:
+                    self._cutoffs += 1
+                    if ordering is not None:
+                        ordering.cutoff(move, ply, depth, bitboard, mover_index)
                     break
-            return min_eval
+            value = min_eval
 
-    def choose_move(self, game_state):
-        """Chooses the best move for the computer player based on Minimax."""
+        if table is not None:
+            if value <= original_alpha:
+                bound = UPPER
+            elif value >= original_beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            table.store(key, depth, value, bound, best_move)
+        return value
+
+    def turn_minimax(self, game_state, depth, alpha, beta, maximizing_player):
+        """Minimax with Alpha-Beta pruning over full turns, a move followed by a token removal.
+
+        Removals are limited to ``BitBoard.removal_candidates`` so the branching
+        factor stays close to that of the move-only search. Depth counts turns.
+
+        Raises:
+            SearchTimeout: If a deadline is set and has passed. Actions applied
+                below the caller are left on the undo stack.
+        """
+        self._nodes += 1
+        if self._deadline is not None and not self._nodes & (self.DEADLINE_CHECK_INTERVAL - 1):
+            if self._stop_requested or time.time() >= self._deadline or \
+                    (self._cancel_event is not None and self._cancel_event.is_set()):
+                raise SearchTimeout()
+
+        if depth == 0:
+            return self.evaluate(game_state)
+
+        bitboard = game_state.bitboard
+        our_index = game_state.player_index(self)
+        mover_index = our_index if maximizing_player else 1 - our_index
+        actions = bitboard.turn_actions(mover_index)
+
+        # The side to move is stuck, so it has lost
+        if not actions:
+            return float("-inf") if maximizing_player else float("inf")
+
+        # With few open cells left the tablebase knows the result
+        if self.tablebase is not None:
+            result = self.tablebase.probe(bitboard, mover_index)
+            if result is not None:
+                return float('inf') if result[0] == (mover_index == our_index) else float('-inf')
+
+        # Once the players are walled off from each other the result can be solved exactly
+        if depth >= 2 and self.endgame_solver:
+            winner = endgame.solve(bitboard, mover_index)
+            if winner is not None:
+                return float('inf') if winner == our_index else float('-inf')
+
+        table = self.transposition_table
+        table_action = None
+        if table is not None:
+            key = bitboard.key ^ ZOBRIST_SIDE[mover_index] ^ ZOBRIST_FULL_TURN
+            entry = table.probe(key)
+            if entry is not None:
+                _, entry_depth, score, bound, table_action = entry
+                if entry_depth == depth or (entry_depth > depth and not self.tt_exact_depth):
+                    if bound == EXACT:
+                        return score
+                    if bound == LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if beta <= alpha:
+                        return score
+
+        ply = self._root_depth - depth
+        ordering = self.move_ordering
+        if ordering is not None and len(actions) > 1:
+            actions = ordering.order(actions, ply, bitboard, mover_index)
+        if table_action in actions:
+            actions.remove(table_action)
+            actions.insert(0, table_action)
+        original_alpha, original_beta = alpha, beta
+        best_action = None
+
+        mover = game_state.players[mover_index]
+        coords = bitboard.geometry.coords
+        value = float('-inf') if maximizing_player else float('inf')
+        for move, removal in actions:
+            game_state.apply_move(mover, coords(move))
+            game_state.apply_token_removal(*coords(removal))
+            eval = self.turn_minimax(game_state, depth-1, alpha, beta, not maximizing_player)
+            game_state.undo()
+            game_state.undo()
+            if maximizing_player:
+                if eval > value or best_action is None:
+                    value, best_action = eval, (move, removal)
+                alpha = max(alpha, eval)
+            else:
+                if eval < value or best_action is None:
+                    value, best_action = eval, (move, removal)
+                beta = min(beta, eval)
+            if beta <= alpha:
+                self._cutoffs += 1
+                if ordering is not None:
+                    ordering.cutoff((move, removal), ply, depth, bitboard, mover_index)
+                break
+
+        if table is not None:
+            if value <= original_alpha:
+                bound = UPPER
+            elif value >= original_beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            table.store(key, depth, value, bound, best_action)
+        return value
+
+    def choose_move(self, game_state, time_limit=None):
+        """Chooses the best move for the computer player using iterative-deepening Minimax.
+
+        Each iteration searches one ply deeper, trying the previous iteration's
+        best move first and the rest by their previous scores. The first
+        iteration starts from the best move the transposition table kept for
+        the position, or else from the move the last search's principal
+        variation expects if the game has followed it. If the time
+        budget runs out mid-iteration the search is abandoned and the best move
+        of the last completed iteration is played. With ``search_removals`` the
+        search runs over full turns and the removal it chose is kept for
+        ``choose_token_to_remove``. With ``workers`` above 1 the root actions
+        are split across a process pool. Positions found in the opening book
+        are played from the book, and positions the tablebase covers from the
+        tablebase, without searching. Statistics of the
+        decision are left in ``stats``.
+
+        Args:
+            game_state (Isolation): The game to choose a move in. It is searched in place and restored.
+            time_limit (float): Seconds allowed for this move, defaults to ``self.time_limit``.
+        """
         start_time = time.time()
-        time_limit = 8.0  # Adjust as necessary
+        time_limit = self.time_limit if time_limit is None else time_limit
+        self.stop_pondering()
+        self._follow_game(game_state)
+        self._planned_removal = None
+        last_line, self._last_line = self._last_line, None
+        self._stop_requested = False
+        self.search_depth = 0
+        self.stats = SearchStats("forced")
 
         valid_moves = game_state.get_available_moves(self)
-        if len(valid_moves) == 1:
+        if len(valid_moves) == 1 and not self.search_removals:
+            self.principal_variation = list(valid_moves)
+            self.stats.elapsed = time.time() - start_time
             return valid_moves[0]
+        if not valid_moves:
+            self.stats.source = "no_moves"
+            self.stats.elapsed = time.time() - start_time
+            return None
 
-        best_move = None
-        best_value = float('-inf')
-        alpha = float('-inf')
-        beta = float('inf')
+        if self.opening_book is not None:
+            book_action = self.opening_book.probe(game_state, self)
+            if book_action is not None:
+                best_move, removal = book_action
+                game_state.apply_move(self, best_move)
+                self._planned_removal = (game_state.bitboard.key, removal)
+                game_state.undo()
+                self.principal_variation = [book_action if self.search_removals else best_move]
+                self.stats = SearchStats("book")
+                self.stats.elapsed = time.time() - start_time
+                logger.info(f"{self.name} chooses book move: {best_move}")
+                return best_move
 
-        for depth in range(1, ComputerPlayer.DEPTH + 1):
-            for move in valid_moves:
-                mock_game_state = game_state.mock_move(self, move)
-                move_value = self.minimax(mock_game_state, depth-1, alpha, beta, False)
+        if self.tablebase is not None:
+            our_index = game_state.player_index(self)
+            tablebase_action = self.tablebase.best_action(game_state.bitboard, our_index)
+            if tablebase_action is not None:
+                coords = game_state.bitboard.geometry.coords
+                best_move, removal = coords(tablebase_action[0]), coords(tablebase_action[1])
+                game_state.apply_move(self, best_move)
+                self._planned_removal = (game_state.bitboard.key, removal)
+                game_state.undo()
+                self.principal_variation = [(best_move, removal) if self.search_removals else best_move]
+                self.stats = SearchStats("tablebase")
+                self.stats.elapsed = time.time() - start_time
+                logger.info(f"{self.name} chooses tablebase move: {best_move}")
+                return best_move
 
-                if move_value > best_value:
-                    best_value = move_value
-                    best_move = move
+        our_index = game_state.player_index(self)
+        self._claim_transposition_table(our_index)
+        ponder_depth = self._pondered.get(game_state.bitboard.key, 0)
 
-                # Check if we've surpassed our time limit
-                if time.time() - start_time > time_limit:
-                    break
+        board_geometry = game_state.bitboard.geometry
+        if self.search_removals:
+            root_actions = game_state.bitboard.turn_actions(our_index)
+        else:
+            root_actions = [board_geometry.square(*move) for move in valid_moves]
+        expected = self._expected_action(game_state, last_line, root_actions)
+        if expected is not None:
+            root_actions.remove(expected)
+            root_actions.insert(0, expected)
 
-            if time.time() - start_time > time_limit:
-                break
+        if self.workers > 1 and len(root_actions) > 1:
+            iterations = self._parallel_iterative_deepening(game_state, root_actions, start_time, time_limit)
+        else:
+            iterations = self._iterative_deepening(game_state, root_actions, start_time, time_limit)
 
-        if best_move is None:
+        if not iterations:
             best_move = random.choice(valid_moves)
+            self.stats.source = "random"
+        else:
+            _, best_action, _, _, self.principal_variation = iterations[-1]
+            self._last_line = (len(game_state.history), self.principal_variation)
+            if self.search_removals:
+                move, removal = best_action
+                best_move = board_geometry.coords(move)
+                # Remember the removal along with the board it was planned for
+                game_state.apply_move(self, best_move)
+                self._planned_removal = (game_state.bitboard.key, board_geometry.coords(removal))
+                game_state.undo()
+            else:
+                best_move = board_geometry.coords(best_action)
+
+        self.stats.elapsed = time.time() - start_time
+        self.stats.ponder_depth = ponder_depth
 
         # Log the chosen move
         logger.info(f"{self.name} chooses move: {best_move}")
+        logger.debug(f"{self.name} {self.stats}")
 
         return best_move
 
+    def search_fixed_depth(self, game_state, depth):
+        """Searches the position to a fixed depth with the full window and no time limit.
+
+        The player to move maximizes if it is this player and minimizes
+        otherwise; with ``search_removals`` depth counts full turns. The
+        transposition table, evaluation cache and move ordering tables are
+        used and updated as in ``choose_move``, so callers that need repeatable
+        searches, like the benchmarks, turn them off or clear them.
+
+        Args:
+            game_state (Isolation): The game to search. It is searched in place and restored.
+            depth (int): Plies, or turns with ``search_removals``, to search.
+
+        Returns:
+            tuple: The value of the position for this player and the number of nodes visited.
+        """
+        our_index = game_state.player_index(self)
+        self._claim_transposition_table(our_index)
+        self._resolve_batched_heuristic()
+        self._nodes = self._cutoffs = 0
+        self._root_depth = depth
+        search = self.turn_minimax if self.search_removals else self.minimax
+        value = search(game_state, depth, float('-inf'), float('inf'), game_state.current_player_index == our_index)
+        return value, self._nodes
+
+    def _expected_action(self, game_state, last_line, root_actions):
+        """Returns the root action the last search's principal variation expects, if the game has followed it.
+
+        The line starts with our action at the last search's root and goes on
+        with the opponent's expected reply. If both turns were played as
+        expected, its third action is the best guess for this root. Move-only
+        searches never reach the actual position, whose removals they leave
+        out, so this is how their principal variation carries over; only the
+        moves of the line have to match then.
+
+        Args:
+            last_line (tuple): Turns played and principal variation at the last search's root, or None.
+            root_actions (list): The actions of this root.
+        """
+        if last_line is None:
+            return None
+        turns, line = last_line
+        played = game_state.history[turns:]
+        if len(played) != 2 or len(line) < 3:
+            return None
+        square = game_state.bitboard.geometry.square
+        for (_, move, removal), expected in zip(played, line):
+            if self.search_removals:
+                if (square(*expected[0]), square(*expected[1])) != (move, removal):
+                    return None
+            elif square(*expected) != move:
+                return None
+        action = line[2]
+        action = (square(*action[0]), square(*action[1])) if self.search_removals else square(*action)
+        return action if action in root_actions else None
+
+    def _iterative_deepening(self, game_state, root_actions, start_time, time_limit, max_depth=None, stop_on_loss=True):
+        """Searches the root actions one ply deeper at a time until the depth or time budget runs out.
+
+        Starts a new ``stats`` and records every completed iteration in it. If
+        an earlier search or pondering already went through the root, the
+        best action the transposition table kept for it is tried first.
+
+        Returns:
+            list[tuple]: One ``(depth, best action, value, scores, principal variation)``
+            tuple per completed iteration, shallowest first.
+        """
+        max_depth = ComputerPlayer.DEPTH if max_depth is None else max_depth
+        self._resolve_batched_heuristic()
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+        root_actions = list(root_actions)
+        iterations = []
+        scores = {}
+        best_action = None
+        best_value = None
+        undo_mark = len(game_state.undo_stack)
+        self._deadline = start_time + time_limit
+
+        stats = self.stats = SearchStats()
+        table = self.transposition_table
+        tt_probes, tt_hits = (table.probes, table.hits) if table is not None else (0, 0)
+        if table is not None:
+            key = game_state.bitboard.key ^ ZOBRIST_SIDE[game_state.player_index(self)]
+            entry = table.probe(key ^ ZOBRIST_FULL_TURN if self.search_removals else key)
+            if entry is not None and entry[4] in root_actions:
+                best_action = entry[4]
+        cache = self.evaluation_cache
+        eval_hits, eval_misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+        self._nodes = self._cutoffs = 0
+        iteration_start, iteration_nodes, iteration_cutoffs = time.time(), 0, 0
+
+        try:
+            for depth in range(1, max_depth + 1):
+                # Previous best action first, then the rest by their previous scores
+                root_actions.sort(key=lambda action: (action == best_action, scores.get(action, float('-inf'))), reverse=True)
+                try:
+                    action, value, scores = self._search_root(game_state, root_actions, depth, best_value)
+                except SearchTimeout:
+                    # Unwind whatever the aborted search left applied
+                    while len(game_state.undo_stack) > undo_mark:
+                        game_state.undo()
+                    break
+
+                best_action, best_value = action, value
+                iterations.append((depth, action, value, scores, self._principal_variation(game_state, action, depth)))
+                # Progress for observers in other threads
+                self.search_depth, self.principal_variation = depth, iterations[-1][4]
+
+                now = time.time()
+                stats.depth = depth
+                stats.iterations.append({
+                    "depth": depth,
+                    "nodes": self._nodes - iteration_nodes,
+                    "cutoffs": self._cutoffs - iteration_cutoffs,
+                    "elapsed": now - iteration_start,
+                    "best": iterations[-1][4][0] if iterations[-1][4] else None,
+                    "value": value,
+                })
+                iteration_start, iteration_nodes, iteration_cutoffs = now, self._nodes, self._cutoffs
+                if self.on_iteration is not None:
+                    self.on_iteration(stats)
+
+                # A forced win or loss will not change with more depth
+                if value == float('inf') or (stop_on_loss and value == float('-inf')):
+                    break
+
+                # The next iteration costs several times this one, so don't start one we can't finish
+                if time.time() - start_time > time_limit / 2:
+                    break
+        finally:
+            self._deadline = None
+            stats.nodes, stats.cutoffs = self._nodes, self._cutoffs
+            stats.elapsed = time.time() - start_time
+            if table is not None:
+                stats.tt_probes, stats.tt_hits = table.probes - tt_probes, table.hits - tt_hits
+            if cache is not None:
+                stats.eval_hits, stats.eval_misses = cache.hits - eval_hits, cache.misses - eval_misses
+        return iterations
+
+    def _resolve_batched_heuristic(self):
+        """Picks the batched counterpart of the heuristic, if batching is on and there is one."""
+        self._batched_heuristic = None
+        if self.batch_evaluation and vectorized.AVAILABLE and getattr(self.heuristic, '__self__', None) is self:
+            name = self.BATCHED_HEURISTICS.get(self.heuristic.__name__)
+            if name is not None:
+                self._batched_heuristic = getattr(self, name)
+
+    def _parallel_iterative_deepening(self, game_state, root_actions, start_time, time_limit):
+        """Runs ``_iterative_deepening`` on slices of the root actions in the worker pool and merges the results.
+
+        Workers receive the bitboard, which pickles as a few ints, rather than
+        pickled game and player objects. An iteration only counts once every worker has completed it.
+        The workers' statistics are summed into ``stats``, and ``on_iteration``
+        is called for the merged iterations once all workers have finished.
+        A ``stop`` sets the pool's cancel event, which ends the workers' searches early.
+        """
+        if self._executor is None:
+            self._executor_cancel = multiprocessing.Event()
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(self._executor_cancel,))
+        cancel = self._executor_cancel
+        cancel.clear()
+
+        our_index = game_state.player_index(self)
+        heuristic = self.heuristic
+        if getattr(heuristic, '__self__', None) is self:
+            heuristic = heuristic.__name__  # Bound heuristics are looked up again on the worker's player
+        settings = (self.transposition_table.size if self.transposition_table else 0, self.aspiration_window,
+                    self.search_removals, self.batch_evaluation, self.endgame_solver, ComputerPlayer.DEPTH,
+                    self.evaluation_cache.size if self.evaluation_cache else 0,
+                    self.move_ordering.settings if self.move_ordering else None,
+                    tuple(self.weights.values()), self.tablebase.path if self.tablebase else None, self.tt_exact_depth)
+        slices = [root_actions[i::self.workers] for i in range(self.workers) if root_actions[i::self.workers]]
+        futures = [self._executor.submit(_search_root_slice, game_state.bitboard, our_index, heuristic,
+                                         settings, actions, start_time, time_limit, game_state.game_id)
+                   for actions in slices]
+        # Wait in short steps, so a stop requested meanwhile still reaches the workers
+        pending = futures
+        while pending:
+            _, pending = wait(pending, timeout=self.STOP_POLL_INTERVAL)
+            if self._stop_requested:
+                cancel.set()
+        results, worker_stats = zip(*(future.result() for future in futures))
+
+        # A slice that is already decided would give the same answer at every greater depth
+        deepest = max(len(result) for result in results)
+        for result in results:
+            while result and len(result) < deepest and abs(result[-1][2]) == float('inf'):
+                result.append((len(result) + 1,) + result[-1][1:])
+
+        merged = []
+        for depth in range(min(len(result) for result in results)):
+            best = max((result[depth] for result in results), key=lambda iteration: iteration[2])
+            scores = {}
+            for result in results:
+                scores.update(result[depth][3])
+            merged.append((depth + 1, best[1], best[2], scores, best[4]))
+
+        stats = self.stats = SearchStats()
+        for worker in worker_stats:
+            stats.nodes += worker.nodes
+            stats.cutoffs += worker.cutoffs
+            stats.tt_probes += worker.tt_probes
+            stats.tt_hits += worker.tt_hits
+            stats.eval_hits += worker.eval_hits
+            stats.eval_misses += worker.eval_misses
+        stats.elapsed = time.time() - start_time
+        for depth, _, value, _, line in merged:
+            # Workers that were already decided stopped early and add nothing to deeper iterations
+            parts = [worker.iterations[depth - 1] for worker in worker_stats if len(worker.iterations) >= depth]
+            stats.depth = depth
+            stats.iterations.append({
+                "depth": depth,
+                "nodes": sum(part["nodes"] for part in parts),
+                "cutoffs": sum(part["cutoffs"] for part in parts),
+                "elapsed": max(part["elapsed"] for part in parts),
+                "best": line[0] if line else None,
+                "value": value,
+            })
+            if self.on_iteration is not None:
+                self.on_iteration(stats)
+        return merged
+
+    def new_game(self):
+        """Forgets what earlier searches learned, ready for a new game.
+
+        Clears the transposition table, cached evaluations, move ordering
+        tables, principal variation and planned removal. The search calls it
+        when it is handed a position from a different game, so it rarely
+        needs calling directly.
+        """
+        if self.transposition_table is not None:
+            self.transposition_table.clear()
+        if self.evaluation_cache is not None:
+            self.evaluation_cache.clear()
+        if self.move_ordering is not None:
+            self.move_ordering.clear()
+        self.principal_variation = []
+        self.search_depth = 0
+        self._planned_removal = None
+        self._last_line = None
+        self._pondered = {}
+
+    def _follow_game(self, game_state):
+        """Keeps what was learned while the game is the same one, and starts afresh when it is a new game.
+
+        The transposition table, evaluation cache and move ordering tables
+        carry over from move to move: the position actually reached was
+        usually part of the last search tree, which is bounded by the table
+        and cache sizes.
+        """
+        if game_state.game_id != self._game_id:
+            self.new_game()
+            self._game_id = game_state.game_id
+
+    def _claim_transposition_table(self, our_index):
+        """Clears the transposition table if its scores were computed for the other seat."""
+        # Stored scores are from the point of view of one seat, so drop them if ours changed
+        if self.transposition_table is not None and self._tt_index != our_index:
+            self.transposition_table.clear()
+            self._tt_index = our_index
+
+    def ponder(self, game_state):
+        """Starts searching our replies to the opponent's likely turns in a background thread.
+
+        Call it with the opponent to move. The anticipated positions are the
+        opponent's moves combined with the removals ``BitBoard.removal_candidates``
+        picks, which are the tokens around us; they are searched one depth at
+        a time, round robin, until ``stop_pondering`` or the next
+        ``choose_move`` stops the thread. What it finds stays in the
+        transposition table, evaluation cache and move ordering tables the
+        next search starts from. Does nothing unless ``pondering`` is set, or
+        with ``workers`` above 1, whose searches use the workers' own tables.
+        The thread shares the interpreter with the caller, so pondering
+        against an engine in the same process takes time from its search.
+        """
+        self.stop_pondering()
+        if not self.pondering or self.workers > 1 or game_state.awaiting_token_removal:
+            return
+        self._follow_game(game_state)
+        self._stop_requested = False
+        self._ponder_thread = threading.Thread(target=self._ponder, args=(game_state.copy(),), daemon=True)
+        self._ponder_thread.start()
+
+    def stop_pondering(self):
+        """Stops the pondering thread, if one is running, and waits for it to finish."""
+        thread = self._ponder_thread
+        if thread is None:
+            return
+        self._stop_requested = True
+        thread.join()
+        self._ponder_thread = None
+        self._stop_requested = False
+
+    def _ponder(self, game_state):
+        """Pondering thread: deepens the search of every anticipated position until stopped or at full depth.
+
+        Each depth visits the replies best for the opponent first, by the
+        values found at the previous depth.
+        """
+        our_index = game_state.player_index(self)
+        opponent = game_state.players[1 - our_index]
+        replies = game_state.bitboard.turn_actions(1 - our_index)
+        coords = game_state.bitboard.geometry.coords
+        self._pondered = {}
+        self._claim_transposition_table(our_index)
+        self._resolve_batched_heuristic()
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+        scores = {}
+        values = {}  # Our best value after each reply at the last depth searched
+        undo_mark = len(game_state.undo_stack)
+        self._deadline = float('inf')  # Only ``stop_pondering`` ends the search
+        try:
+            for depth in range(1, ComputerPlayer.DEPTH + 1):
+                # The replies that look best for the opponent are the likeliest, so they get deepened first
+                replies.sort(key=lambda reply: values.get(reply, float('inf')))
+                for move, removal in replies:
+                    game_state.apply_move(opponent, coords(move))
+                    game_state.apply_token_removal(*coords(removal))
+                    bitboard = game_state.bitboard
+                    if self.search_removals:
+                        root_actions = bitboard.turn_actions(our_index)
+                    else:
+                        root_actions = bitboard.move_squares(our_index)
+                    if root_actions:
+                        # Our best replies from the previous depth first
+                        previous = scores.get(bitboard.key, {})
+                        root_actions.sort(key=lambda action: previous.get(action, float('-inf')), reverse=True)
+                        _, values[move, removal], scores[bitboard.key] = self._search_root(game_state, root_actions, depth, None)
+                        self._pondered[bitboard.key] = depth
+                    else:
+                        values[move, removal] = float('-inf')
+                    game_state.undo()
+                    game_state.undo()
+        except SearchTimeout:
+            pass
+        finally:
+            while len(game_state.undo_stack) > undo_mark:
+                game_state.undo()
+            self._deadline = None
+
+    def close(self):
+        """Stops pondering and shuts down the worker pool, if one was started, ending any search it is running."""
+        self.stop_pondering()
+        if self._executor is not None:
+            self._executor_cancel.set()
+            self._executor.shutdown()
+            self._executor = self._executor_cancel = None
+
+    def __getstate__(self):
+        """Returns the picklable state, leaving out the worker pool, its cancel event and the pondering thread."""
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        state['_executor_cancel'] = None
+        state['_cancel_event'] = None
+        state['_ponder_thread'] = None
+        return state
+
+    def _search_root(self, game_state, root_actions, depth, guess):
+        """Searches the root actions to the given depth, using an aspiration window around ``guess`` if enabled.
+
+        Returns:
+            tuple: The best root action, its value and a dict of the value of every root action searched.
+        """
+        if self.aspiration_window is not None and guess is not None and abs(guess) != float('inf'):
+            alpha, beta = guess - self.aspiration_window, guess + self.aspiration_window
+            result = self._search_root_window(game_state, root_actions, depth, alpha, beta)
+            if alpha < result[1] < beta:
+                return result
+            # The value fell outside the window, so it is only a bound; search again in full
+        return self._search_root_window(game_state, root_actions, depth, float('-inf'), float('inf'))
+
+    def _search_root_window(self, game_state, root_actions, depth, alpha, beta):
+        """Searches the root actions in order within the (alpha, beta) window.
+
+        The result is stored in the transposition table under the root
+        position, so a later search of it, after pondering it or when it is
+        searched again, starts from its best action.
+        """
+        search = self.turn_minimax if self.search_removals else self.minimax
+        self._root_depth = depth
+        best_action = None
+        best_value = float('-inf')
+        scores = {}
+        for action in root_actions:
+            self._apply_action(game_state, self, action)
+            value = search(game_state, depth - 1, max(alpha, best_value), beta, False)
+            self._undo_action(game_state, action)
+            scores[action] = value
+            if value > best_value or best_action is None:
+                best_action, best_value = action, value
+            if best_value >= beta:
+                break
+
+        table = self.transposition_table
+        if table is not None and best_action is not None:
+            if best_value <= alpha:
+                bound = UPPER
+            elif best_value >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            key = game_state.bitboard.key ^ ZOBRIST_SIDE[game_state.player_index(self)]
+            table.store(key ^ ZOBRIST_FULL_TURN if self.search_removals else key, depth, best_value, bound, best_action)
+        return best_action, best_value, scores
+
+    def _apply_action(self, game_state, player, action):
+        """Applies a search action: a move square, or a (move, removal) pair of squares."""
+        coords = game_state.bitboard.geometry.coords
+        if self.search_removals:
+            move, removal = action
+            game_state.apply_move(player, coords(move))
+            game_state.apply_token_removal(*coords(removal))
+        else:
+            game_state.apply_move(player, coords(action))
+
+    def _undo_action(self, game_state, action):
+        """Reverts an action applied with ``_apply_action``."""
+        game_state.undo()
+        if self.search_removals:
+            game_state.undo()
+
+    def _principal_variation(self, game_state, first_action, depth):
+        """Follows the transposition table's best actions from the root to recover the expected line of play.
+
+        Moves are reported as (row, col) tuples, or as (move, removal) pairs of
+        them when searching full turns.
+        """
+        coords = game_state.bitboard.geometry.coords
+
+        def describe(action):
+            if self.search_removals:
+                return coords(action[0]), coords(action[1])
+            return coords(action)
+
+        our_index = game_state.player_index(self)
+        line = [describe(first_action)]
+        if self.transposition_table is None:
+            return line
+
+        salt = ZOBRIST_FULL_TURN if self.search_removals else 0
+        self._apply_action(game_state, self, first_action)
+        applied = [first_action]
+        mover_index = 1 - our_index
+        while len(applied) < depth:
+            bitboard = game_state.bitboard
+            entry = self.transposition_table.probe(bitboard.key ^ ZOBRIST_SIDE[mover_index] ^ salt)
+            legal = bitboard.turn_actions(mover_index) if self.search_removals else bitboard.move_squares(mover_index)
+            if entry is None or entry[4] not in legal:
+                break
+            line.append(describe(entry[4]))
+            self._apply_action(game_state, game_state.players[mover_index], entry[4])
+            applied.append(entry[4])
+            mover_index = 1 - mover_index
+        for action in reversed(applied):
+            self._undo_action(game_state, action)
+        return line
+
     def choose_token_to_remove(self, game_state):
-        """Choose a token to remove using the new heuristic."""
-        return self.token_removal_heuristic(game_state)
+        """Choose a token to remove, preferring a tablebase or exact endgame removal, then the one planned by a full-turn search.
+
+        Statistics of the decision are left in ``stats``.
+        """
+        start_time = time.time()
+        self.stop_pondering()
+        self._follow_game(game_state)
+        planned = self._planned_removal
+        self._planned_removal = None
+        token = None
+        if self.tablebase is not None:
+            removal = self.tablebase.best_removal(game_state.bitboard, game_state.player_index(self))
+            if removal is not None:
+                token, source = game_state.bitboard.geometry.coords(removal), "tablebase"
+        if token is None and self.endgame_solver:
+            removal = endgame.best_removal(game_state.bitboard, game_state.player_index(self))
+            if removal is not None:
+                token, source = game_state.bitboard.geometry.coords(removal), "endgame"
+        if token is None and planned is not None and planned[0] == game_state.bitboard.key \
+                and game_state.is_valid_token_removal(*planned[1]):
+            token, source = planned[1], "plan"
+        if token is None:
+            token, source = self.token_removal_heuristic(game_state), "heuristic"
+        else:
+            logger.info(f"{self.name} chose to remove a token at ({token}).")
+        self.stats = SearchStats(source)
+        self.stats.elapsed = time.time() - start_time
+        return token
 
     def composite_heuristic(self, game_state, player):
         """Combines multiple heuristics to evaluate the game state."""
-        w1, w2, w3 = 0.4, 0.3, 0.3  # These weights can be tuned
+        w1, w2, w3 = self.composite_weights  # Tuned with src.tuning
         
         mobility_score = w1 * self.enhanced_mobility_heuristic(game_state, player)
         center_control_score = w2 * self.control_of_center_heuristic(game_state, player)
@@ -149,100 +1160,497 @@ class ComputerPlayer(Player):
 
     def frontier_cells_heuristic(self, game_state, player):
         """Evaluates the game state based on the frontier cells around the player."""
-        # Compute the positions after the move
-        row, col = game_state.get_player_position(player)
-
-        # Define possible directions to check
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
-
-        non_empty_count = 0
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if 0 <= new_row < 8 and 0 <= new_col < 6 and game_state.get_cell_value(new_row, new_col) == 0:
-                non_empty_count += 1
-        return non_empty_count
+        bitboard = game_state.bitboard
+        position = bitboard.positions[game_state.player_index(player)]
+        return popcount(bitboard.geometry.neighbors[position] & ~bitboard.blocked())
 
     def aggressive_approach_heuristic(self, game_state, player):
         """Evaluates the game state based on the aggressive approach strategy."""
-        opponent = game_state.players[0] if player == game_state.players[1] else game_state.players[1]
-        our_valid_moves = game_state.get_available_moves(player)
-        opponent_valid_moves = game_state.get_available_moves(opponent)
-        return 2 * len(our_valid_moves) - len(opponent_valid_moves)
+        bitboard = game_state.bitboard
+        index = game_state.player_index(player)
+        return 2 * bitboard.mobility(index) - bitboard.mobility(1 - index)
 
     def enhanced_mobility_heuristic(self, game_state, player):
         """Evaluates the game state based on the mobility of the player."""
-        immediate_moves = game_state.get_available_moves(player)
-        lambda_factor = 0.5
-        future_mobility = sum([len(game_state.mock_move(player, move).get_available_moves(player)) for move in immediate_moves])
-        return len(immediate_moves) + lambda_factor * future_mobility
+        bitboard = game_state.bitboard
+        index = game_state.player_index(player)
+        lambda_factor = self.mobility_lambda
+        return bitboard.mobility(index) + lambda_factor * bitboard.future_mobility(index)
 
     def control_of_center_heuristic(self, game_state, player):
         """Evaluates the game state based on control of the center of the board."""
         row, col = game_state.get_player_position(player)
-        center_row, center_col = 4, 3
+        center_row, center_col = self.board_center(game_state.bitboard.geometry)
         distance_from_center = abs(center_row - row) + abs(center_col - col)
         return -distance_from_center  # We want to minimize this distance
 
     def enhanced_difference_heuristic(self, game_state, player):
         """Evaluates the game state based on the difference in valid moves."""
-        opponent = game_state.players[0] if player == game_state.players[1] else game_state.players[1]
+        bitboard = game_state.bitboard
+        index = game_state.player_index(player)
         
-        our_moves = len(game_state.get_available_moves(player))
-        opponent_moves = len(game_state.get_available_moves(opponent))
+        our_moves = bitboard.mobility(index)
+        opponent_moves = bitboard.mobility(1 - index)
         
-        our_future_mobility = sum([len(game_state.mock_move(player, move).get_available_moves(player)) for move in game_state.get_available_moves(player)])
-        opponent_future_mobility = sum([len(game_state.mock_move(opponent, move).get_available_moves(opponent)) for move in game_state.get_available_moves(opponent)])
+        our_future_mobility = bitboard.future_mobility(index)
+        opponent_future_mobility = bitboard.future_mobility(1 - index)
         
         return 2 * (our_moves - opponent_moves) + (our_future_mobility - opponent_future_mobility)
 
+    def _batched_aggressive_approach_heuristic(self, removed, our_squares, their_squares, geometry):
+        """Batched ``aggressive_approach_heuristic`` over positions sharing the removed tokens."""
+        our_mobility, their_mobility, _, _ = vectorized.mobility_features(removed, our_squares, their_squares, geometry)
+        return 2 * our_mobility - their_mobility
+
+    def _batched_enhanced_mobility_heuristic(self, removed, our_squares, their_squares, geometry):
+        """Batched ``enhanced_mobility_heuristic`` over positions sharing the removed tokens."""
+        our_mobility, _, our_future, _ = vectorized.mobility_features(removed, our_squares, their_squares, geometry)
+        return our_mobility + self.mobility_lambda * our_future
+
+    def _batched_enhanced_difference_heuristic(self, removed, our_squares, their_squares, geometry):
+        """Batched ``enhanced_difference_heuristic`` over positions sharing the removed tokens."""
+        our_mobility, their_mobility, our_future, their_future = vectorized.mobility_features(removed, our_squares, their_squares, geometry)
+        return 2 * (our_mobility - their_mobility) + (our_future - their_future)
+
+    def _batched_composite_heuristic(self, removed, our_squares, their_squares, geometry):
+        """Batched ``composite_heuristic`` over positions sharing the removed tokens."""
+        w1, w2, w3 = self.composite_weights
+        our_mobility, their_mobility, our_future, their_future = vectorized.mobility_features(removed, our_squares, their_squares, geometry)
+        mobility_score = w1 * (our_mobility + self.mobility_lambda * our_future)
+        center_control_score = w2 * -vectorized.center_distances(our_squares, self.board_center(geometry), geometry)
+        difference_score = w3 * (2 * (our_mobility - their_mobility) + (our_future - their_future))
+        return mobility_score + center_control_score + difference_score
+
     def token_removal_heuristic(self, game_state):
-        """Chooses a token to remove based on various factors and heuristics."""
-        available_tokens = game_state.get_available_tokens_to_remove()
-        if not available_tokens:
+        """Chooses a token to remove based on various factors and heuristics.
+
+        Every removable token is scored on its distance to the opponent and to
+        the center, the best frontier the opponent could reach after the
+        removal, how many of the opponent's moves it takes away, and a random
+        tie-breaker, weighted by ``removal_weights``. Everything is read from bitboard masks and distance
+        tables: an opponent move's free neighbours are counted once and a
+        token only ever lowers that count by one. With ``batch_evaluation``
+        and NumPy all tokens are scored in one vectorized pass.
+        """
+        bitboard = game_state.bitboard
+        tokens = list(iter_squares(bitboard.removable_mask()))
+        if not tokens:
             logger.warning("No valid tokens to remove.")
             return None
 
-        if len(available_tokens) == 1:
-            return available_tokens[0]
+        geometry = bitboard.geometry
+        if len(tokens) == 1:
+            return geometry.coords(tokens[0])
 
-        opponent = game_state.players[0] if self == game_state.players[1] else game_state.players[1]
-        our_position = game_state.get_player_position(self)
-        opponent_position = game_state.get_player_position(opponent)
+        neighbors = geometry.neighbors
+        our_index = game_state.player_index(self)
+        our_square = bitboard.positions[our_index]
+        their_square = bitboard.positions[1 - our_index]
+        center_square = geometry.square(*self.board_center(geometry))
+        token_factor = popcount(bitboard.blocked()) / geometry.num_squares
 
-        total_tokens = sum([1 for row in game_state.board for cell in row if cell != 0])
-        token_factor = total_tokens / (8 * 6)  # Assuming 8x6 is the board size
+        # Squares left open once the opponent moves off its square, and the
+        # free neighbours of each square it can move to, before any removal
+        open_after_move = geometry.full_mask & ~(bitboard.removed | 1 << our_square)
+        their_moves = neighbors[their_square] & open_after_move
+        frontiers = {move: popcount(neighbors[move] & open_after_move) for move in iter_squares(their_moves)}
+        noise = [random.uniform(0, 1) for _ in tokens]
 
-        scores = {}
-        for token in available_tokens:
-            score = 0
-
-            # Proximity to the opponent
-            distance_to_opponent = abs(opponent_position[0] - token[0]) + abs(opponent_position[1] - token[1])
-            score -= distance_to_opponent * token_factor
+        if self.batch_evaluation and vectorized.AVAILABLE:
+            scores = vectorized.token_removal_scores(tokens, their_square, center_square, token_factor, frontiers, noise,
+                                                     geometry, self.removal_weights)
+            best_token = tokens[int(scores.argmax())]
+        else:
+            to_opponent, to_center = geometry.distances[their_square], geometry.distances[center_square]
+            opponent_weight, center_weight, blocking_weight, moves_weight = self.removal_weights
+            best_token, best_score = None, None
+            for token, random_factor in zip(tokens, noise):
+                score = 0
 
-            # Proximity to the center
-            center_distance = abs(4 - token[0]) + abs(3 - token[1])
-            score -= center_distance * (1 - token_factor)
+                # Proximity to the opponent
+                score -= to_opponent[token] * token_factor * opponent_weight
 
-            # Predictive blocking (1 move ahead for now)
-            mock_game_state = game_state.mock_remove_token(*token)
-            opponent_best_move_value = max([self.frontier_cells_heuristic(mock_game_state.mock_move(opponent, move), opponent) for move in mock_game_state.get_available_moves(opponent)], default=0)
-            score -= opponent_best_move_value
+                # Proximity to the center
+                score -= to_center[token] * (1 - token_factor) * center_weight
 
-            # Effect on opponent's moves
-            opponent_moves_after_removal = len(mock_game_state.get_available_moves(opponent))
-            original_opponent_moves = len(game_state.get_available_moves(opponent))
-            move_difference = original_opponent_moves - opponent_moves_after_removal
-            score += move_difference
+                # Predictive blocking: the opponent's best frontier after the removal
+                opponent_best_move_value = 0
+                for move, frontier in frontiers.items():
+                    if move != token:
+                        opponent_best_move_value = max(opponent_best_move_value, frontier - (neighbors[move] >> token & 1))
+                score -= opponent_best_move_value * blocking_weight
 
-            # Random factor
-            score += random.uniform(0, 1)
+                # Effect on opponent's moves
+                score += (their_moves >> token & 1) * moves_weight
 
-            scores[token] = score
+                # Random factor
+                score += random_factor
 
-        best_token = max(scores, key=scores.get)
+                if best_score is None or score > best_score:
+                    best_token, best_score = token, score
 
-        
+        best_token = geometry.coords(best_token)
         self.previous_token = best_token
         logger.info(f"{self.name} chose to remove a token at ({best_token}).")
         return best_token
+
+# Searchers kept alive in each worker process so their transposition tables
+# carry over between moves, keyed by the heuristic and settings they search with
+_worker_players = {}
+
+# Event the parent sets to make the worker process abandon its search
+_worker_cancel = None
+
+def _init_worker(cancel):
+    """Process pool initializer: keeps the pool's cancel event for the worker's searches."""
+    global _worker_cancel
+    _worker_cancel = cancel
+
+def _search_root_slice(bitboard, our_index, heuristic, settings, root_actions, start_time, time_limit, game_id=None):
+    """Process pool entry point: iterative deepening over a slice of the root actions.
+
+    Args:
+        bitboard (BitBoard): The position to search.
+        our_index (int): Seat of the searching player.
+        heuristic: Name of a ComputerPlayer heuristic method, or a picklable heuristic function.
+        settings (tuple): Transposition table size, aspiration window, search_removals, batch_evaluation,
+            endgame_solver, maximum depth, evaluation cache size, move ordering settings, heuristic weights,
+            tablebase path and tt_exact_depth.
+        root_actions (list): The root actions this worker searches.
+        start_time (float): When the move's search started, as returned by ``time.time``.
+        time_limit (float): Seconds allowed for the move.
+        game_id (int): ``Isolation.game_id`` of the game, so the worker's tables are reset for a new game.
+
+    Returns:
+        tuple: The ``_iterative_deepening`` iterations and the worker's SearchStats.
+    """
+    from .isolation import Isolation  # Deferred, isolation imports this module
+
+    (tt_size, aspiration_window, search_removals, batch_evaluation, endgame_solver, max_depth, eval_cache_size,
+     ordering_settings, weights, tablebase, tt_exact_depth) = settings
+    # One searcher per heuristic, as stored scores only hold for the heuristic that computed them
+    player = _worker_players.get((heuristic, settings))
+    if player is None:
+        player = ComputerPlayer("Worker", tt_size=tt_size, aspiration_window=aspiration_window,
+                                search_removals=search_removals, batch_evaluation=batch_evaluation,
+                                endgame_solver=endgame_solver, eval_cache_size=eval_cache_size,
+                                move_ordering=MoveOrdering(*ordering_settings) if ordering_settings else False,
+                                weights=dict(zip(ComputerPlayer.WEIGHT_NAMES, weights)), tablebase=tablebase,
+                                tt_exact_depth=tt_exact_depth)
+        player.heuristic = getattr(player, heuristic) if isinstance(heuristic, str) else heuristic
+        _worker_players[heuristic, settings] = player
+    player._cancel_event = _worker_cancel
+    player._claim_transposition_table(our_index)
+
+    opponent = HumanPlayer("Opponent")
+    game = Isolation(player, opponent) if our_index == 0 else Isolation(opponent, player)
+    game.bitboard = bitboard
+    if game_id is not None:
+        game.game_id = game_id
+        player._follow_game(game)
+    iterations = player._iterative_deepening(game, root_actions, start_time, time_limit, max_depth, stop_on_loss=False)
+    return iterations, player.stats
+
+class MCTSNodePool:
+    """Array-backed storage for the nodes of an MCTS tree.
+
+    A node is an index into the parallel arrays. The children of a node are
+    allocated together, so they are the contiguous range
+    ``first_child[node]`` to ``first_child[node] + child_count[node]``.
+
+    Attributes:
+        parent (array): Parent index of each node, -1 for the root.
+        first_child (array): Index of each node's first child.
+        child_count (array): Number of children of each node, 0 until expanded.
+        move (array): Square moved to by the action leading to each node.
+        removal (array): Square whose token the action leading to each node removed.
+        mover (array): Index of the player who made the action leading to each node.
+        visits (array): Number of simulations through each node.
+        rewards (array): Wins for ``mover`` among those simulations.
+    """
+
+    __slots__ = ("parent", "first_child", "child_count", "move", "removal", "mover", "visits", "rewards")
+
+    def __init__(self):
+        """Initializes an empty pool."""
+        self.reset()
+
+    def __len__(self):
+        """Returns the number of nodes in the pool."""
+        return len(self.visits)
+
+    def reset(self):
+        """Drops every node."""
+        self.parent = array('i')
+        self.first_child = array('i')
+        self.child_count = array('i')
+        self.move = array('h')
+        self.removal = array('h')
+        self.mover = array('b')
+        self.visits = array('i')
+        self.rewards = array('d')
+
+    def add(self, parent, move, removal, mover):
+        """Appends a node and returns its index."""
+        self.parent.append(parent)
+        self.first_child.append(0)
+        self.child_count.append(0)
+        self.move.append(move)
+        self.removal.append(removal)
+        self.mover.append(mover)
+        self.visits.append(0)
+        self.rewards.append(0.0)
+        return len(self.visits) - 1
+
+    def children(self, node):
+        """Returns the range of the node's children."""
+        first = self.first_child[node]
+        return range(first, first + self.child_count[node])
+
+    def subtree(self, node):
+        """Returns a new pool holding only the subtree under the node, with the node as its root."""
+        pool = MCTSNodePool()
+        pool.add(-1, -1, -1, self.mover[node])
+        pool.visits[0], pool.rewards[0] = self.visits[node], self.rewards[node]
+        # Breadth first, so the children of every node stay contiguous
+        copies = [(node, 0)]
+        for old, new in copies:
+            if not self.child_count[old]:
+                continue
+            pool.first_child[new] = len(pool)
+            pool.child_count[new] = self.child_count[old]
+            for child in self.children(old):
+                index = pool.add(new, self.move[child], self.removal[child], self.mover[child])
+                pool.visits[index], pool.rewards[index] = self.visits[child], self.rewards[child]
+                copies.append((child, index))
+        return pool
+
+class MCTSPlayer(Player):
+    """Represents a computer player using Monte Carlo Tree Search, as described in docs/mcts.md.
+
+    Actions are full turns, a move plus a token removal, with removals pruned
+    by ``BitBoard.removal_candidates``. Rollouts play on raw bitmasks and
+    prefer the move that keeps the most mobility.
+
+    Attributes:
+        TIME_LIMIT (float): Default time budget per move, in seconds.
+        EXPLORATION (float): Default UCB exploration constant.
+        MAX_NODES (int): Default cap on the number of tree nodes.
+        time_limit (float): Time budget per move, in seconds.
+        iterations (int): Number of simulations per move, or None to run until the time budget is spent.
+        exploration (float): UCB exploration constant.
+        rollout_epsilon (float): Probability of a random rather than mobility-greedy rollout move.
+        max_nodes (int): Cap on the number of tree nodes, after which leaves are simulated without expanding.
+        pool (MCTSNodePool): Nodes of the last search. The next search of the same game starts from
+            the subtree of the position actually reached, and the rest of the tree is dropped.
+    """
+
+    TIME_LIMIT = 8.0
+    EXPLORATION = 1.4
+    MAX_NODES = 1 << 20
+    TIME_CHECK_INTERVAL = 16  # Simulations between deadline checks, must be a power of two
+
+    def __init__(self, name, time_limit=TIME_LIMIT, iterations=None, exploration=EXPLORATION,
+                 rollout_epsilon=0.2, max_nodes=MAX_NODES, seed=None):
+        """Initializes the MCTS player with a name and search budget."""
+        super().__init__(name)
+        self.time_limit = time_limit
+        self.iterations = iterations
+        self.exploration = exploration
+        self.rollout_epsilon = rollout_epsilon
+        self.max_nodes = max_nodes
+        self.pool = MCTSNodePool()
+        self._rng = random.Random(seed)
+        self._planned_removal = None  # (board key after our move, removal) from the last search
+        self._tree_board = None  # Root position of the tree in ``pool``
+        self._tree_game = None  # Isolation.game_id of that position
+
+    def choose_move(self, game_state, time_limit=None):
+        """Chooses the move of the most visited root action after the simulation budget is spent.
+
+        Args:
+            game_state (Isolation): The game to choose a move in. It is not modified.
+            time_limit (float): Seconds allowed for this move, defaults to ``self.time_limit``.
+        """
+        start_time = time.time()
+        deadline = start_time + (self.time_limit if time_limit is None else time_limit)
+        self._planned_removal = None
+        self._stop_requested = False
+
+        our_index = game_state.player_index(self)
+        root_board = game_state.bitboard
+        if not root_board.moves_mask(our_index):
+            return None
+
+        pool = self._reuse_tree(game_state, our_index)
+        reused = pool.visits[0]
+        # Expand the root up front, so there is a move to play even if the budget allows no simulation
+        if not pool.child_count[0]:
+            self._expand(0, root_board, our_index)
+
+        simulations = 0
+        while self.iterations is None or simulations < self.iterations:
+            if not simulations & (self.TIME_CHECK_INTERVAL - 1) and (self._stop_requested or time.time() >= deadline):
+                break
+            self._simulate(root_board, our_index)
+            simulations += 1
+
+        # Unvisited children tie at zero, and the first of them is played
+        best = max(pool.children(0), key=lambda child: pool.visits[child])
+        coords = root_board.geometry.coords
+        best_move = coords(pool.move[best])
+
+        # Remember the removal along with the board it was planned for
+        board = root_board.copy()
+        board.move(our_index, pool.move[best])
+        self._planned_removal = (board.key, coords(pool.removal[best]))
+
+        logger.info(f"{self.name} chooses move: {best_move} after {simulations} simulations, {reused} reused")
+        return best_move
+
+    def new_game(self):
+        """Drops the search tree, ready for a new game."""
+        self.pool.reset()
+        self._tree_board = None
+        self._tree_game = None
+        self._planned_removal = None
+
+    def _reuse_tree(self, game_state, our_index):
+        """Makes ``pool`` the subtree of the last search rooted at the current position, or a new tree.
+
+        The last search was rooted one full turn of each player ago, so the
+        current position is a grandchild of its root if both turns played
+        were in the tree.
+        """
+        root_board = game_state.bitboard
+        pool = self.pool
+        previous = self._tree_board
+        reuse = None
+        if previous is not None and self._tree_game == game_state.game_id and len(pool):
+            our_square, their_square = root_board.positions[our_index], root_board.positions[1 - our_index]
+            for ours in pool.children(0):
+                if pool.move[ours] != our_square:
+                    continue
+                board = previous.copy()
+                board.move(our_index, our_square)
+                board.remove(pool.removal[ours])
+                for theirs in pool.children(ours):
+                    if pool.move[theirs] == their_square and board.removed | 1 << pool.removal[theirs] == root_board.removed:
+                        reuse = theirs
+                        break
+                if reuse is not None:
+                    break
+
+        if reuse is not None:
+            pool = self.pool = pool.subtree(reuse)
+        else:
+            pool.reset()
+            pool.add(-1, -1, -1, 1 - our_index)
+        self._tree_board = root_board.copy()
+        self._tree_game = game_state.game_id
+        return pool
+
+    def choose_token_to_remove(self, game_state):
+        """Choose the removal planned by the last search, or the candidate that leaves the opponent least mobile."""
+        planned = self._planned_removal
+        self._planned_removal = None
+        bitboard = game_state.bitboard
+        if planned is not None and planned[0] == bitboard.key and game_state.is_valid_token_removal(*planned[1]):
+            token = planned[1]
+        else:
+            our_index = game_state.player_index(self)
+            candidates = bitboard.removal_candidates(our_index, bitboard.positions[our_index])
+            if not candidates:
+                logger.warning("No valid tokens to remove.")
+                return None
+            opponent_moves = bitboard.moves_mask(1 - our_index)
+            token = bitboard.geometry.coords(max(candidates, key=lambda sq: opponent_moves >> sq & 1))
+        logger.info(f"{self.name} chose to remove a token at ({token}).")
+        return token
+
+    def _simulate(self, root_board, our_index):
+        """Runs one selection, expansion, rollout and backpropagation pass from the root."""
+        pool = self.pool
+        board = root_board.copy()
+        node = 0
+        to_move = our_index
+
+        # Selection
+        while pool.child_count[node]:
+            node = self._select_child(node)
+            board.move(to_move, pool.move[node])
+            board.remove(pool.removal[node])
+            to_move = 1 - to_move
+
+        # Expansion, once a leaf has been visited (``choose_move`` expands the root)
+        if pool.visits[node] and len(pool) < self.max_nodes and self._expand(node, board, to_move):
+            node = pool.first_child[node]
+            board.move(to_move, pool.move[node])
+            board.remove(pool.removal[node])
+            to_move = 1 - to_move
+
+        # Simulation
+        winner = self._rollout(board.geometry, board.removed, list(board.positions), to_move)
+
+        # Backpropagation
+        while node != -1:
+            pool.visits[node] += 1
+            if pool.mover[node] == winner:
+                pool.rewards[node] += 1.0
+            node = pool.parent[node]
+
+    def _expand(self, node, board, to_move):
+        """Adds a child to the node for every full turn of the player to move, and returns whether there was one."""
+        pool = self.pool
+        actions = board.turn_actions(to_move)
+        if not actions:
+            return False
+        pool.first_child[node] = len(pool)
+        pool.child_count[node] = len(actions)
+        for move, removal in actions:
+            pool.add(node, move, removal, to_move)
+        return True
+
+    def _select_child(self, node):
+        """Returns the child of the node with the highest UCB score, or its first unvisited child."""
+        pool = self.pool
+        visits = pool.visits
+        rewards = pool.rewards
+        log_visits = math.log(max(visits[node], 1))
+        exploration = self.exploration
+        first = pool.first_child[node]
+        best, best_score = first, float('-inf')
+        for child in range(first, first + pool.child_count[node]):
+            child_visits = visits[child]
+            if not child_visits:
+                return child
+            score = rewards[child] / child_visits + exploration * math.sqrt(log_visits / child_visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def _rollout(self, geometry, removed, positions, to_move):
+        """Plays the game out on raw bitmasks and returns the index of the winner."""
+        neighbors, full_mask = geometry.neighbors, geometry.full_mask
+        rng = self._rng
+        epsilon = self.rollout_epsilon
+        while True:
+            opponent_square = positions[1 - to_move]
+            blocked = removed | (1 << opponent_square)
+            moves = list(iter_squares(neighbors[positions[to_move]] & ~blocked))
+            if not moves:
+                return 1 - to_move
+
+            # Mostly keep the move with the most room around it, sometimes explore
+            if rng.random() < epsilon:
+                move = rng.choice(moves)
+            else:
+                move = max(moves, key=lambda sq: popcount(neighbors[sq] & ~blocked))
+            positions[to_move] = move
+
+            # Remove a random token next to the opponent, or anywhere if there is none
+            removable = full_mask & ~(blocked | (1 << move))
+            candidates = removable & neighbors[opponent_square] or removable
+            if candidates:
+                removed |= 1 << rng.choice(list(iter_squares(candidates)))
+            to_move = 1 - to_move
@@ -0,0 +1,311 @@
+"""Headless self-play and tournament runner.
+
+Plays AI-vs-AI games without the GUI, optionally across a process pool,
+streams one JSON result per game and reports win rates and Elo.
+
+Engines are given as specs of the form ``engine[:option=value,...]``, e.g.
+``minimax``, ``minimax:heuristic=composite_heuristic,search_removals=true``
+or ``mcts:iterations=2000``. Minimax engines also take a ``weights`` file and
+single heuristic weights, e.g. ``minimax:weights=tuned.json,mobility_lambda=0.6``.
+
+Usage:
+    python -m src.selfplay minimax mcts --games 200 --workers 8 --time-limit 0.5 --output results.jsonl
+    python -m src.selfplay minimax mcts --games 20 --rows 12 --cols 12
+    python -m src.selfplay minimax mcts --games 1000 --workers 8 --records games.bin
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import logging
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .bitboard import ROWS, COLS
+from .isolation import Isolation
+from .game_record import GameRecord, GameRecordWriter, fits
+from .player import ComputerPlayer, MCTSPlayer
+logger = logging.getLogger("IsolationGameLogger")
+
+ENGINES = {"minimax": ComputerPlayer, "mcts": MCTSPlayer}
+
+# z-score of the 95% confidence interval
+Z_95 = 1.959964
+
+
+def parse_engine_spec(spec):
+    """Splits an engine spec into the engine name and a dict of constructor options."""
+    engine, _, options_text = spec.partition(":")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}.")
+    options = {}
+    for item in filter(None, options_text.split(",")):
+        key, _, value = item.partition("=")
+        options[key.strip()] = _parse_option_value(value.strip())
+    return engine, options
+
+
+def _parse_option_value(value):
+    """Converts an option value to a bool, None, int or float where it looks like one."""
+    lowered = value.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered == "none":
+        return None
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+def make_player(spec, name, seed=None):
+    """Builds a player from an engine spec."""
+    engine, options = parse_engine_spec(spec)
+    if engine == "mcts":
+        options.setdefault("seed", seed)
+        return MCTSPlayer(name, **options)
+    heuristic = options.pop("heuristic", None)
+    weights = {key: options.pop(key) for key in list(options) if key in ComputerPlayer.WEIGHT_NAMES}
+    player = ComputerPlayer(name, **options)
+    if heuristic is not None:
+        player.heuristic = getattr(player, heuristic)
+    if weights:
+        player.set_weights(weights)
+    return player
+
+
+def play_game(player1, player2, first_player_index=0, time_limit=None, max_plies=None, rows=ROWS, cols=COLS):
+    """Plays one game between two AI players without a GUI.
+
+    A player that returns no move or an invalid one forfeits.
+
+    Args:
+        player1 (Player): The player in seat 0.
+        player2 (Player): The player in seat 1.
+        first_player_index (int): Seat of the player who moves first.
+        time_limit (float): Seconds per move, or None for each player's own limit.
+        max_plies (int): Stop after this many turns, or None to play to the end.
+        rows (int): Number of board rows.
+        cols (int): Number of board columns.
+
+    Returns:
+        dict: The winner's seat (None if ``max_plies`` cut the game short),
+        the number of turns, the per-player move and removal counts and the
+        GameRecord of the game under ``"record"`` (None if the board is too
+        large to record).
+    """
+    game = Isolation(player1, player2, rows, cols)
+    game.current_player_index = first_player_index
+    game.start_time = time.time()
+
+    winner = None
+    plies = 0
+    while max_plies is None or plies < max_plies:
+        if game.is_game_over():
+            winner = 1 - game.current_player_index
+            break
+        player = game.players[game.current_player_index]
+
+        move = player.choose_move(game, time_limit)
+        if move is None or not game.make_move(player, *move):
+            winner = 1 - game.current_player_index
+            break
+
+        token = player.choose_token_to_remove(game)
+        if token is None or not game.remove_token(*token):
+            winner = 1 - game.current_player_index
+            break
+
+        game.current_player_index ^= 1
+        plies += 1
+        player.ponder(game)  # Only players created with pondering on think on the opponent's time
+
+    for player in game.players:
+        player.stop_pondering()
+
+    return {
+        "winner": winner,
+        "first_player": first_player_index,
+        "plies": plies,
+        "moves": list(game.move_counts),
+        "tokens_removed": list(game.removal_counts),
+        "duration": time.time() - game.start_time,
+        "record": GameRecord.from_game(game, winner) if fits(rows, cols) else None,
+    }
+
+
+def play_match_game(engine_a, engine_b, game_number, seed, time_limit=None, rows=ROWS, cols=COLS):
+    """Plays one game of an A-vs-B match, swapping seats and the first mover by game number.
+
+    Returns:
+        dict: The ``play_game`` result plus the engines, seed and whether engine A won.
+    """
+    random.seed(seed)  # The heuristics draw from the global generator
+    a_seat = game_number % 2
+    players = [None, None]
+    players[a_seat] = make_player(engine_a, "A", seed)
+    players[1 - a_seat] = make_player(engine_b, "B", seed + 1)
+    first_player_index = (game_number // 2) % 2
+
+    result = play_game(players[0], players[1], first_player_index, time_limit, rows=rows, cols=cols)
+    for player in players:
+        if isinstance(player, ComputerPlayer):
+            player.close()
+
+    if result["record"] is not None:
+        engines = [None, None]
+        engines[a_seat], engines[1 - a_seat] = engine_a, engine_b
+        result["record"].info.update({"engines": engines, "seed": seed, "time_limit": time_limit})
+
+    result.update({
+        "game": game_number,
+        "seed": seed,
+        "engine_a": engine_a,
+        "engine_b": engine_b,
+        "a_seat": a_seat,
+        "board": [rows, cols],
+        "a_won": None if result["winner"] is None else result["winner"] == a_seat,
+    })
+    return result
+
+
+def run_match(engine_a, engine_b, games, workers=1, seed=0, time_limit=None, output=None, rows=ROWS, cols=COLS,
+              records=None):
+    """Plays a match between two engines, streaming results to ``output`` as they finish.
+
+    Args:
+        output (file): Open text file that gets one JSON line per game, or None.
+        records (GameRecordWriter): Writer that gets the record of every game, or None.
+
+    Returns:
+        list[dict]: The game results in completion order.
+    """
+    results = []
+
+    def record(result):
+        game_record = result.pop("record")
+        if records is not None and game_record is not None:
+            records.write(game_record)
+            records.flush()
+        results.append(result)
+        if output is not None:
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    if workers <= 1:
+        for game_number in range(games):
+            record(play_match_game(engine_a, engine_b, game_number, seed + 2 * game_number, time_limit, rows, cols))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_match_game, engine_a, engine_b, game_number, seed + 2 * game_number, time_limit, rows, cols)
+                   for game_number in range(games)]
+        for future in as_completed(futures):
+            record(future.result())
+    return results
+
+
+def wilson_interval(wins, games, z=Z_95):
+    """Returns the Wilson score interval for a win rate."""
+    if games == 0:
+        return 0.0, 1.0
+    rate = wins / games
+    denominator = 1 + z * z / games
+    centre = (rate + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def elo_difference(score):
+    """Returns the Elo difference implied by an expected score, clamped away from +/- infinity."""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(results):
+    """Summarizes match results from engine A's point of view.
+
+    Returns:
+        dict: Games, wins, win rate with its 95% interval, and the Elo difference with its interval.
+    """
+    decided = [result for result in results if result["a_won"] is not None]
+    wins = sum(1 for result in decided if result["a_won"])
+    games = len(decided)
+    rate = wins / games if games else 0.5
+    low, high = wilson_interval(wins, games)
+    return {
+        "games": games,
+        "wins": wins,
+        "win_rate": rate,
+        "win_rate_ci": (low, high),
+        "elo": elo_difference(rate),
+        "elo_ci": (elo_difference(low), elo_difference(high)),
+    }
+
+
+def run_tournament(engines, games, workers=1, seed=0, time_limit=None, output=None, rows=ROWS, cols=COLS, records=None):
+    """Plays a round robin between the engines.
+
+    Returns:
+        dict: The ``summarize`` result of every pairing, keyed by (engine A, engine B).
+    """
+    summaries = {}
+    for pairing, (engine_a, engine_b) in enumerate(itertools.combinations(engines, 2)):
+        results = run_match(engine_a, engine_b, games, workers, seed + pairing * 2 * games, time_limit, output, rows, cols,
+                            records)
+        summaries[(engine_a, engine_b)] = summarize(results)
+    return summaries
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Play headless AI-vs-AI Isolation matches.")
+    parser.add_argument("engines", nargs="+", help="Two or more engine specs, e.g. minimax or mcts:iterations=2000.")
+    parser.add_argument("--games", type=int, default=100, help="Games per pairing.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes playing games in parallel.")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; game i of a pairing uses seed + 2i.")
+    parser.add_argument("--time-limit", type=float, default=None, help="Seconds per move, overriding the engines' own limit.")
+    parser.add_argument("--output", default=None, help="JSONL file the game results are appended to.")
+    parser.add_argument("--records", default=None, help="Binary game record file every game is appended to.")
+    parser.add_argument("--rows", type=int, default=ROWS, help="Number of board rows.")
+    parser.add_argument("--cols", type=int, default=COLS, help="Number of board columns.")
+    parser.add_argument("--verbose", action="store_true", help="Log every move.")
+    args = parser.parse_args(argv)
+
+    if len(args.engines) < 2:
+        parser.error("at least two engines are needed")
+    for spec in args.engines:
+        try:
+            parse_engine_spec(spec)
+        except ValueError as error:
+            parser.error(str(error))
+    if args.records and not fits(args.rows, args.cols):
+        parser.error(f"a {args.rows}x{args.cols} board is too large to record")
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format='%(message)s')
+
+    output = open(args.output, "a") if args.output else None
+    records = GameRecordWriter(args.records) if args.records else None
+    try:
+        summaries = run_tournament(args.engines, args.games, args.workers, args.seed, args.time_limit, output,
+                                   args.rows, args.cols, records)
+    finally:
+        if output is not None:
+            output.close()
+        if records is not None:
+            records.close()
+
+    for (engine_a, engine_b), summary in summaries.items():
+        low, high = summary["win_rate_ci"]
+        elo_low, elo_high = summary["elo_ci"]
+        print(f"{engine_a} vs {engine_b}: {summary['wins']}/{summary['games']} "
+              f"= {summary['win_rate']:.1%} [{low:.1%}, {high:.1%}], "
+              f"Elo {summary['elo']:+.0f} [{elo_low:+.0f}, {elo_high:+.0f}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
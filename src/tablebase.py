@@ -0,0 +1,385 @@
+"""Retrograde endgame tablebase of positions with few open cells left.
+
+Every turn moves a player to a neighbouring open cell, which opens the cell
+it left, and then removes one open token, so the number of open cells drops
+by exactly one per turn. The positions with ``t`` open cells therefore only
+lead to positions with ``t - 1``, and the generator solves them layer by
+layer from the bottom: a position is won for the player to move if one of
+its turns leaves the opponent in a lost position, and lost otherwise. Along
+with the result it stores the distance to the end, the number of turns
+until a player is stuck under best play (the winner hurrying, the loser
+holding out).
+
+Positions are stored independently of the board size. Only the cells a
+player can still reach matter to the play, so they are taken relative to
+each other, reduced over the 8 symmetries of the grid, and packed into a
+64-bit key along with the number of open cells no player can reach, which
+only serve as spare removals. Players that can no longer meet are
+normalized separately, each with its own region.
+
+File layout (little-endian):
+    header: magic ``b"ISOBASE1"``, uint32 entry count, uint8 maximum open cells
+    entries: uint64 position key, uint8 1 if the player to move wins else 0,
+             uint8 distance to the end in turns, sorted by key
+
+Like the opening book, the file is memory-mapped and lookups binary-search it.
+
+Usage:
+    python -m src.tablebase tablebase.bin --max-open 5 --workers 8
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import logging
+import argparse
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from .bitboard import popcount, iter_squares
+logger = logging.getLogger("IsolationGameLogger")
+
+MAGIC = b"ISOBASE1"
+HEADER = struct.Struct("<8sIB")
+ENTRY = struct.Struct("<QBB")
+KEY = struct.Struct("<Q")
+
+# Largest supported number of open cells: the players and 6 cells fit in 8x8, 6 bits per cell
+MAX_OPEN_CELLS = 6
+
+STEPS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc]
+
+# The 8 symmetries of the grid, as (row, col) -> (a * row + b * col, c * row + d * col)
+SYMMETRIES = [(flip_rows, 0, 0, flip_cols) for flip_rows in (1, -1) for flip_cols in (1, -1)] + \
+             [(0, flip_rows, flip_cols, 0) for flip_rows in (1, -1) for flip_cols in (1, -1)]
+
+
+def _neighbors(cell):
+    """Returns the 8 cells around a (row, col) cell."""
+    row, col = cell
+    return [(row + dr, col + dc) for dr, dc in STEPS]
+
+
+def _reach(start, open_cells):
+    """Returns the open cells a player on ``start`` can reach."""
+    reached, frontier = set(), [start]
+    while frontier:
+        for cell in _neighbors(frontier.pop()):
+            if cell in open_cells and cell not in reached:
+                reached.add(cell)
+                frontier.append(cell)
+    return reached
+
+
+def _group_code(marked, cells):
+    """Returns the smallest code of the marked cells followed by the other cells over the grid symmetries.
+
+    Cells are taken relative to the group's top-left corner, 6 bits each.
+    """
+    best = None
+    for a, b, c, d in SYMMETRIES:
+        moved_marked = [(a * row + b * col, c * row + d * col) for row, col in marked]
+        moved_cells = [(a * row + b * col, c * row + d * col) for row, col in cells]
+        top = min(row for row, _ in moved_marked + moved_cells)
+        left = min(col for _, col in moved_marked + moved_cells)
+        code = 0
+        for row, col in moved_marked:
+            code = code << 6 | (row - top) << 3 | (col - left)
+        for value in sorted((row - top) << 3 | (col - left) for row, col in moved_cells):
+            code = code << 6 | value
+        if best is None or code < best:
+            best = code
+    return best
+
+
+def position_key(mover, other, open_cells, spares=0):
+    """Returns the tablebase key of a position with the given player to move.
+
+    Args:
+        mover (tuple): (row, col) of the player to move.
+        other (tuple): (row, col) of the other player.
+        open_cells (set): (row, col) of every open cell.
+        spares (int): Open cells known to be out of every player's reach, on top of ``open_cells``.
+
+    Returns:
+        int: The key, the same for every position that plays the same way.
+    """
+    mover_reach = _reach(mover, open_cells)
+    other_reach = _reach(other, open_cells)
+    spares += len(open_cells) - len(mover_reach | other_reach)
+    separated = all(cell not in mover_reach and cell != mover for cell in _neighbors(other))
+    if separated:
+        mover_count, other_count = len(mover_reach), len(other_reach)
+        code = (_group_code([mover], mover_reach) << 6 * (other_count + 1)) | _group_code([other], other_reach)
+    else:
+        mover_count, other_count = len(mover_reach | other_reach), 0
+        code = _group_code([mover, other], mover_reach | other_reach)
+    return ((separated << 9 | spares << 6 | mover_count << 3 | other_count) << 6 * (mover_count + other_count + 2)) | code
+
+
+def bitboard_key(bitboard, mover_index):
+    """Returns the tablebase key of the board with the given player to move."""
+    coords = bitboard.geometry.coords
+    open_cells = {coords(sq) for sq in iter_squares(bitboard.geometry.full_mask & ~bitboard.blocked())}
+    return position_key(coords(bitboard.positions[mover_index]), coords(bitboard.positions[1 - mover_index]), open_cells)
+
+
+class Tablebase:
+    """Read-only view of a tablebase file.
+
+    Attributes:
+        path (str): Path of the tablebase file.
+        max_open (int): Positions with at most this many open cells are in the file.
+    """
+
+    def __init__(self, path):
+        """Opens and memory-maps the tablebase file."""
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self.max_open = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a tablebase file.")
+
+    def __len__(self):
+        """Returns the number of positions in the tablebase."""
+        return self._count
+
+    def lookup(self, key):
+        """Returns (won, distance) stored for the key, or None."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * ENTRY.size
+            middle_key = KEY.unpack_from(self._map, offset)[0]
+            if middle_key < key:
+                low = middle + 1
+            elif middle_key > key:
+                high = middle
+            else:
+                _, won, distance = ENTRY.unpack_from(self._map, offset)
+                return bool(won), distance
+        return None
+
+    def probe(self, bitboard, mover_index, removal_pending=False):
+        """Returns (won, distance) for the player to move, or None if the position has too many open cells.
+
+        Args:
+            bitboard (BitBoard): The position.
+            mover_index (int): Index of the player whose move is next.
+            removal_pending (bool): True if the other player has moved but not yet
+                removed a token; it then removes the token that is worst for the mover.
+        """
+        open_mask = bitboard.geometry.full_mask & ~bitboard.blocked()
+        count = popcount(open_mask)
+        if not removal_pending or not count:
+            return self.lookup(bitboard_key(bitboard, mover_index)) if count <= self.max_open else None
+        if count - 1 > self.max_open:
+            return None
+        worst = None
+        for removal in iter_squares(open_mask):
+            bitboard.remove(removal)
+            result = self.lookup(bitboard_key(bitboard, mover_index))
+            bitboard.restore(removal)
+            if result is None:
+                return None
+            if worst is None or _preference(result) < _preference(worst):
+                worst = result
+        return worst
+
+    def best_action(self, bitboard, mover_index):
+        """Returns the (move, removal) squares that play the position best, or None.
+
+        A winning action reaches the end soonest, and in a lost position the
+        action that holds out longest is chosen.
+        """
+        if popcount(bitboard.geometry.full_mask & ~bitboard.blocked()) > self.max_open:
+            return None
+        best, best_result = None, None
+        child = bitboard.copy()
+        for move in bitboard.move_squares(mover_index):
+            origin = child.positions[mover_index]
+            child.move(mover_index, move)
+            choice = self._best_removal(child, mover_index)
+            child.move(mover_index, origin)
+            if choice is None:
+                return None
+            if best_result is None or _preference(choice[1]) > _preference(best_result):
+                best, best_result = (move, choice[0]), choice[1]
+        return best
+
+    def best_removal(self, bitboard, remover_index):
+        """Returns the square to remove after the remover's move that plays the position best, or None."""
+        choice = self._best_removal(bitboard, remover_index)
+        return None if choice is None else choice[0]
+
+    def _best_removal(self, bitboard, remover_index):
+        """Returns the best square to remove and the remover's (won, distance) after it, or None."""
+        open_mask = bitboard.geometry.full_mask & ~bitboard.blocked()
+        if not open_mask or popcount(open_mask) - 1 > self.max_open:
+            return None
+        best, best_result = None, None
+        for removal in iter_squares(open_mask):
+            bitboard.remove(removal)
+            result = self.lookup(bitboard_key(bitboard, 1 - remover_index))
+            bitboard.restore(removal)
+            if result is None:
+                return None
+            # The opponent's result, turned into ours one turn further from the end
+            result = (not result[0], result[1] + 1)
+            if best_result is None or _preference(result) > _preference(best_result):
+                best, best_result = removal, result
+        return best, best_result
+
+    def close(self):
+        """Releases the memory map and the file."""
+        self._map.close()
+        self._file.close()
+
+    def __getstate__(self):
+        """Pickles the tablebase as its path; the receiving process maps the file itself."""
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        """Reopens the tablebase from its path."""
+        self.__init__(state["path"])
+
+
+def _preference(result):
+    """Orders (won, distance) results from the mover's point of view: quick wins first, quick losses last."""
+    won, distance = result
+    return (1, -distance) if won else (0, distance)
+
+
+def write_tablebase(path, entries, max_open):
+    """Writes a tablebase file from a dict of position key to (won, distance)."""
+    with open(path, "wb") as tablebase:
+        tablebase.write(HEADER.pack(MAGIC, len(entries), max_open))
+        for key in sorted(entries):
+            won, distance = entries[key]
+            tablebase.write(ENTRY.pack(key, won, distance))
+
+
+@lru_cache(maxsize=None)
+def _patterns(size):
+    """Returns the groups of ``size`` cells connected by king moves, one per shape up to symmetry."""
+    patterns = {((0, 0),)}
+    for _ in range(size - 1):
+        grown = {}
+        for pattern in patterns:
+            cells = set(pattern)
+            for cell in pattern:
+                for neighbor in _neighbors(cell):
+                    if neighbor not in cells:
+                        group = cells | {neighbor}
+                        grown.setdefault(_group_code([], group), tuple(group))
+        patterns = set(grown.values())
+    return patterns
+
+
+def _layer_positions(open_count):
+    """Returns one position of every key with ``open_count`` open cells, as (mover, other, open cells, spares)."""
+    positions = {}
+    for reachable in range(open_count + 1):
+        spares = open_count - reachable
+        # Players that can still meet share one group of cells
+        for pattern in _patterns(reachable + 2):
+            for mover in pattern:
+                for other in pattern:
+                    if other != mover:
+                        open_cells = frozenset(pattern) - {mover, other}
+                        positions.setdefault(position_key(mover, other, open_cells, spares), (mover, other, open_cells, spares))
+        # Players walled off from each other each have a group of their own, placed well apart
+        for mover_reach in range(reachable + 1):
+            for mover_pattern in _patterns(mover_reach + 1):
+                for other_pattern in _patterns(reachable - mover_reach + 1):
+                    far_pattern = [(row, col + 2 * MAX_OPEN_CELLS) for row, col in other_pattern]
+                    for mover in mover_pattern:
+                        for other in far_pattern:
+                            open_cells = frozenset(mover_pattern) - {mover} | frozenset(far_pattern) - {other}
+                            positions.setdefault(position_key(mover, other, open_cells, spares),
+                                                 (mover, other, open_cells, spares))
+    return list(positions.items())
+
+
+# Results of the layer below the one being solved, set in each worker process
+_solved = {}
+
+
+def _set_solved(solved):
+    """Process pool initializer: keeps the results of the layer below."""
+    global _solved
+    _solved = solved
+
+
+def _solve_positions(positions):
+    """Process pool entry point: solves positions whose every turn leads to the layer in ``_solved``.
+
+    Returns:
+        list[tuple]: (key, won, distance) of every position.
+    """
+    results = []
+    for key, (mover, other, open_cells, spares) in positions:
+        best = (False, 0)  # A player with no move is stuck right away
+        for move in _neighbors(mover):
+            if move not in open_cells:
+                continue
+            after_move = open_cells - {move} | {mover}
+            removals = [(after_move - {removal}, spares) for removal in after_move]
+            if spares:
+                removals.append((after_move, spares - 1))
+            for remaining, remaining_spares in removals:
+                won, distance = _solved[position_key(other, move, remaining, remaining_spares)]
+                result = (not won, distance + 1)
+                if _preference(result) > _preference(best):
+                    best = result
+        results.append((key, int(best[0]), best[1]))
+    return results
+
+
+def build_tablebase(path, max_open=5, workers=1):
+    """Solves every position with at most ``max_open`` open cells and writes them to a tablebase file.
+
+    Returns:
+        int: The number of positions written.
+    """
+    if not 0 <= max_open <= MAX_OPEN_CELLS:
+        raise ValueError(f"The tablebase covers at most {MAX_OPEN_CELLS} open cells.")
+    entries = {}
+    below = {}
+    for open_count in range(max_open + 1):
+        start = time.time()
+        positions = _layer_positions(open_count)
+        chunks = [positions[i::workers] for i in range(workers) if positions[i::workers]]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_set_solved, initargs=(below,)) as executor:
+            layer = {key: (won, distance) for results in executor.map(_solve_positions, chunks)
+                     for key, won, distance in results}
+        entries.update(layer)
+        below = layer
+        won = sum(1 for result in layer.values() if result[0])
+        logger.info(f"{open_count} open cells: {len(layer)} positions, {won} won for the mover, "
+                    f"{time.time() - start:.1f}s")
+    write_tablebase(path, entries, max_open)
+    return len(entries)
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Build an Isolation endgame tablebase.")
+    parser.add_argument("output", help="Tablebase file to write.")
+    parser.add_argument("--max-open", type=int, default=5, help=f"Open cells of the largest positions, at most {MAX_OPEN_CELLS}.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes.")
+    args = parser.parse_args(argv)
+    if not 0 <= args.max_open <= MAX_OPEN_CELLS:
+        parser.error(f"--max-open must be between 0 and {MAX_OPEN_CELLS}")
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    count = build_tablebase(args.output, args.max_open, args.workers)
+    print(f"Wrote {count} positions to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
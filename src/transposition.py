@@ -0,0 +1,60 @@
+"""Bounded transposition table for the minimax search."""
+
+# Bound types stored with each score
+EXACT = 0
+LOWER = 1  # The score is a lower bound (the search failed high)
+UPPER = 2  # The score is an upper bound (the search failed low)
+
+
+class TranspositionTable:
+    """Fixed-size transposition table keyed by Zobrist hash.
+
+    Every bucket has two slots: a depth-preferred slot that keeps the deepest
+    result seen for the bucket, and an always-replace slot that takes whatever
+    the depth-preferred slot refuses. Entries are ``(key, depth, score, bound, best_move)``
+    tuples.
+
+    Attributes:
+        size (int): Number of buckets.
+        hits (int): Number of probes that found an entry.
+        probes (int): Number of probes made.
+    """
+
+    def __init__(self, size=1 << 16):
+        """Initializes an empty table with the given number of buckets."""
+        if size <= 0:
+            raise ValueError("Transposition table size must be positive.")
+        self.size = size
+        self.hits = 0
+        self.probes = 0
+        self._depth_preferred = [None] * size
+        self._always_replace = [None] * size
+
+    def probe(self, key):
+        """Returns the entry stored for the key, or None if there is none."""
+        self.probes += 1
+        index = key % self.size
+        entry = self._depth_preferred[index]
+        if entry is None or entry[0] != key:
+            entry = self._always_replace[index]
+            if entry is None or entry[0] != key:
+                return None
+        self.hits += 1
+        return entry
+
+    def store(self, key, depth, score, bound, best_move):
+        """Stores a search result, keeping the deeper result in the depth-preferred slot."""
+        index = key % self.size
+        entry = (key, depth, score, bound, best_move)
+        current = self._depth_preferred[index]
+        if current is None or depth >= current[1]:
+            self._depth_preferred[index] = entry
+        else:
+            self._always_replace[index] = entry
+
+    def clear(self):
+        """Removes every entry and resets the counters."""
+        self._depth_preferred = [None] * self.size
+        self._always_replace = [None] * self.size
+        self.hits = 0
+        self.probes = 0
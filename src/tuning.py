@@ -0,0 +1,313 @@
+"""Tuning of the ComputerPlayer heuristic weights.
+
+Two methods are available:
+
+- SPSA plays self-play matches between two copies of the engine whose
+  weights are all nudged in opposite random directions, and moves the
+  weights towards the side that scored better. It tunes every weight,
+  including the token removal ones, and only needs games.
+- Texel fits the composite_heuristic weights to positions labelled with
+  the result of the game they were played in, so that a logistic of the
+  evaluation predicts the result. The positions come from game record files
+  (``selfplay --records``), the evaluation of all of them is one NumPy
+  expression, and fitting takes seconds once the features are extracted.
+
+Both write a JSON weight file that ``ComputerPlayer(weights=path)`` and the
+``weights=path`` engine option of the self-play runner load. The matches and
+the feature extraction are spread over a process pool.
+
+Usage:
+    python -m src.tuning spsa --iterations 200 --games 32 --time-limit 0.05 --workers 8 --output weights.json
+    python -m src.tuning texel games.bin --workers 8 --output weights.json
+"""
+
+import os
+import sys
+import json
+import math
+import random
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from .bitboard import ROWS, COLS
+from .player import ComputerPlayer
+from .game_record import read_records
+from . import vectorized
+logger = logging.getLogger("IsolationGameLogger")
+
+ENGINE = "minimax:heuristic=composite_heuristic"
+
+# Weights the Texel method fits: the ones composite_heuristic reads
+TEXEL_WEIGHTS = ("composite_mobility", "composite_center", "composite_difference", "mobility_lambda")
+
+
+def default_weights():
+    """Returns the ComputerPlayer default weights, keyed by weight name."""
+    return ComputerPlayer("Defaults", tt_size=0, eval_cache_size=0).weights
+
+
+def write_weights(path, weights):
+    """Writes weights to a JSON weight file."""
+    with open(path, "w") as file:
+        json.dump(weights, file, indent=2)
+
+
+def engine_spec(base, weights):
+    """Returns the engine spec ``base`` with the weights added as options."""
+    options = ",".join(f"{name}={value!r}" for name, value in weights.items())
+    return f"{base}{',' if ':' in base else ':'}{options}"
+
+
+def spsa(engine=ENGINE, iterations=100, games=16, workers=1, time_limit=0.05, seed=0, start=None,
+         a=0.02, c=0.1, rows=ROWS, cols=COLS, output=None, on_iteration=None):
+    """Tunes every heuristic weight by simultaneous perturbation stochastic approximation.
+
+    Each iteration plays a ``games`` game match between the engine with the
+    weights perturbed by ``+delta`` and by ``-delta``, where every weight
+    moves by ``c_k`` of its size in a random direction, and steps the weights
+    along the estimated gradient of the match score. Gains shrink with the
+    iteration number by the usual SPSA schedule.
+
+    Args:
+        engine (str): Self-play engine spec the weights are added to.
+        start (dict): Weights to start from, defaults to ``default_weights()``.
+        a (float): Step size gain.
+        c (float): Perturbation size, as a fraction of each weight.
+        output (str): JSON weight file rewritten after every iteration, or None.
+        on_iteration (func): Called with the iteration number, the weights and the match summary
+            after every iteration, or None.
+
+    Returns:
+        dict: The tuned weights.
+    """
+    from .selfplay import run_match, summarize  # Imported here, the self-play runner is only needed for SPSA
+
+    weights = default_weights()
+    weights.update(start or {})
+    names = list(weights)
+    # Weights are perturbed relative to their size, with a floor so a weight at zero can move
+    scales = {name: max(abs(value), 0.1) for name, value in weights.items()}
+    rng = random.Random(seed)
+    stability = iterations / 10
+
+    for k in range(iterations):
+        a_k = a / (k + 1 + stability) ** 0.602
+        c_k = c / (k + 1) ** 0.101
+        directions = {name: rng.choice((-1, 1)) for name in names}
+        plus = {name: weights[name] + c_k * scales[name] * directions[name] for name in names}
+        minus = {name: weights[name] - c_k * scales[name] * directions[name] for name in names}
+
+        results = run_match(engine_spec(engine, plus), engine_spec(engine, minus), games, workers,
+                            seed + 2 * games * k, time_limit, rows=rows, cols=cols)
+        summary = summarize(results)
+        # Score of the plus side minus that of the minus side, in [-1, 1]
+        difference = (2 * summary["wins"] - summary["games"]) / summary["games"] if summary["games"] else 0.0
+        for name in names:
+            weights[name] += a_k * difference * scales[name] / (2 * c_k * directions[name])
+
+        if output is not None:
+            write_weights(output, weights)
+        if on_iteration is not None:
+            on_iteration(k + 1, weights, summary)
+    return weights
+
+
+def position_features(record):
+    """Returns the Texel features and label of every position of a decided game.
+
+    Each row holds, for the player to move, its mobility, the opponent's
+    mobility, both two-step mobilities, its distance to the center, and
+    whether it went on to win. Positions where the mover is already stuck
+    are left out: the search scores those exactly.
+
+    Returns:
+        list[tuple]: One row per position.
+    """
+    if record.winner is None:
+        return []
+    rows = []
+    center_row, center_col = None, None
+    for board in record.boards():
+        if board.awaiting_removal:
+            break
+        mover = board.to_move
+        mobility = board.mobility(mover)
+        if not mobility:
+            continue
+        if center_row is None:
+            geometry = board.geometry
+            center_row, center_col = ComputerPlayer.CENTER if ComputerPlayer.CENTER is not None else geometry.center
+        row, col = board.geometry.coords(board.positions[mover])
+        rows.append((mobility, board.mobility(1 - mover), board.future_mobility(mover), board.future_mobility(1 - mover),
+                     abs(center_row - row) + abs(center_col - col), float(record.winner == mover)))
+    return rows
+
+
+def _records_features(records):
+    """Process pool entry point: the ``position_features`` rows of a chunk of records."""
+    rows = []
+    for record in records:
+        rows.extend(position_features(record))
+    return rows
+
+
+def _chunks(iterable, size):
+    """Yields lists of up to ``size`` items of the iterable."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_dataset(paths, workers=1, chunk_size=1000):
+    """Extracts the Texel features of every position in the game record files.
+
+    Records are streamed from the files in chunks and their features
+    computed in the worker processes, with at most two chunks per worker in
+    flight, so only the feature array has to fit in memory.
+
+    Returns:
+        ndarray: A ``(positions, 6)`` float array of ``position_features`` rows.
+    """
+    np = vectorized.np
+    records = (record for path in paths for record in read_records(path))
+    arrays = [np.zeros((0, 6))]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for chunk in _chunks(records, chunk_size):
+            pending.append(executor.submit(_records_features, chunk))
+            if len(pending) >= 2 * workers:
+                arrays.append(np.array(pending.pop(0).result(), dtype=np.float64).reshape(-1, 6))
+        for future in pending:
+            arrays.append(np.array(future.result(), dtype=np.float64).reshape(-1, 6))
+    return np.concatenate(arrays)
+
+
+def texel_evaluations(features, weights):
+    """Returns composite_heuristic of every dataset position for the player to move, in one vectorized pass."""
+    w1, w2, w3, lambda_factor = (weights[name] for name in TEXEL_WEIGHTS)
+    mobility, their_mobility, future, their_future, center_distance = features[:, :5].T
+    return (w1 * (mobility + lambda_factor * future) + w2 * -center_distance
+            + w3 * (2 * (mobility - their_mobility) + (future - their_future)))
+
+
+def texel_loss(features, weights, scale):
+    """Returns the mean squared error between the results and the logistic of ``scale`` times the evaluations."""
+    np = vectorized.np
+    predicted = 1 / (1 + np.exp(-scale * texel_evaluations(features, weights)))
+    return float(np.mean((features[:, 5] - predicted) ** 2))
+
+
+def fit_scale(features, weights, low=1e-3, high=10.0, steps=60):
+    """Finds the logistic scale that best predicts the results with the given weights, by golden-section search."""
+    ratio = (math.sqrt(5) - 1) / 2
+    for _ in range(steps):
+        left, right = high - ratio * (high - low), low + ratio * (high - low)
+        if texel_loss(features, weights, left) < texel_loss(features, weights, right):
+            high = right
+        else:
+            low = left
+    return (low + high) / 2
+
+
+def texel(features, start=None, iterations=2000, learning_rate=0.01):
+    """Fits the composite_heuristic weights to the labelled positions.
+
+    The logistic scale is fitted to the starting weights first and then held
+    fixed, as otherwise the weights and the scale could grow together
+    without changing the predictions. The weights are then fitted by Adam
+    on the exact gradient of ``texel_loss``.
+
+    Args:
+        features (ndarray): Dataset from ``load_dataset``.
+        start (dict): Weights to start from, defaults to ``default_weights()``.
+
+    Returns:
+        dict: All weights, with the ``TEXEL_WEIGHTS`` fitted and the rest as in ``start``.
+    """
+    np = vectorized.np
+    weights = default_weights()
+    weights.update(start or {})
+    scale = fit_scale(features, weights)
+    logger.info(f"Texel: {len(features)} positions, scale {scale:.4f}, loss {texel_loss(features, weights, scale):.6f}")
+
+    mobility, their_mobility, future, their_future, center_distance, results = features.T
+    difference = 2 * (mobility - their_mobility) + (future - their_future)
+    theta = np.array([weights[name] for name in TEXEL_WEIGHTS])
+    moment, velocity = np.zeros(4), np.zeros(4)
+    for step in range(1, iterations + 1):
+        w1, w2, w3, lambda_factor = theta
+        evaluations = w1 * (mobility + lambda_factor * future) - w2 * center_distance + w3 * difference
+        predicted = 1 / (1 + np.exp(-scale * evaluations))
+        # d(loss)/d(evaluation) of every position, then the chain rule through each weight's term
+        slope = -2 * (results - predicted) * predicted * (1 - predicted) * scale / len(features)
+        gradient = np.array([slope @ (mobility + lambda_factor * future), slope @ -center_distance,
+                             slope @ difference, w1 * (slope @ future)])
+        moment = 0.9 * moment + 0.1 * gradient
+        velocity = 0.999 * velocity + 0.001 * gradient * gradient
+        theta -= learning_rate * (moment / (1 - 0.9 ** step)) / (np.sqrt(velocity / (1 - 0.999 ** step)) + 1e-12)
+
+    weights.update(zip(TEXEL_WEIGHTS, theta.tolist()))
+    logger.info(f"Texel: loss {texel_loss(features, weights, scale):.6f}, "
+                + ", ".join(f"{name}={weights[name]:.4f}" for name in TEXEL_WEIGHTS))
+    return weights
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Tune the Isolation heuristic weights.")
+    subparsers = parser.add_subparsers(dest="method", required=True)
+
+    spsa_parser = subparsers.add_parser("spsa", help="Tune every weight with self-play matches.")
+    spsa_parser.add_argument("--engine", default=ENGINE, help="Engine spec the weights are added to.")
+    spsa_parser.add_argument("--iterations", type=int, default=100, help="Number of SPSA iterations.")
+    spsa_parser.add_argument("--games", type=int, default=16, help="Games per iteration.")
+    spsa_parser.add_argument("--time-limit", type=float, default=0.05, help="Seconds per move.")
+    spsa_parser.add_argument("--seed", type=int, default=0, help="Seed of the perturbations and the games.")
+    spsa_parser.add_argument("-a", type=float, default=0.02, help="Step size gain.")
+    spsa_parser.add_argument("-c", type=float, default=0.1, help="Perturbation size, as a fraction of each weight.")
+    spsa_parser.add_argument("--rows", type=int, default=ROWS, help="Number of board rows.")
+    spsa_parser.add_argument("--cols", type=int, default=COLS, help="Number of board columns.")
+
+    texel_parser = subparsers.add_parser("texel", help="Fit the composite_heuristic weights to recorded games.")
+    texel_parser.add_argument("records", nargs="+", help="Game record files written by selfplay --records.")
+    texel_parser.add_argument("--iterations", type=int, default=2000, help="Gradient steps.")
+    texel_parser.add_argument("--learning-rate", type=float, default=0.01, help="Adam step size.")
+
+    for subparser in (spsa_parser, texel_parser):
+        subparser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes.")
+        subparser.add_argument("--start", default=None, help="JSON weight file to start from.")
+        subparser.add_argument("--output", required=True, help="JSON weight file to write.")
+    args = parser.parse_args(argv)
+
+    start = None
+    if args.start:
+        with open(args.start) as file:
+            start = json.load(file)
+
+    if args.method == "spsa":
+        logging.basicConfig(level=logging.WARNING, format='%(message)s')  # The engine logs every decision at info level
+
+        def report(iteration, weights, summary):
+            print(f"Iteration {iteration}/{args.iterations}: plus side scored {summary['win_rate']:.1%}, "
+                  + ", ".join(f"{name}={value:.4f}" for name, value in weights.items()))
+
+        weights = spsa(args.engine, args.iterations, args.games, args.workers, args.time_limit, args.seed, start,
+                       args.a, args.c, args.rows, args.cols, args.output, report)
+    else:
+        if not vectorized.AVAILABLE:
+            parser.error("texel tuning needs NumPy")
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+        weights = texel(load_dataset(args.records, args.workers), start, args.iterations, args.learning_rate)
+
+    write_weights(args.output, weights)
+    print(json.dumps(weights, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""NumPy batched evaluation of the mobility heuristics.
+
+The positions to score are stacked into a ``(positions, num_squares)`` array of
+free cells. Counting the free neighbours of every cell is a 3x3 convolution
+with the king-move kernel, done here as one product with the board's
+adjacency matrix, so one- and two-step mobility for both players and a whole
+batch of children come out of a few array operations instead of one
+heuristic call per child.
+
+NumPy is optional: without it ``AVAILABLE`` is False and callers keep using
+the per-position bitboard heuristics. The adjacency and distance matrices
+are built once per board geometry.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from functools import lru_cache
+from .bitboard import NUM_SQUARES, DEFAULT_GEOMETRY
+
+AVAILABLE = np is not None
+
+
+def masks_to_array(masks, num_squares=NUM_SQUARES):
+    """Unpacks a list of square masks into a ``(len(masks), num_squares)`` boolean array."""
+    mask_bytes = (num_squares + 7) // 8
+    raw = np.frombuffer(b"".join(mask.to_bytes(mask_bytes, "little") for mask in masks), dtype=np.uint8)
+    bits = np.unpackbits(raw.reshape(len(masks), mask_bytes), axis=1, bitorder="little")[:, :num_squares]
+    return bits.view(bool)
+
+
+@lru_cache(maxsize=None)
+def tables(geometry):
+    """Returns the adjacency and distance matrices of a board geometry.
+
+    Row ``sq`` of the adjacency matrix holds the neighbours of square ``sq``
+    (the matrix is symmetric); ``distances[a, b]`` is the Manhattan distance
+    between squares a and b.
+    """
+    adjacency = masks_to_array(geometry.neighbors, geometry.num_squares).astype(np.float32)
+    return adjacency, np.array(geometry.distances)
+
+
+ADJACENCY, DISTANCE_MATRIX = tables(DEFAULT_GEOMETRY) if AVAILABLE else (None, None)
+
+
+def neighbor_counts(cells, adjacency=ADJACENCY):
+    """Returns how many of the 8 neighbours of every cell are set, for a ``(batch, num_squares)`` array."""
+    return cells @ adjacency
+
+
+def mobility_features(removed, our_squares, their_squares, geometry=DEFAULT_GEOMETRY):
+    """Returns one- and two-step mobility of both players for a batch of positions.
+
+    Matches ``BitBoard.mobility`` and ``BitBoard.future_mobility`` position by position.
+
+    Args:
+        removed (int): Mask of removed tokens, shared by the whole batch.
+        our_squares (list[int]): Our square in each position.
+        their_squares (list[int]): The opponent's square in each position.
+        geometry (Geometry): The board the squares are on.
+
+    Returns:
+        tuple: Our mobility, their mobility, our future mobility and their
+        future mobility, each an int array with one entry per position.
+    """
+    adjacency, _ = tables(geometry)
+    size = len(our_squares)
+    # Both sides are scored in one stacked batch: rows [0, size) are us, the rest the opponent
+    movers = np.concatenate((our_squares, their_squares))
+    blockers = np.concatenate((their_squares, our_squares))
+
+    # The square we leave becomes free again, only the other player blocks us on top of the removed tokens
+    free = np.tile(~masks_to_array([removed], geometry.num_squares)[0], (2 * size, 1)).astype(np.float32)
+    free[np.arange(2 * size), blockers] = 0
+    moves = adjacency[movers] * free
+    mobility = moves.sum(axis=1).astype(int)
+    future = (moves * neighbor_counts(free, adjacency)).sum(axis=1).astype(int)
+    return mobility[:size], mobility[size:], future[:size], future[size:]
+
+
+def center_distances(squares, center, geometry=DEFAULT_GEOMETRY):
+    """Returns the Manhattan distance from each square to the (row, col) center."""
+    rows, cols = np.divmod(np.asarray(squares), geometry.cols)
+    return np.abs(rows - center[0]) + np.abs(cols - center[1])
+
+
+def token_removal_scores(tokens, their_square, center_square, token_factor, frontiers, noise, geometry=DEFAULT_GEOMETRY,
+                         weights=(1.0, 1.0, 1.0, 1.0)):
+    """Scores every candidate token the way ``ComputerPlayer.token_removal_heuristic`` does, in one pass.
+
+    Args:
+        tokens (list[int]): Candidate squares.
+        their_square (int): The opponent's square.
+        center_square (int): The square whose distance counts against a token.
+        token_factor (float): Fraction of the board already blocked.
+        frontiers (dict): Free neighbours of each opponent move before any removal.
+        noise (list[float]): Random tie-breaker of each token.
+        geometry (Geometry): The board the squares are on.
+        weights (tuple): Opponent distance, center distance, blocking and opponent move weights.
+
+    Returns:
+        ndarray: The score of each token, with the same floating-point results as the scalar loop.
+    """
+    adjacency, distances = tables(geometry)
+    opponent_weight, center_weight, blocking_weight, moves_weight = weights
+    tokens = np.asarray(tokens)
+    score = 0 - distances[their_square, tokens] * token_factor * opponent_weight
+    score = score - distances[center_square, tokens] * (1 - token_factor) * center_weight
+
+    # A removal next to an opponent move costs that move a free neighbour, a removal on it takes it away
+    best_frontier = np.zeros(len(tokens), dtype=int)
+    for move, frontier in frontiers.items():
+        reachable = frontier - adjacency[move, tokens].astype(int)
+        np.maximum(best_frontier, np.where(tokens == move, 0, reachable), out=best_frontier)
+    score = score - best_frontier * blocking_weight
+    # Removable tokens are free squares, so a token is an opponent move exactly when it is adjacent
+    score = score + adjacency[their_square, tokens].astype(int) * moves_weight
+    return score + np.asarray(noise)
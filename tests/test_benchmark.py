@@ -0,0 +1,25 @@
+import pytest
+from src import benchmark
+from src.player import ComputerPlayer
+
+
+@pytest.mark.parametrize("name", sorted(benchmark.POSITIONS))
+def test_search_benchmarks_are_repeatable(name):
+    for bench in (benchmark.bench_minimax, benchmark.bench_minimax_unordered):
+        game, player = benchmark.load_position(name)
+        before = game.bitboard.copy()
+        nodes = [bench(game, player) for _ in range(3)]
+        assert nodes[0] > 1 and nodes.count(nodes[0]) == 3
+        assert game.bitboard == before and not game.undo_stack
+
+
+@pytest.mark.parametrize("name", sorted(benchmark.POSITIONS))
+def test_search_fixed_depth_matches_the_root_search(name):
+    game, player = benchmark.load_position(name)
+    value, nodes = player.search_fixed_depth(game, 3)
+    assert nodes > 1 and not game.undo_stack
+    if game.current_player_index == 0:
+        assert value == player._search_root(game, game.bitboard.move_squares(0), 3, None)[1]
+    full_turns = ComputerPlayer("Full turns", tt_size=0, eval_cache_size=0, search_removals=True)
+    game.players[0] = full_turns
+    assert full_turns.search_fixed_depth(game, 1)[1] > 1
@@ -0,0 +1,137 @@
+import pickle
+import random
+import pytest
+from src.isolation import Isolation
+from src.player import HumanPlayer
+from src.bitboard import BitBoard
+
+# Direction order of the original list-board move generation
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+
+
+class ListBoard:
+    """The original list-of-lists rules: 0 open, -1 removed, 1 or 2 a player."""
+
+    def __init__(self, rows, cols, positions):
+        self.rows, self.cols = rows, cols
+        self.board = [[0] * cols for _ in range(rows)]
+        self.positions = list(positions)
+        for index, (row, col) in enumerate(positions):
+            self.board[row][col] = index + 1
+
+    def is_valid_move(self, index, row, col):
+        if not (0 <= row < self.rows and 0 <= col < self.cols) or self.board[row][col] != 0:
+            return False
+        current_row, current_col = self.positions[index]
+        return abs(current_row - row) <= 1 and abs(current_col - col) <= 1
+
+    def available_moves(self, index):
+        row, col = self.positions[index]
+        return [(row + dr, col + dc) for dr, dc in DIRECTIONS if self.is_valid_move(index, row + dr, col + dc)]
+
+    def is_valid_token_removal(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols and self.board[row][col] == 0
+
+    def available_tokens(self):
+        return [(row, col) for row in range(self.rows) for col in range(self.cols) if self.is_valid_token_removal(row, col)]
+
+    def move(self, index, row, col):
+        old_row, old_col = self.positions[index]
+        self.board[old_row][old_col] = 0
+        self.board[row][col] = index + 1
+        self.positions[index] = (row, col)
+
+    def remove(self, row, col):
+        self.board[row][col] = -1
+
+
+def assert_same_position(game, reference):
+    players = game.players
+    for index, player in enumerate(players):
+        assert game.get_available_moves(player) == reference.available_moves(index)
+        assert game.get_player_position(player) == reference.positions[index]
+    assert game.get_available_tokens_to_remove() == reference.available_tokens()
+    board = game.board
+    for row in range(-1, reference.rows + 1):
+        for col in range(-1, reference.cols + 1):
+            for index, player in enumerate(players):
+                assert game.is_valid_move(player, row, col) == reference.is_valid_move(index, row, col)
+            assert game.is_valid_token_removal(row, col) == reference.is_valid_token_removal(row, col)
+            if 0 <= row < reference.rows and 0 <= col < reference.cols:
+                expected = reference.board[row][col]
+                expected = players[expected - 1] if expected > 0 else expected
+                assert board[row][col] == expected
+                assert game.get_cell_value(row, col) == expected
+    assert game.is_game_over() == (not reference.available_moves(game.current_player_index))
+
+
+@pytest.mark.parametrize("rows, cols", [(8, 6), (5, 5), (4, 7), (10, 9)])
+@pytest.mark.parametrize("seed", range(5))
+def test_facade_matches_list_board(rows, cols, seed):
+    rng = random.Random(seed)
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"), rows, cols)
+    reference = ListBoard(rows, cols, [game.geometry.coords(sq) for sq in game.bitboard.positions])
+    while True:
+        assert_same_position(game, reference)
+        index = game.current_player_index
+        mover = game.players[index]
+        moves = reference.available_moves(index)
+        if not moves:
+            break
+        move = rng.choice(moves)
+        assert game.make_move(mover, *move)
+        reference.move(index, *move)
+        assert game.awaiting_token_removal
+        assert_same_position(game, reference)
+        token = rng.choice(reference.available_tokens())
+        assert game.remove_token(*token)
+        reference.remove(*token)
+        game.current_player_index ^= 1
+
+
+def test_invalid_actions_are_refused():
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"))
+    player = game.players[0]
+    row, col = game.get_player_position(player)
+    other = game.get_player_position(game.players[1])
+    before = game.bitboard.copy()
+    assert not game.make_move(player, row + 2, col)
+    assert not game.remove_token(*other)
+    assert not game.remove_token(-1, 0)
+    assert game.bitboard == before
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_key_and_pickling(seed):
+    rng = random.Random(seed)
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"), 7, 7)
+    while game.get_available_moves(game.players[game.current_player_index]):
+        mover = game.players[game.current_player_index]
+        game.make_move(mover, *rng.choice(game.get_available_moves(mover)))
+        game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+        game.current_player_index ^= 1
+        bitboard = game.bitboard
+        fresh = BitBoard(bitboard.positions, bitboard.removed, bitboard.geometry, bitboard.to_move)
+        assert fresh == bitboard and fresh.pack() == bitboard.pack()
+        assert pickle.loads(pickle.dumps(bitboard)) == bitboard
+        assert BitBoard.unpack(bitboard.pack()) == bitboard
+
+
+def test_bitboards_are_unhashable_but_their_snapshots_are_not():
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"))
+    bitboard = game.bitboard
+    with pytest.raises(TypeError):
+        hash(bitboard)
+    seen = {bitboard.pack()}
+    game.make_move(game.players[0], *game.get_available_moves(game.players[0])[0])
+    # The snapshot still holds the position it was taken of
+    assert bitboard.pack() not in seen
+    assert BitBoard.unpack(next(iter(seen))) != bitboard
+
+
+def test_unknown_player_is_refused():
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"))
+    with pytest.raises(ValueError):
+        game.player_index(HumanPlayer("One"))
+    with pytest.raises(ValueError):
+        game.get_available_moves(HumanPlayer("Three"))
@@ -0,0 +1,72 @@
+import random
+import pytest
+from functools import lru_cache
+from src import endgame
+from src.bitboard import BitBoard, geometry, iter_squares
+
+
+@lru_cache(maxsize=None)
+def mover_wins(rows, cols, removed, positions, mover, removal_pending):
+    """Brute-force result of the real rules: every move followed by every removal."""
+    board = BitBoard(positions, removed, geometry(rows, cols))
+    if removal_pending:
+        return all(mover_wins(rows, cols, removed | 1 << sq, positions, mover, False)
+                   for sq in iter_squares(board.removable_mask()))
+    for move in board.move_squares(mover):
+        after = list(positions)
+        after[mover] = move
+        board.move(mover, move)
+        removable = board.removable_mask()
+        board.move(mover, positions[mover])
+        if any(not mover_wins(rows, cols, removed | 1 << sq, tuple(after), 1 - mover, False)
+               for sq in iter_squares(removable)):
+            return True
+    return False
+
+
+def separated_positions(seed, count, max_open=8):
+    """Random positions on small boards where the players can no longer reach each other."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        rows, cols = rng.choice([(4, 4), (4, 5), (5, 5), (3, 6)])
+        board_geometry = geometry(rows, cols)
+        first, second = rng.sample(range(board_geometry.num_squares), 2)
+        open_squares = [sq for sq in range(board_geometry.num_squares) if sq not in (first, second)]
+        rng.shuffle(open_squares)
+        removed = 0
+        for sq in open_squares[rng.randint(2, max_open):]:
+            removed |= 1 << sq
+        board = BitBoard((first, second), removed, board_geometry)
+        if endgame.regions(board) is not None:
+            positions.append(board)
+    return positions
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_solve_matches_brute_force(seed):
+    for board in separated_positions(seed, 30):
+        rows, cols = board.geometry.rows, board.geometry.cols
+        for mover in (0, 1):
+            for removal_pending in (False, True):
+                winner = endgame.solve(board, mover, removal_pending)
+                wins = mover_wins(rows, cols, board.removed, tuple(board.positions), mover, removal_pending)
+                assert winner == (mover if wins else 1 - mover)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_best_removal_wins_when_a_removal_can(seed):
+    for board in separated_positions(seed, 30):
+        rows, cols = board.geometry.rows, board.geometry.cols
+        for remover in (0, 1):
+            removal = endgame.best_removal(board, remover)
+            removable = list(iter_squares(board.removable_mask()))
+            if removal is None:
+                # Only when the opponent's region has nothing left to take
+                assert not endgame.regions(board)[1 - remover]
+                continue
+            positions = tuple(board.positions)
+            can_win = any(not mover_wins(rows, cols, board.removed | 1 << sq, positions, 1 - remover, False)
+                          for sq in removable)
+            wins = not mover_wins(rows, cols, board.removed | 1 << removal, positions, 1 - remover, False)
+            assert wins == can_win
@@ -0,0 +1,66 @@
+import random
+import pytest
+from src.isolation import Isolation
+from src.player import ComputerPlayer
+from src.evaluation_cache import EvaluationCache
+
+
+def test_least_recently_used_value_is_evicted():
+    cache = EvaluationCache(3)
+    for key in "abc":
+        cache.put(key, ord(key))
+    assert cache.get("a") == ord("a")  # Now the most recently used
+    cache.put("d", 4)
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == [ord("a"), ord("c"), 4]
+    cache.put("c", 5)  # Updating a value refreshes it too
+    cache.put("e", 6)
+    assert cache.get("a") is None and cache.get("c") == 5
+
+
+def test_counters_and_clear():
+    cache = EvaluationCache(2)
+    cache.put(1, 0.0)
+    assert cache.get(1) == 0.0 and cache.get(2) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.clear()
+    assert len(cache) == 0 and (cache.hits, cache.misses) == (0, 0)
+    with pytest.raises(ValueError):
+        EvaluationCache(0)
+
+
+def test_evaluate_caches_per_position_and_seat():
+    players = [ComputerPlayer("One", eval_cache_size=64), ComputerPlayer("Two", eval_cache_size=64)]
+    game = Isolation(*players)
+    rng = random.Random(0)
+    for _ in range(8):
+        for player in players:
+            expected = player.heuristic(game, player)
+            assert player.evaluate(game) == expected
+            assert player.evaluate(game) == expected
+        mover = game.players[game.current_player_index]
+        game.make_move(mover, *rng.choice(game.get_available_moves(mover)))
+        game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+        game.current_player_index ^= 1
+    for player in players:
+        assert (player.evaluation_cache.hits, player.evaluation_cache.misses) == (8, 8)
+    assert len(players[0].evaluation_cache) == 8
+
+
+def test_cache_size_zero_disables_the_cache():
+    player = ComputerPlayer("Player", eval_cache_size=0)
+    game = Isolation(player, ComputerPlayer("Opponent"))
+    assert player.evaluation_cache is None
+    assert player.evaluate(game) == player.heuristic(game, player)
+
+
+def test_search_reports_cache_hits(monkeypatch):
+    monkeypatch.setattr(ComputerPlayer, "DEPTH", 4)
+    player = ComputerPlayer("Player", time_limit=60.0, tt_size=0)
+    game = Isolation(player, ComputerPlayer("Opponent"))
+    player.choose_move(game)
+    first = player.stats
+    player.choose_move(game)
+    assert first.eval_misses > 0
+    assert player.stats.eval_misses == 0 and player.stats.eval_hits > 0
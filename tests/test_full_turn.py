@@ -0,0 +1,97 @@
+import random
+import pytest
+from src.isolation import Isolation
+from src.player import ComputerPlayer, HumanPlayer
+from src.bitboard import iter_squares
+
+
+def random_game(player, seed, rows=8, cols=6, turns=None):
+    """A position after some random turns, with ``player`` in seat 0 to move."""
+    rng = random.Random(seed)
+    game = Isolation(player, HumanPlayer("Opponent"), rows, cols)
+    for _ in range(rng.randint(0, 10) if turns is None else turns):
+        mover = game.players[game.current_player_index]
+        moves = game.get_available_moves(mover)
+        if not moves:
+            break
+        game.make_move(mover, *rng.choice(moves))
+        game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+        game.current_player_index ^= 1
+    game.current_player_index = 0
+    return game
+
+
+def reference_value(player, game, depth, maximizing):
+    """Plain minimax over the same pruned full turns, without alpha-beta or any table."""
+    if depth == 0:
+        return player.heuristic(game, player)
+    mover_index = 0 if maximizing else 1
+    mover = game.players[mover_index]
+    coords = game.geometry.coords
+    values = []
+    for move, removal in game.bitboard.turn_actions(mover_index):
+        game.apply_move(mover, coords(move))
+        game.apply_token_removal(*coords(removal))
+        values.append(reference_value(player, game, depth - 1, not maximizing))
+        game.undo()
+        game.undo()
+    if not values:
+        return float('-inf') if maximizing else float('inf')
+    return max(values) if maximizing else min(values)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_removal_candidates(seed):
+    game = random_game(HumanPlayer("Player"), seed, turns=random.Random(seed).randint(0, 20))
+    bitboard = game.bitboard
+    board_geometry = bitboard.geometry
+    opponent = bitboard.positions[1]
+    for move in bitboard.move_squares(0):
+        candidates = bitboard.removal_candidates(0, move)
+        removable = board_geometry.full_mask & ~(bitboard.removed | 1 << move | 1 << opponent)
+        assert all(removable >> sq & 1 for sq in candidates)
+        if removable & board_geometry.neighbors[opponent]:
+            assert candidates == list(iter_squares(removable & board_geometry.neighbors[opponent]))
+        elif removable & board_geometry.second_ring[opponent]:
+            assert candidates == list(iter_squares(removable & board_geometry.second_ring[opponent]))
+        else:
+            assert len(candidates) == (1 if removable else 0)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("tt_size", [0, 1 << 12])
+def test_turn_minimax_matches_plain_minimax(seed, tt_size):
+    player = ComputerPlayer("Player", search_removals=True, tt_size=tt_size, tt_exact_depth=True,
+                            eval_cache_size=0, endgame_solver=False)
+    game = random_game(player, seed, 5, 5)
+    actions = game.bitboard.turn_actions(0)
+    if not actions:
+        pytest.skip("no moves")
+    _, value, _ = player._search_root(game, actions, 2, None)
+    assert value == reference_value(player, game, 2, True)
+    assert not game.undo_stack
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_chosen_removal_is_replayed(seed):
+    player = ComputerPlayer("Player", search_removals=True, time_limit=0.3, endgame_solver=False)
+    game = random_game(player, seed)
+    if not game.get_available_moves(player):
+        pytest.skip("no moves")
+    move = player.choose_move(game)
+    planned_move, planned_removal = player.principal_variation[0]
+    assert planned_move == move
+    game.make_move(player, *move)
+    assert player.choose_token_to_remove(game) == planned_removal
+    assert player.stats.source == "plan"
+
+
+def test_full_turn_entries_do_not_collide_with_move_entries():
+    player = ComputerPlayer("Player", tt_exact_depth=True, endgame_solver=False)
+    game = random_game(player, 3)
+    root_actions = game.bitboard.move_squares(0)
+    move_value = player._search_root(game, root_actions, 3, None)[1]
+    player.search_removals = True
+    player._search_root(game, game.bitboard.turn_actions(0), 2, None)
+    player.search_removals = False
+    assert player._search_root(game, root_actions, 3, None)[1] == move_value
@@ -0,0 +1,79 @@
+import random
+import pytest
+from src.isolation import Isolation
+from src.player import HumanPlayer
+from src.game_record import GameRecord, GameRecordWriter, read_records, replay, fits
+
+
+def play_random_game(rng, rows, cols, stop_after=None):
+    """Plays random turns until a player is stuck, or ``stop_after`` moves, and returns the game and winner."""
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"), rows, cols)
+    game.current_player_index = rng.randint(0, 1)
+    boards = [game.bitboard.copy()]
+    while stop_after is None or len(game.history) < stop_after:
+        mover = game.players[game.current_player_index]
+        moves = game.get_available_moves(mover)
+        if not moves:
+            return game, 1 - game.current_player_index, boards
+        game.make_move(mover, *rng.choice(moves))
+        if stop_after is not None and len(game.history) == stop_after:
+            boards.append(game.bitboard.copy())
+            break
+        game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+        game.current_player_index ^= 1
+        boards.append(game.bitboard.copy())
+    return game, None, boards
+
+
+def test_write_read_replay_round_trip(tmp_path):
+    rng = random.Random(0)
+    path = str(tmp_path / "games.bin")
+    games = []
+    for number in range(40):
+        rows, cols = rng.choice([(8, 6), (5, 5), (7, 9)])
+        stop_after = rng.randint(1, 6) if number % 5 == 0 else None  # Some games end mid-turn
+        game, winner, boards = play_random_game(rng, rows, cols, stop_after)
+        games.append((GameRecord.from_game(game, winner, {"number": number}), game, boards))
+
+    # Written by two writers, the second appending to the same file
+    for start, end in ((0, 25), (25, 40)):
+        with GameRecordWriter(path) as writer:
+            for record, _, _ in games[start:end]:
+                writer.write(record)
+
+    records = list(read_records(path))
+    assert len(records) == len(games)
+    for record, (written, game, boards) in zip(records, games):
+        assert record.pack() == written.pack()
+        assert record.info == {"number": written.info["number"], "players": ["One", "Two"]}
+        assert len(record) == len(game.history)
+        assert [board.copy() for board in record.boards()] == boards
+
+        replayed = replay(record)
+        assert replayed.bitboard == game.bitboard
+        assert replayed.history == game.history
+        assert replayed.move_counts == game.move_counts
+        assert replayed.removal_counts == game.removal_counts
+        assert replayed.start_squares == game.start_squares
+        for turn in range(len(record) + 1):
+            assert replay(record, turn).bitboard == boards[turn]
+
+
+def test_truncated_record_is_skipped(tmp_path, caplog):
+    rng = random.Random(1)
+    path = tmp_path / "games.bin"
+    with GameRecordWriter(str(path)) as writer:
+        for _ in range(3):
+            game, winner, _ = play_random_game(rng, 8, 6)
+            writer.write(GameRecord.from_game(game, winner))
+    path.write_bytes(path.read_bytes()[:-3])
+    with caplog.at_level("WARNING", logger="IsolationGameLogger"):
+        assert len(list(read_records(str(path)))) == 2
+    assert "truncated" in caplog.text
+
+
+def test_large_boards_do_not_fit():
+    assert fits(15, 16) and not fits(16, 16)
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"), 16, 16)
+    with pytest.raises(ValueError):
+        GameRecord.from_game(game)
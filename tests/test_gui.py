@@ -0,0 +1,73 @@
+import logging
+import pytest
+from collections import deque
+
+tk = pytest.importorskip("tkinter")
+from src.gui import ListboxHandler  # noqa: E402
+
+
+class FakeListbox:
+    """Records what the handler inserts, without a display."""
+
+    def __init__(self):
+        self.lines = []
+
+    def insert(self, index, *lines):
+        self.lines.extend(lines)
+
+    def delete(self, first, last=None):
+        del self.lines[first:len(self.lines) if last == tk.END else last + 1]
+
+    def yview(self, *args):
+        pass
+
+    def after_idle(self, callback):
+        pass
+
+
+class InterruptedDeque(deque):
+    """Pending messages that get one more message logged while they are being read, as a search thread might."""
+
+    def __init__(self, handler, maxlen):
+        super().__init__(maxlen=maxlen)
+        self.handler = handler
+        self.interrupted = False
+
+    def interrupt(self):
+        if not self.interrupted:
+            self.interrupted = True
+            self.handler.emit(logging.makeLogRecord({"msg": "meanwhile"}))
+
+    def __iter__(self):
+        yield from list(super().__iter__())
+        self.interrupt()
+
+    def popleft(self):
+        value = super().popleft()
+        self.interrupt()
+        return value
+
+
+def test_flush_keeps_messages_logged_meanwhile():
+    listbox = FakeListbox()
+    handler = ListboxHandler(listbox)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    handler.pending = InterruptedDeque(handler, handler.max_lines)
+    for number in range(3):
+        handler.emit(logging.makeLogRecord({"msg": str(number)}))
+    handler.flush()
+    handler.flush()
+    assert listbox.lines == ["0", "1", "2", "meanwhile"]
+
+
+def test_only_the_newest_lines_are_kept():
+    listbox = FakeListbox()
+    handler = ListboxHandler(listbox, max_lines=5)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    for number in range(4):
+        handler.emit(logging.makeLogRecord({"msg": str(number)}))
+    handler.flush()
+    for number in range(4, 12):
+        handler.emit(logging.makeLogRecord({"msg": str(number)}))
+    handler.flush()
+    assert listbox.lines == ["7", "8", "9", "10", "11"]
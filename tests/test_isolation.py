@@ -0,0 +1,67 @@
+import random
+import pytest
+from src.isolation import Isolation
+from src.player import HumanPlayer
+from src.bitboard import BitBoard
+
+
+def random_game(rng, rows=8, cols=6, turns=10):
+    """A game after up to ``turns`` random full turns."""
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"), rows, cols)
+    for _ in range(turns):
+        mover = game.players[game.current_player_index]
+        moves = game.get_available_moves(mover)
+        if not moves:
+            break
+        game.make_move(mover, *rng.choice(moves))
+        game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+        game.current_player_index ^= 1
+    return game
+
+
+def snapshot(game):
+    """Everything apply/undo must leave as it was."""
+    bitboard = game.bitboard
+    return (bitboard.copy(), bitboard.key, list(game.move_counts), list(game.removal_counts), list(game.history))
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_undo_restores_state_and_hash(seed):
+    rng = random.Random(seed)
+    game = random_game(rng, *rng.choice([(8, 6), (6, 6), (9, 7)]), turns=rng.randint(0, 12))
+    before = snapshot(game)
+    states = []
+    for _ in range(rng.randint(1, 8)):
+        index = game.current_player_index
+        moves = game.get_available_moves(game.players[index])
+        if not moves:
+            break
+        states.append(snapshot(game))
+        game.apply_move(game.players[index], rng.choice(moves))
+        states.append(snapshot(game))
+        game.apply_token_removal(*rng.choice(game.get_available_tokens_to_remove()))
+        game.current_player_index ^= 1
+
+    # The key is updated incrementally, and must match one computed from scratch
+    bitboard = game.bitboard
+    assert bitboard.key == BitBoard(bitboard.positions, bitboard.removed, bitboard.geometry).key
+
+    # Undo turn by turn; the side to move is the caller's to switch back
+    while states:
+        game.current_player_index ^= 1
+        game.undo()
+        assert snapshot(game) == states.pop()
+        game.undo()
+        assert snapshot(game) == states.pop()
+    assert not game.undo_stack
+    assert snapshot(game) == before
+
+
+def test_mock_actions_leave_the_game_alone():
+    game = random_game(random.Random(0))
+    before = snapshot(game)
+    mover = game.players[game.current_player_index]
+    mock = game.mock_move(mover, game.get_available_moves(mover)[0])
+    assert mock.bitboard != game.bitboard
+    assert game.mock_remove_token(*game.get_available_tokens_to_remove()[0]).bitboard != game.bitboard
+    assert snapshot(game) == before
@@ -0,0 +1,66 @@
+import time
+import random
+import pytest
+from src.isolation import Isolation
+from src.player import ComputerPlayer, HumanPlayer
+
+
+def midgame(player, seed, turns=6):
+    """A position after a few random turns, with ``player`` in seat 0 to move."""
+    rng = random.Random(seed)
+    game = Isolation(player, HumanPlayer("Opponent"))
+    for _ in range(turns):
+        mover = game.players[game.current_player_index]
+        game.make_move(mover, *rng.choice(game.get_available_moves(mover)))
+        game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+        game.current_player_index ^= 1
+    game.current_player_index = 0
+    return game
+
+
+@pytest.mark.parametrize("time_limit", [0.05, 0.3])
+def test_deadline_ends_the_search(monkeypatch, time_limit):
+    monkeypatch.setattr(ComputerPlayer, "DEPTH", 40)  # Only the deadline can end the search
+    player = ComputerPlayer("Player", time_limit=time_limit)
+    game = midgame(player, 0)
+    before = game.bitboard.copy()
+    start = time.time()
+    move = player.choose_move(game)
+    assert time.time() - start < time_limit + 0.25
+    assert move in game.get_available_moves(player)
+
+    # The aborted iteration left nothing applied
+    assert game.bitboard == before and not game.undo_stack
+    assert player.stats.depth >= 1 and player.stats.depth == len(player.stats.iterations)
+    assert player.principal_variation[0] == move
+
+
+def test_depth_limit_ends_the_search(monkeypatch):
+    monkeypatch.setattr(ComputerPlayer, "DEPTH", 3)
+    player = ComputerPlayer("Player", time_limit=60.0)
+    game = midgame(player, 1)
+    player.choose_move(game)
+    assert [iteration["depth"] for iteration in player.stats.iterations] == [1, 2, 3]
+    assert player.search_depth == 3
+
+
+def test_time_limit_argument_overrides_the_player_budget(monkeypatch):
+    monkeypatch.setattr(ComputerPlayer, "DEPTH", 40)
+    player = ComputerPlayer("Player", time_limit=60.0)
+    game = midgame(player, 2)
+    start = time.time()
+    player.choose_move(game, time_limit=0.1)
+    assert time.time() - start < 0.5
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_aspiration_windows_keep_the_result(monkeypatch, seed):
+    monkeypatch.setattr(ComputerPlayer, "DEPTH", 4)
+    results = []
+    for window in (None, 0.5):
+        player = ComputerPlayer("Player", tt_size=0, eval_cache_size=0, move_ordering=False, time_limit=60.0,
+                                aspiration_window=window)
+        game = midgame(player, seed)
+        move = player.choose_move(game)
+        results.append((move, [iteration["value"] for iteration in player.stats.iterations]))
+    assert results[0] == results[1]
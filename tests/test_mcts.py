@@ -0,0 +1,141 @@
+import pytest
+from src.isolation import Isolation
+from src.player import MCTSPlayer, HumanPlayer
+
+
+def new_game(player):
+    """A game at the start with ``player`` to move from seat 0."""
+    game = Isolation(player, HumanPlayer("Opponent"))
+    game.current_player_index = 0
+    return game
+
+
+def assert_legal_turn(game, player, move):
+    """Checks the move and the removal the player plans after it."""
+    assert move in game.get_available_moves(player)
+    game.make_move(player, *move)
+    token = player.choose_token_to_remove(game)
+    assert game.is_valid_token_removal(*token)
+
+
+@pytest.mark.parametrize("budget", [dict(iterations=0), dict(time_limit=0), dict(time_limit=-1.0),
+                                    dict(iterations=10, max_nodes=1)])
+def test_choose_move_without_simulations(budget):
+    player = MCTSPlayer("MCTS", seed=1, **budget)
+    game = new_game(player)
+    assert_legal_turn(game, player, player.choose_move(game))
+
+
+def test_choose_move_stopped_before_the_first_simulation():
+    player = MCTSPlayer("MCTS", time_limit=10.0, seed=1)
+    reuse_tree = player._reuse_tree
+
+    def reuse_then_stop(game_state, our_index):
+        # Lands after choose_move has cleared earlier stop requests
+        pool = reuse_tree(game_state, our_index)
+        player.stop()
+        return pool
+
+    player._reuse_tree = reuse_then_stop
+    game = new_game(player)
+    assert_legal_turn(game, player, player.choose_move(game))
+    assert player.pool.visits[0] == 0
+
+
+def test_search_tree_is_reused_after_both_turns():
+    player = MCTSPlayer("MCTS", iterations=600, seed=2)
+    opponent = HumanPlayer("Opponent")
+    game = Isolation(player, opponent)
+    game.current_player_index = 0
+    move = player.choose_move(game)
+    pool = player.pool
+    ours = max(pool.children(0), key=lambda child: pool.visits[child])  # The action choose_move played
+    game.make_move(player, *move)
+    game.remove_token(*player.choose_token_to_remove(game))
+    game.current_player_index = 1
+
+    # The opponent answers with its most visited reply in our tree
+    coords = game.geometry.coords
+    theirs = max(pool.children(ours), key=lambda child: pool.visits[child])
+    kept = pool.visits[theirs]
+    assert kept > 0
+    game.make_move(opponent, *coords(pool.move[theirs]))
+    game.remove_token(*coords(pool.removal[theirs]))
+    game.current_player_index = 0
+
+    player.choose_move(game)
+    assert player.pool.visits[0] == kept + 600
+
+
+def test_subtree_keeps_children_contiguous():
+    player = MCTSPlayer("MCTS", iterations=300, seed=3)
+    game = new_game(player)
+    player.choose_move(game)
+    pool = player.pool
+    node = max(pool.children(0), key=lambda child: pool.visits[child])
+    subtree = pool.subtree(node)
+    assert subtree.visits[0] == pool.visits[node]
+    pairs = [(node, 0)]
+    for old, new in pairs:
+        assert subtree.child_count[new] == pool.child_count[old]
+        for old_child, new_child in zip(pool.children(old), subtree.children(new)):
+            assert subtree.parent[new_child] == new
+            assert (subtree.move[new_child], subtree.removal[new_child], subtree.mover[new_child],
+                    subtree.visits[new_child], subtree.rewards[new_child]) == \
+                   (pool.move[old_child], pool.removal[old_child], pool.mover[old_child],
+                    pool.visits[old_child], pool.rewards[old_child])
+            pairs.append((old_child, new_child))
+    assert len(pairs) == len(subtree)
+
+
+def test_children_are_contiguous_and_visits_add_up():
+    player = MCTSPlayer("MCTS", iterations=400, seed=4)
+    game = new_game(player)
+    move = player.choose_move(game)
+    pool = player.pool
+    assert pool.visits[0] == 400
+    root_actions = game.bitboard.turn_actions(0)
+    assert [(pool.move[child], pool.removal[child]) for child in pool.children(0)] == root_actions
+    for node in range(len(pool)):
+        assert pool.rewards[node] <= pool.visits[node]
+        children = pool.children(node)
+        assert all(pool.parent[child] == node for child in children)
+        if len(children):
+            # Every simulation through an expanded node went on to one of its children, but the one that expanded it
+            assert sum(pool.visits[child] for child in children) in (pool.visits[node], pool.visits[node] - 1)
+    best = max(pool.children(0), key=lambda child: pool.visits[child])
+    assert game.geometry.coords(pool.move[best]) == move
+
+
+def test_planned_removal_is_replayed():
+    player = MCTSPlayer("MCTS", iterations=200, seed=5)
+    game = new_game(player)
+    move = player.choose_move(game)
+    pool = player.pool
+    best = max(pool.children(0), key=lambda child: pool.visits[child])
+    game.make_move(player, *move)
+    assert player.choose_token_to_remove(game) == game.geometry.coords(pool.removal[best])
+
+
+def test_select_child_tries_unvisited_children_first():
+    player = MCTSPlayer("MCTS", iterations=0, seed=6)
+    game = new_game(player)
+    player.choose_move(game)
+    pool = player.pool
+    children = list(pool.children(0))
+    pool.visits[0] = 10
+    for child in children[:3]:
+        pool.visits[child], pool.rewards[child] = 3, 1.0
+    assert player._select_child(0) == children[3]
+    for child in children[3:]:
+        pool.visits[child], pool.rewards[child] = 3, 1.0
+    pool.rewards[children[5]] = 3.0
+    assert player._select_child(0) == children[5]
+
+
+def test_same_seed_gives_the_same_move():
+    moves = []
+    for _ in range(2):
+        player = MCTSPlayer("MCTS", iterations=300, seed=7)
+        moves.append(player.choose_move(new_game(player)))
+    assert moves[0] == moves[1]
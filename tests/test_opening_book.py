@@ -0,0 +1,67 @@
+import pytest
+from src.isolation import Isolation
+from src.player import ComputerPlayer, HumanPlayer
+from src.opening_book import OpeningBook, write_book, build_book, position_key, fits
+
+
+def test_large_boards_round_trip(tmp_path):
+    path = str(tmp_path / "book.bin")
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"), 20, 20)
+    bitboard = game.bitboard
+    move = bitboard.move_squares(0)[0]
+    entries = {position_key(bitboard, 0): (move, 399), 5: (300, 2), 1 << 63: (0, 1)}
+    write_book(path, entries, 20, 20)
+    book = OpeningBook(path)
+    try:
+        assert len(book) == 3 and (book.rows, book.cols) == (20, 20)
+        for key, entry in entries.items():
+            assert book.lookup(key) == entry
+        assert book.lookup(6) is None
+        assert book.probe(game, game.players[0]) == (game.geometry.coords(move), game.geometry.coords(399))
+        assert book.probe(game, game.players[1]) is None
+    finally:
+        book.close()
+
+
+def test_book_only_answers_for_its_board_size(tmp_path):
+    path = str(tmp_path / "book.bin")
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"))
+    bitboard = game.bitboard
+    write_book(path, {position_key(bitboard, 0): (bitboard.move_squares(0)[0], 10)})
+    book = OpeningBook(path)
+    try:
+        assert book.probe(game, game.players[0]) is not None
+        other = Isolation(HumanPlayer("One"), HumanPlayer("Two"), 6, 8)
+        assert book.probe(other, other.players[0]) is None
+    finally:
+        book.close()
+
+
+def test_other_files_are_refused(tmp_path):
+    path = tmp_path / "book.bin"
+    path.write_bytes(b"ISOBOOK2" + bytes(8))
+    with pytest.raises(ValueError):
+        OpeningBook(str(path))
+
+
+def test_oversized_boards_are_refused_before_searching(tmp_path):
+    assert fits(256, 256) and not fits(256, 257)
+    with pytest.raises(ValueError):
+        build_book(str(tmp_path / "book.bin"), rows=300, cols=300)
+
+
+def test_built_book_is_played(tmp_path):
+    path = str(tmp_path / "book.bin")
+    assert build_book(path, turns=1, replies=2, time_limit=0.05, rows=5, cols=5) == 2
+    player = ComputerPlayer("Player", opening_book=path)
+    try:
+        for first in (0, 1):
+            game = Isolation(player, HumanPlayer("Opponent"), 5, 5) if first == 0 else \
+                Isolation(HumanPlayer("Opponent"), player, 5, 5)
+            game.current_player_index = first
+            move = player.choose_move(game)
+            assert player.stats.source == "book"
+            game.make_move(player, *move)
+            assert game.remove_token(*player.choose_token_to_remove(game))
+    finally:
+        player.opening_book.close()
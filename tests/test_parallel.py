@@ -0,0 +1,77 @@
+import time
+import random
+import threading
+import pytest
+from src.isolation import Isolation
+from src.player import ComputerPlayer, HumanPlayer, _search_root_slice, _worker_players
+
+
+def midgame(player, seed, turns=4):
+    """A position after a few random turns, with ``player`` in seat 0 to move."""
+    rng = random.Random(seed)
+    game = Isolation(player, HumanPlayer("Opponent"))
+    for _ in range(turns):
+        mover = game.players[game.current_player_index]
+        game.make_move(mover, *rng.choice(game.get_available_moves(mover)))
+        game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+        game.current_player_index ^= 1
+    game.current_player_index = 0
+    return game
+
+
+def test_parallel_search_matches_serial_search(monkeypatch):
+    monkeypatch.setattr(ComputerPlayer, "DEPTH", 4)
+    values = []
+    for workers in (1, 2):
+        player = ComputerPlayer("Player", workers=workers, time_limit=60.0, tt_exact_depth=True)
+        try:
+            game = midgame(player, 0)
+            move = player.choose_move(game)
+            assert move in game.get_available_moves(player)
+            values.append([iteration["value"] for iteration in player.stats.iterations])
+        finally:
+            player.close()
+    assert values[0] == values[1]
+
+
+def test_stop_reaches_worker_processes(monkeypatch):
+    monkeypatch.setattr(ComputerPlayer, "DEPTH", 30)  # Deep enough that only the stop ends the search
+    player = ComputerPlayer("Parallel", workers=2, time_limit=60.0)
+    game = Isolation(player, HumanPlayer("Opponent"))
+    chosen = []
+    search = threading.Thread(target=lambda: chosen.append(player.choose_move(game.copy())))
+    try:
+        start = time.time()
+        search.start()
+        time.sleep(0.5)
+        player.stop()
+        search.join(10.0)
+        assert not search.is_alive()
+        assert time.time() - start < 5.0
+        assert chosen[0] in game.get_available_moves(player)
+    finally:
+        player.close()
+
+
+def test_workers_keep_a_searcher_per_heuristic():
+    _worker_players.clear()
+    game = midgame(HumanPlayer("Player"), 1)
+    bitboard = game.bitboard
+    actions = bitboard.move_squares(0)
+    settings = (1 << 12, None, False, False, True, 3, 1 << 12, None,
+                tuple(ComputerPlayer("Defaults").weights.values()), None, True)
+    results = {}
+    for heuristic in ("aggressive_approach_heuristic", "enhanced_difference_heuristic", "aggressive_approach_heuristic"):
+        iterations, _ = _search_root_slice(bitboard.copy(), 0, heuristic, settings, actions, time.time(), 60.0)
+        values = [value for _, _, value, _, _ in iterations]
+        assert results.setdefault(heuristic, values) == values
+
+        # The same values as a fresh searcher with that heuristic
+        fresh = ComputerPlayer("Fresh", tt_size=1 << 12, tt_exact_depth=True, move_ordering=False)
+        fresh.heuristic = getattr(fresh, heuristic)
+        fresh_game = Isolation(fresh, HumanPlayer("Opponent"))
+        fresh_game.bitboard = bitboard.copy()
+        fresh_iterations = fresh._iterative_deepening(fresh_game, actions, time.time(), 60.0, 3, stop_on_loss=False)
+        assert [value for _, _, value, _, _ in fresh_iterations] == values
+    assert len(_worker_players) == 2
+    _worker_players.clear()
@@ -0,0 +1,71 @@
+import time
+import random
+from src.isolation import Isolation
+from src.player import ComputerPlayer, HumanPlayer
+
+
+def after_our_turn(player, seed=0):
+    """A game where ``player`` in seat 0 has just played a random turn, with the opponent to move."""
+    rng = random.Random(seed)
+    game = Isolation(player, HumanPlayer("Opponent"))
+    game.current_player_index = 0
+    game.make_move(player, *rng.choice(game.get_available_moves(player)))
+    game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+    game.current_player_index = 1
+    return game
+
+
+def test_ponder_is_opt_in():
+    for player in (ComputerPlayer("Player"), ComputerPlayer("Parallel", pondering=True, workers=2)):
+        player.ponder(after_our_turn(player))
+        assert player._ponder_thread is None
+    HumanPlayer("Human").ponder(after_our_turn(HumanPlayer("Human")))
+
+
+def test_ponder_leaves_the_game_alone(monkeypatch):
+    monkeypatch.setattr(ComputerPlayer, "DEPTH", 30)  # Deep enough that only stop_pondering ends the thread
+    player = ComputerPlayer("Player", pondering=True)
+    game = after_our_turn(player)
+    before = game.bitboard.copy()
+    player.ponder(game)
+    time.sleep(0.2)
+    assert player._ponder_thread.is_alive()
+    player.stop_pondering()
+    assert player._ponder_thread is None
+    assert game.bitboard == before and not game.undo_stack
+
+
+def test_pondered_reply_is_reported():
+    player = ComputerPlayer("Player", pondering=True, time_limit=0.2)
+    game = after_our_turn(player, 1)
+    player.ponder(game)
+    time.sleep(0.5)
+
+    # The opponent plays one of the turns that was pondered
+    opponent = game.players[1]
+    pondered = None
+    for move, removal in game.bitboard.turn_actions(1):
+        board = game.bitboard.copy()
+        board.move(1, move)
+        board.remove(removal)
+        if player._pondered.get(board.key, 0) >= 1:
+            pondered = (move, removal)
+            break
+    assert pondered is not None
+    coords = game.geometry.coords
+    game.make_move(opponent, *coords(pondered[0]))
+    game.remove_token(*coords(pondered[1]))
+    game.current_player_index = 0
+
+    move = player.choose_move(game)
+    assert player._ponder_thread is None  # choose_move stopped the thread first
+    assert move in game.get_available_moves(player)
+    assert player.stats.ponder_depth >= 1
+
+
+def test_no_pondering_while_a_removal_is_pending():
+    player = ComputerPlayer("Player", pondering=True)
+    game = Isolation(HumanPlayer("Opponent"), player)
+    game.make_move(game.players[0], *game.get_available_moves(game.players[0])[0])
+    player.ponder(game)
+    assert player._ponder_thread is None
@@ -0,0 +1,29 @@
+import pytest
+from src.isolation import Isolation
+from src.player import ComputerPlayer, HumanPlayer
+from src.bitboard import iter_squares
+from src.move_ordering import MoveOrdering
+
+
+def test_stats_source_of_forced_and_missing_moves():
+    player = ComputerPlayer("Player")
+    game = Isolation(player, HumanPlayer("Opponent"))
+    bitboard = game.bitboard
+    neighbors = list(iter_squares(bitboard.geometry.neighbors[bitboard.positions[0]]))
+    for sq in neighbors[1:]:
+        bitboard.remove(sq)
+    assert player.choose_move(game) == bitboard.geometry.coords(neighbors[0])
+    assert player.stats.source == "forced"
+    bitboard.remove(neighbors[0])
+    assert player.choose_move(game) is None
+    assert player.stats.source == "no_moves"
+
+
+def test_killers_are_kept_per_ply():
+    game = Isolation(HumanPlayer("One"), HumanPlayer("Two"))
+    bitboard = game.bitboard
+    moves = bitboard.move_squares(0)
+    ordering = MoveOrdering(history=False, mobility=False)
+    ordering.cutoff(moves[-1], 2, 5, bitboard, 0)
+    assert ordering.order(moves, 2, bitboard, 0)[0] == moves[-1]
+    assert ordering.order(moves, 3, bitboard, 0) == moves
@@ -0,0 +1,98 @@
+import time
+from src.bitboard import ZOBRIST_SIDE, ZOBRIST_FULL_TURN
+from src.isolation import Isolation
+from src.player import ComputerPlayer, HumanPlayer
+from tests.test_pondering import after_our_turn
+
+
+def root_key(game, index, full_turn=False):
+    """The transposition table key of the game position with seat ``index`` to move."""
+    key = game.bitboard.key ^ ZOBRIST_SIDE[index]
+    return key ^ ZOBRIST_FULL_TURN if full_turn else key
+
+
+def first_root_action(player):
+    """Wraps the player's root search to record the action its first iteration tries first."""
+    seen = []
+    search_root = player._search_root
+
+    def record(game_state, root_actions, *args):
+        if not seen:
+            seen.append(root_actions[0])
+        return search_root(game_state, root_actions, *args)
+
+    player._search_root = record
+    return seen
+
+
+def test_root_entry_is_stored_under_the_position():
+    for search_removals in (False, True):
+        player = ComputerPlayer("Player", time_limit=0.2, search_removals=search_removals)
+        game = Isolation(player, HumanPlayer("Opponent"))
+        game.current_player_index = 0
+        move = player.choose_move(game)
+        entry = player.transposition_table.probe(root_key(game, 0, search_removals))
+        assert entry is not None and entry[1] >= 1
+        action = entry[4][0] if search_removals else entry[4]
+        assert game.geometry.coords(action) == move
+
+
+def test_second_turn_root_finds_its_move_in_the_table():
+    player = ComputerPlayer("Player", pondering=True, time_limit=0.2)
+    game = after_our_turn(player, 1)
+    player.ponder(game)
+    time.sleep(0.5)
+    player.stop_pondering()
+
+    # The opponent plays one of the turns that was pondered
+    opponent = game.players[1]
+    coords = game.geometry.coords
+    for move, removal in game.bitboard.turn_actions(1):
+        board = game.bitboard.copy()
+        board.move(1, move)
+        board.remove(removal)
+        if player._pondered.get(board.key, 0) >= 1:
+            break
+    else:
+        assert False, "nothing was pondered"
+    game.make_move(opponent, *coords(move))
+    game.remove_token(*coords(removal))
+    game.current_player_index = 0
+
+    entry = player.transposition_table.probe(root_key(game, 0))
+    assert entry is not None and entry[4] in game.bitboard.move_squares(0)
+    seen = first_root_action(player)
+    player.choose_move(game)
+    assert seen == [entry[4]]
+
+
+def test_principal_variation_is_followed_along_the_played_line():
+    player = ComputerPlayer("Player", time_limit=0.2)
+    opponent = HumanPlayer("Opponent")
+    game = Isolation(player, opponent)
+    game.current_player_index = 0
+    player.choose_move(game)
+    ours, theirs, expected = player.principal_variation[:3]
+
+    # Our turn keeps the removal that was searched; the opponent answers as expected
+    game.make_move(player, *ours)
+    game.remove_token(*player.choose_token_to_remove(game))
+    game.current_player_index = 1
+    game.make_move(opponent, *theirs)
+    game.remove_token(*next(token for token in game.get_available_tokens_to_remove() if token != expected))
+    game.current_player_index = 0
+
+    assert player.transposition_table.probe(root_key(game, 0)) is None
+    seen = first_root_action(player)
+    player.choose_move(game)
+    assert seen == [game.geometry.square(*expected)]
+
+
+def test_new_game_forgets_the_line():
+    player = ComputerPlayer("Player", time_limit=0.1)
+    game = Isolation(player, HumanPlayer("Opponent"))
+    game.current_player_index = 0
+    player.choose_move(game)
+    assert player._last_line is not None
+    player.new_game()
+    assert player._last_line is None
@@ -0,0 +1,76 @@
+import io
+import json
+import pytest
+from src.player import ComputerPlayer, MCTSPlayer
+from src.game_record import replay
+from src.selfplay import (parse_engine_spec, make_player, play_game, run_match, summarize, wilson_interval,
+                          elo_difference)
+
+FAST = "minimax:time_limit=0.02"
+MCTS = "mcts:iterations=30"
+
+
+def test_parse_engine_spec():
+    assert parse_engine_spec("minimax") == ("minimax", {})
+    assert parse_engine_spec("minimax:search_removals=true,tt_size=0,aspiration_window=0.5,opening_book=none") == \
+        ("minimax", {"search_removals": True, "tt_size": 0, "aspiration_window": 0.5, "opening_book": None})
+    assert parse_engine_spec("mcts:iterations=2000") == ("mcts", {"iterations": 2000})
+    with pytest.raises(ValueError):
+        parse_engine_spec("alphazero")
+
+
+def test_make_player_options():
+    player = make_player("minimax:heuristic=composite_heuristic,mobility_lambda=0.75,tt_size=0", "A")
+    assert isinstance(player, ComputerPlayer)
+    assert player.heuristic == player.composite_heuristic
+    assert player.mobility_lambda == 0.75 and player.transposition_table is None
+    assert isinstance(make_player(MCTS, "B", seed=3), MCTSPlayer)
+
+
+@pytest.mark.parametrize("first_player_index", [0, 1])
+def test_play_game_to_the_end(first_player_index):
+    players = [make_player(FAST, "A"), make_player(MCTS, "B", seed=1)]
+    result = play_game(players[0], players[1], first_player_index, rows=5, cols=5)
+    record = result["record"]
+    game = replay(record)
+    assert result["winner"] in (0, 1)
+    assert result["plies"] == len(record)
+    assert result["moves"] == game.move_counts and result["tokens_removed"] == game.removal_counts
+    # The loser is the player to move, and it is stuck
+    assert not game.get_available_moves(game.players[1 - result["winner"]])
+
+
+def test_max_plies_cuts_the_game_short():
+    players = [make_player(FAST, "A"), make_player(FAST, "B")]
+    result = play_game(players[0], players[1], max_plies=3)
+    assert result["winner"] is None and result["plies"] == 3
+    assert sum(result["moves"]) == 3
+
+
+def test_run_match_alternates_seats_and_streams_results():
+    output = io.StringIO()
+    results = run_match(FAST, MCTS, 4, seed=10, output=output, rows=5, cols=5)
+    assert [result["game"] for result in results] == [0, 1, 2, 3]
+    assert [result["a_seat"] for result in results] == [0, 1, 0, 1]
+    assert [result["first_player"] for result in results] == [0, 0, 1, 1]
+    assert [json.loads(line)["game"] for line in output.getvalue().splitlines()] == [0, 1, 2, 3]
+    summary = summarize(results)
+    assert summary["games"] == 4 and summary["wins"] == sum(result["a_won"] for result in results)
+
+
+def test_run_match_is_reproducible_across_processes():
+    serial = run_match(MCTS, MCTS, 2, seed=4, rows=5, cols=5)
+    parallel = run_match(MCTS, MCTS, 2, workers=2, seed=4, rows=5, cols=5)
+    key = lambda result: result["game"]
+    assert [(r["winner"], r["plies"]) for r in sorted(serial, key=key)] == \
+           [(r["winner"], r["plies"]) for r in sorted(parallel, key=key)]
+
+
+def test_wilson_interval_and_elo():
+    low, high = wilson_interval(50, 100)
+    assert low < 0.5 < high and abs((0.5 - low) - (high - 0.5)) < 1e-9
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    assert wilson_interval(10, 10)[1] == pytest.approx(1.0)
+    assert elo_difference(0.5) == 0
+    assert round(elo_difference(0.75)) == 191
+    assert elo_difference(1.0) == pytest.approx(-elo_difference(0.0))
@@ -0,0 +1,97 @@
+import random
+import pytest
+from functools import lru_cache
+from src import endgame
+from src.bitboard import BitBoard, geometry, iter_squares
+from src.tablebase import Tablebase, build_tablebase, _preference
+
+MAX_OPEN = 3
+
+
+@pytest.fixture(scope="module")
+def tablebase(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("tablebase") / "tablebase.bin")
+    build_tablebase(path, MAX_OPEN, workers=1)
+    tablebase = Tablebase(path)
+    yield tablebase
+    tablebase.close()
+
+
+@lru_cache(maxsize=None)
+def solve(rows, cols, removed, positions, mover):
+    """Brute-force (won, distance) for the mover: quickest win, or the longest loss."""
+    board = BitBoard(positions, removed, geometry(rows, cols))
+    best = (False, 0)
+    for move in board.move_squares(mover):
+        after = list(positions)
+        after[mover] = move
+        board.move(mover, move)
+        removable = board.removable_mask()
+        board.move(mover, positions[mover])
+        for sq in iter_squares(removable):
+            won, distance = solve(rows, cols, removed | 1 << sq, tuple(after), 1 - mover)
+            result = (not won, distance + 1)
+            if _preference(result) > _preference(best):
+                best = result
+    return best
+
+
+def small_positions(seed, count, open_cells=MAX_OPEN):
+    """Random positions with at most ``open_cells`` open cells on boards of several sizes."""
+    rng = random.Random(seed)
+    positions = []
+    for _ in range(count):
+        rows, cols = rng.choice([(3, 3), (3, 4), (4, 4), (5, 6), (8, 6)])
+        board_geometry = geometry(rows, cols)
+        squares = rng.sample(range(board_geometry.num_squares), 2 + rng.randint(0, open_cells))
+        removed = board_geometry.full_mask
+        for sq in squares:
+            removed &= ~(1 << sq)
+        positions.append(BitBoard(squares[:2], removed, board_geometry))
+    return positions
+
+
+def brute_force(board, mover):
+    return solve(board.geometry.rows, board.geometry.cols, board.removed, tuple(board.positions), mover)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_probe_matches_brute_force(tablebase, seed):
+    for board in small_positions(seed, 100):
+        for mover in (0, 1):
+            result = tablebase.probe(board, mover)
+            assert result == brute_force(board, mover)
+            # The exact endgame solver agrees on who wins once the players are walled off
+            winner = endgame.solve(board, mover)
+            if winner is not None:
+                assert result[0] == (winner == mover)
+
+
+def test_probe_with_a_pending_removal(tablebase):
+    for board in small_positions(10, 100, MAX_OPEN + 1):
+        removable = list(iter_squares(board.removable_mask()))
+        worst = min((brute_force(BitBoard(board.positions, board.removed | 1 << sq, board.geometry), 0)
+                     for sq in removable), key=_preference, default=brute_force(board, 0))
+        assert tablebase.probe(board, 0, removal_pending=True) == worst
+
+
+def test_best_action_keeps_the_result(tablebase):
+    for board in small_positions(11, 200):
+        result = brute_force(board, 0)
+        action = tablebase.best_action(board, 0)
+        if not board.move_squares(0):
+            assert action is None
+            continue
+        move, removal = action
+        after = board.copy()
+        after.move(0, move)
+        assert removal in iter_squares(after.removable_mask())
+        after.remove(removal)
+        won, distance = brute_force(after, 1)
+        assert (not won, distance + 1) == result
+
+
+def test_positions_beyond_the_tablebase(tablebase):
+    board = BitBoard((0, 15), 0, geometry(4, 4))
+    assert tablebase.probe(board, 0) is None
+    assert tablebase.best_action(board, 0) is None
@@ -0,0 +1,68 @@
+import random
+import pytest
+from src import vectorized
+from src.isolation import Isolation
+from src.player import ComputerPlayer, HumanPlayer
+
+
+def reference_removal(game, player):
+    """The token removal heuristic scored the slow way, applying and undoing every removal and opponent move."""
+    tokens = game.get_available_tokens_to_remove()
+    if len(tokens) == 1:
+        return tokens[0]
+    opponent = game.players[1 - game.player_index(player)]
+    opponent_position = game.get_player_position(opponent)
+    token_factor = bin(game.bitboard.blocked()).count("1") / (8 * 6)
+    scores = {}
+    for token in tokens:
+        score = 0
+        score -= (abs(opponent_position[0] - token[0]) + abs(opponent_position[1] - token[1])) * token_factor
+        score -= (abs(4 - token[0]) + abs(3 - token[1])) * (1 - token_factor)
+        game.apply_token_removal(*token)
+        best = 0
+        for move in game.get_available_moves(opponent):
+            game.apply_move(opponent, move)
+            best = max(best, player.frontier_cells_heuristic(game, opponent))
+            game.undo()
+        score -= best
+        after = len(game.get_available_moves(opponent))
+        game.undo()
+        score += len(game.get_available_moves(opponent)) - after
+        score += random.uniform(0, 1)
+        scores[token] = score
+    return max(scores, key=scores.get)
+
+
+def removal_positions(count, seed=0):
+    """Random 8x6 positions where the player in seat 0 has just moved and has to remove a token."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        player = ComputerPlayer("Remover", tt_size=0, eval_cache_size=0)
+        game = Isolation(player, HumanPlayer("Opponent"))
+        game.current_player_index = rng.randint(0, 1)
+        for _ in range(rng.randint(0, 14)):
+            mover = game.players[game.current_player_index]
+            moves = game.get_available_moves(mover)
+            if not moves:
+                break
+            game.make_move(mover, *rng.choice(moves))
+            game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+            game.current_player_index ^= 1
+        moves = game.get_available_moves(player)
+        if moves:
+            game.current_player_index = 0
+            game.make_move(player, *rng.choice(moves))
+            positions.append((game, player))
+    return positions
+
+
+@pytest.mark.parametrize("batch_evaluation", [False, pytest.param(True, marks=pytest.mark.skipif(
+    not vectorized.AVAILABLE, reason="NumPy is not installed"))])
+def test_removal_matches_reference(batch_evaluation):
+    for index, (game, player) in enumerate(removal_positions(3000)):
+        player.batch_evaluation = batch_evaluation
+        random.seed(index)
+        expected = reference_removal(game, player)
+        random.seed(index)
+        assert player.token_removal_heuristic(game) == expected
@@ -0,0 +1,113 @@
+import random
+import pytest
+from src.isolation import Isolation
+from src.player import ComputerPlayer, HumanPlayer
+from src.bitboard import ZOBRIST_SIDE
+from src.transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+
+def random_game(rng, player, turns):
+    """Plays up to ``turns`` random full turns from the start with ``player`` in seat 0."""
+    game = Isolation(player, HumanPlayer("Opponent"))
+    for _ in range(turns):
+        mover = game.players[game.current_player_index]
+        moves = game.get_available_moves(mover)
+        if not moves:
+            break
+        game.make_move(mover, *rng.choice(moves))
+        game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+        game.current_player_index ^= 1
+    game.current_player_index = 0
+    return game
+
+
+def search_root(player, bitboard, depth):
+    """Best move and full-window value of the position for ``player`` in seat 0, with a fresh table."""
+    game = Isolation(player, HumanPlayer("Opponent"))
+    game.bitboard = bitboard.copy()
+    if player.transposition_table is not None:
+        player.transposition_table.clear()
+    root_actions = game.bitboard.move_squares(0)
+    return player._search_root(game, root_actions, depth, None)[:2]
+
+
+def test_probe_finds_stored_entries():
+    table = TranspositionTable(8)
+    assert table.probe(3) is None
+    table.store(3, 4, 1.5, LOWER, 17)
+    assert table.probe(3) == (3, 4, 1.5, LOWER, 17)
+    assert table.probe(11) is None  # Same bucket, different key
+    assert (table.probes, table.hits) == (3, 1)
+    table.clear()
+    assert table.probe(3) is None
+    assert (table.probes, table.hits) == (1, 0)
+
+
+def test_depth_preferred_and_always_replace_slots():
+    table = TranspositionTable(8)
+    table.store(3, 5, 1.0, EXACT, 1)
+    table.store(11, 2, 2.0, UPPER, 2)  # Shallower, so it goes to the always-replace slot
+    assert table.probe(3)[1] == 5 and table.probe(11)[1] == 2
+    table.store(19, 1, 3.0, EXACT, 3)  # Replaces the always-replace slot only
+    assert table.probe(3) is not None and table.probe(11) is None and table.probe(19) is not None
+    table.store(27, 6, 4.0, EXACT, 4)  # Deeper, so it takes the depth-preferred slot
+    assert table.probe(3) is None and table.probe(27)[1] == 6 and table.probe(19) is not None
+    table.store(27, 1, 5.0, LOWER, 5)  # Shallower result for the same key stays beside the deeper one
+    assert table.probe(27) == (27, 6, 4.0, EXACT, 4)
+
+
+def test_size_must_be_positive():
+    with pytest.raises(ValueError):
+        TranspositionTable(0)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_exact_depth_table_matches_plain_alpha_beta(seed):
+    rng = random.Random(seed)
+    plain = ComputerPlayer("Plain", tt_size=0, eval_cache_size=0, move_ordering=False)
+    game = random_game(rng, plain, rng.randint(3, 12))
+    if not game.bitboard.move_squares(0):
+        pytest.skip("no moves")
+    cached = ComputerPlayer("Cached", tt_exact_depth=True)
+    assert search_root(cached, game.bitboard, 5)[1] == search_root(plain, game.bitboard, 5)[1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_table_keeps_the_best_move(seed):
+    rng = random.Random(seed)
+    plain = ComputerPlayer("Plain", tt_size=0, eval_cache_size=0, move_ordering=False)
+    game = random_game(rng, plain, rng.randint(0, 10))
+    if not game.bitboard.move_squares(0):
+        pytest.skip("no moves")
+    cached = ComputerPlayer("Cached", eval_cache_size=0, move_ordering=False, tt_exact_depth=True)
+    assert search_root(cached, game.bitboard, 4) == search_root(plain, game.bitboard, 4)
+
+
+def test_deeper_entries_answer_shallower_probes_by_default():
+    for exact, expected in ((False, 123.0), (True, None)):
+        player = ComputerPlayer("Player", tt_exact_depth=exact, endgame_solver=False)
+        game = Isolation(player, HumanPlayer("Opponent"))
+        key = game.bitboard.key ^ ZOBRIST_SIDE[0]
+        player.transposition_table.store(key, 5, 123.0, EXACT, None)
+        value = player.minimax(game, 2, float('-inf'), float('inf'), True)
+        if expected is None:
+            assert value != 123.0
+        else:
+            assert value == expected
+
+
+def test_new_heuristic_clears_stored_scores():
+    player = ComputerPlayer("Player")
+    game = Isolation(player, HumanPlayer("Opponent"))
+    player.choose_move(game, time_limit=0.2)
+    player.transposition_table.store(1, 3, 2.0, EXACT, None)
+    assert len(player.evaluation_cache)
+
+    # The same heuristic again keeps them
+    player.heuristic = player.aggressive_approach_heuristic
+    assert player.transposition_table.probe(1) is not None
+    assert len(player.evaluation_cache)
+
+    player.heuristic = player.enhanced_difference_heuristic
+    assert player.transposition_table.probe(1) is None
+    assert not len(player.evaluation_cache)
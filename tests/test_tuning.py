@@ -0,0 +1,79 @@
+import json
+import random
+import pytest
+from src import tuning
+from src.player import ComputerPlayer, HumanPlayer
+from src.game_record import GameRecord, replay
+from tests.test_game_record import play_random_game
+
+
+def recorded_games(count, seed=0):
+    """Records of random decided games on the default board."""
+    rng = random.Random(seed)
+    records = []
+    while len(records) < count:
+        game, winner, _ = play_random_game(rng, 8, 6)
+        records.append(GameRecord.from_game(game, winner, {}))
+    return records
+
+
+def test_weight_file_round_trip(tmp_path):
+    path = str(tmp_path / "weights.json")
+    weights = tuning.default_weights()
+    weights["composite_center"] = 0.75
+    tuning.write_weights(path, weights)
+    assert ComputerPlayer("Tuned", weights=path).weights == weights
+    assert ComputerPlayer("Partial", weights={"mobility_lambda": 2.0}).weights["composite_mobility"] == \
+           weights["composite_mobility"]
+    with open(path, "w") as file:
+        json.dump({"no_such_weight": 1.0}, file)
+    with pytest.raises(ValueError):
+        ComputerPlayer("Broken", weights=path)
+
+
+def test_engine_spec_adds_the_weights_as_options():
+    assert tuning.engine_spec("minimax", {"a": 0.5}) == "minimax:a=0.5"
+    assert tuning.engine_spec("minimax:depth=3", {"a": 0.5, "b": -1.0}) == "minimax:depth=3,a=0.5,b=-1.0"
+
+
+def test_texel_evaluations_match_composite_heuristic():
+    np = pytest.importorskip("numpy")
+    player = ComputerPlayer("Player", tt_size=0, eval_cache_size=0)
+    player.set_weights({"composite_mobility": 0.7, "composite_center": 0.2, "composite_difference": 0.5,
+                        "mobility_lambda": 0.3})
+    for record in recorded_games(10):
+        features = np.array(tuning.position_features(record), dtype=np.float64).reshape(-1, 6)
+        expected = []
+        for turn in range(len(record) + 1):
+            game = replay(record, turn, player, HumanPlayer("Opponent"))
+            if game.bitboard.awaiting_removal:
+                break
+            mover = game.bitboard.to_move
+            if game.bitboard.mobility(mover):
+                expected.append(player.composite_heuristic(game, game.players[mover]))
+        assert tuning.texel_evaluations(features, player.weights) == pytest.approx(expected)
+        assert expected and set(features[:, 5]) <= {0.0, 1.0}
+
+
+def test_texel_lowers_the_loss():
+    np = pytest.importorskip("numpy")
+    features = np.concatenate([np.array(tuning.position_features(record), dtype=np.float64).reshape(-1, 6)
+                               for record in recorded_games(60)])
+    start = tuning.default_weights()
+    scale = tuning.fit_scale(features, start)
+    weights = tuning.texel(features, iterations=300)
+    assert set(weights) == set(start)
+    assert all(weights[name] == start[name] for name in start if name not in tuning.TEXEL_WEIGHTS)
+    assert tuning.texel_loss(features, weights, scale) < tuning.texel_loss(features, start, scale)
+
+
+def test_spsa_reports_every_iteration_and_writes_the_weights(tmp_path):
+    path = str(tmp_path / "weights.json")
+    reported = []
+    start = tuning.default_weights()
+    weights = tuning.spsa(iterations=2, games=4, time_limit=0.01, seed=3, rows=5, cols=5, output=path,
+                          on_iteration=lambda k, weights, summary: reported.append((k, summary["games"])))
+    assert reported == [(1, 4), (2, 4)]
+    assert set(weights) == set(start)
+    with open(path) as file:
+        assert json.load(file) == weights
@@ -0,0 +1,90 @@
+import random
+import pytest
+from src.isolation import Isolation
+from src.player import ComputerPlayer, HumanPlayer
+from src.bitboard import geometry
+
+np = pytest.importorskip("numpy")
+from src import vectorized  # noqa: E402
+
+
+def random_positions(seed, count, sizes=((8, 6), (5, 5), (7, 9))):
+    """Random positions reached by random turns, each with the seat to evaluate for."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        rows, cols = rng.choice(sizes)
+        player = ComputerPlayer("Player", eval_cache_size=0)
+        game = Isolation(player, HumanPlayer("Opponent"), rows, cols)
+        for _ in range(rng.randint(0, 15)):
+            mover = game.players[game.current_player_index]
+            moves = game.get_available_moves(mover)
+            if not moves:
+                break
+            game.make_move(mover, *rng.choice(moves))
+            game.remove_token(*rng.choice(game.get_available_tokens_to_remove()))
+            game.current_player_index ^= 1
+        positions.append((game, player))
+    return positions
+
+
+def test_mobility_features_match_the_bitboard():
+    for game, _ in random_positions(0, 200):
+        bitboard = game.bitboard
+        features = vectorized.mobility_features(bitboard.removed, [bitboard.positions[0]], [bitboard.positions[1]],
+                                                bitboard.geometry)
+        expected = (bitboard.mobility(0), bitboard.mobility(1), bitboard.future_mobility(0), bitboard.future_mobility(1))
+        assert tuple(int(feature[0]) for feature in features) == expected
+
+
+@pytest.mark.parametrize("name", sorted(ComputerPlayer.BATCHED_HEURISTICS))
+@pytest.mark.parametrize("weights", [None, {"composite_mobility": 0.7, "composite_center": -0.2, "mobility_lambda": 1.3}])
+def test_batched_scores_match_scalar_scores(name, weights):
+    for game, player in random_positions(1, 60):
+        if weights is not None:
+            player.set_weights(weights)
+        heuristic = getattr(player, name)
+        batched = getattr(player, ComputerPlayer.BATCHED_HEURISTICS[name])
+        bitboard = game.bitboard
+        # Score every child of the position, as minimax does at a frontier node
+        for mover in (0, 1):
+            moves = bitboard.move_squares(mover)
+            if not moves:
+                continue
+            other = [bitboard.positions[1 - mover]] * len(moves)
+            for seat in (0, 1):
+                our_squares, their_squares = (moves, other) if seat == mover else (other, moves)
+                scores = batched(bitboard.removed, our_squares, their_squares, bitboard.geometry)
+                expected = []
+                for move in moves:
+                    game.apply_move(game.players[mover], bitboard.geometry.coords(move))
+                    expected.append(heuristic(game, game.players[seat]))
+                    game.undo()
+                assert scores.tolist() == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("name", sorted(ComputerPlayer.BATCHED_HEURISTICS))
+@pytest.mark.parametrize("seed", range(4))
+def test_batched_search_matches_scalar_search(name, seed):
+    game, _ = random_positions(seed + 10, 1, sizes=((8, 6),))[0]
+    if not game.bitboard.move_squares(game.current_player_index):
+        pytest.skip("no moves")
+    results = []
+    for batch_evaluation in (False, True):
+        player = ComputerPlayer("Player", batch_evaluation=batch_evaluation, tt_size=0, eval_cache_size=0)
+        player.heuristic = getattr(player, name)
+        search = Isolation(player, HumanPlayer("Opponent"))
+        search.bitboard = game.bitboard.copy()
+        search.current_player_index = 0
+        player._resolve_batched_heuristic()
+        assert (player._batched_heuristic is not None) == batch_evaluation
+        results.append(player._search_root(search, search.bitboard.move_squares(0), 3, None)[:2])
+    assert results[0][0] == results[1][0]
+    assert results[0][1] == pytest.approx(results[1][1])
+
+
+def test_center_distances():
+    board_geometry = geometry(7, 9)
+    squares = list(range(board_geometry.num_squares))
+    distances = vectorized.center_distances(squares, (3, 4), board_geometry)
+    assert distances.tolist() == [abs(row - 3) + abs(col - 4) for row in range(7) for col in range(9)]